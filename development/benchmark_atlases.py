@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+"""Compares full and incremental atlas generation on the content tree.
+
+The atlases are written to a temporary directory, the real ones are not touched.
+Usage: python3 development/benchmark_atlases.py [max_size]
+"""
+
+import importlib.util
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# make this script work both when started inside development and in the uh root dir
+if not os.path.exists('content'):
+	os.chdir('..')
+assert os.path.exists('content'), 'Content dir not found.'
+sys.path.append('.')
+
+from horizons.constants import PATHS # isort:skip
+
+# horizons.engine can't be imported without fife, load the script directly
+spec = importlib.util.spec_from_file_location('generate_atlases',
+                                              os.path.join('horizons', 'engine', 'generate_atlases.py'))
+generate_atlases = importlib.util.module_from_spec(spec)
+sys.modules['generate_atlases'] = generate_atlases # for pickling the metadata
+spec.loader.exec_module(generate_atlases)
+AtlasEntry = generate_atlases.AtlasEntry
+AtlasGenerator = generate_atlases.AtlasGenerator
+
+
+def redirect_output(directory):
+	"""Make the atlas generator write its files to directory."""
+	PATHS.ATLAS_FILES_DIR = os.path.join(directory, 'atlas')
+	PATHS.ATLAS_DB_PATH = os.path.join(directory, 'atlas.sql')
+	PATHS.ACTION_SETS_JSON_FILE = os.path.join(directory, 'actionsets.json')
+	PATHS.TILE_SETS_JSON_FILE = os.path.join(directory, 'tilesets.json')
+	PATHS.ATLAS_METADATA_PATH = os.path.join(directory, 'atlas-metadata.cache')
+
+
+def timed_update(max_size, prepare=None):
+	"""Load the generator from its metadata and update the atlases.
+	@param prepare: function that modifies the loaded generator to simulate a change
+	@return: tuple (seconds, number of books that were saved)
+	"""
+	saved_books = []
+	save_books = AtlasGenerator.__dict__['_save_books']
+
+	def count_saved_books(cls, books):
+		saved_books.extend(books)
+		save_books.__func__(cls, books)
+
+	generator = AtlasGenerator.load(max_size)
+	assert generator is not None, 'Loading the atlas metadata failed.'
+	if prepare is not None:
+		prepare(generator)
+		generator._save_metadata()
+		generator = AtlasGenerator.load(max_size)
+
+	AtlasGenerator._save_books = classmethod(count_saved_books)
+	try:
+		start = time.perf_counter()
+		assert generator.update()
+		return time.perf_counter() - start, len(saved_books)
+	finally:
+		AtlasGenerator._save_books = save_books
+
+
+def forget_image(generator):
+	"""Remove the last image from the metadata, the next update will treat it as added."""
+	path = max(generator.atlas_book_lookup)
+	book = generator.atlas_book_lookup.pop(path)
+	del book.location[path]
+	del generator.images[path]
+
+
+def invent_image(generator):
+	"""Add an image to the metadata that doesn't exist, the next update will treat it as removed."""
+	book = generator.books[0]
+	path = os.path.join('content', 'gfx', 'removed.png')
+	book.location[path] = AtlasEntry(0, 0, 1, 1)
+	generator.atlas_book_lookup[path] = book
+
+
+def main(max_size):
+	directory = tempfile.mkdtemp()
+	try:
+		redirect_output(directory)
+
+		start = time.perf_counter()
+		generator = AtlasGenerator(max_size)
+		generator.recreate()
+		full = time.perf_counter() - start
+		num_books = len(generator.books)
+
+		results = [
+			('unchanged', timed_update(max_size)),
+			('one image added', timed_update(max_size, forget_image)),
+			('one image removed', timed_update(max_size, invent_image)),
+		]
+	finally:
+		shutil.rmtree(directory)
+
+	print()
+	print('{:<20} {:>8.3f}s {:>4d}/{:d} books'.format('full', full, num_books, num_books))
+	for name, (seconds, saved_books) in results:
+		print('{:<20} {:>8.3f}s {:>4d}/{:d} books'.format(name, seconds, saved_books, num_books))
+
+
+if __name__ == '__main__':
+	args = sys.argv[1:]
+	main(int(args[0]) if args else 2048)
@@ -407,19 +407,15 @@ class AIPlayer(GenericAI):
 			Scheduler().add_new_object(Callback(self._settlement_manager_by_settlement_id[settlement.worldid].handle_disaster, message), self, run_in=0)
 
 	def _on_settlement_range_changed(self, message):
-		"""Stores the ownership changes in a list for later processing."""
-		our_new_coords_list = []
+		"""Stores the ownership changes in a list for later processing.
+
+		Changes of our own settlements are read from the island by the road connectivity cache."""
 		settlement = message.sender
+		if settlement.owner is self:
+			return
 
 		for tile in message.changed_tiles:
-			coords = (tile.x, tile.y)
-			if settlement.owner is self:
-				our_new_coords_list.append(coords)
-			else:
-				self.settlement_expansions.append((coords, settlement))
-
-		if our_new_coords_list and settlement.worldid in self._settlement_manager_by_settlement_id:
-			self._settlement_manager_by_settlement_id[settlement.worldid].production_builder.road_connectivity_cache.modify_area(our_new_coords_list)
+			self.settlement_expansions.append(((tile.x, tile.y), settlement))
 
 	def handle_enemy_expansions(self):
 		if not self.settlement_expansions:
@@ -219,11 +219,18 @@ class AbstractFarm(AbstractBuilding):
 
 	def _get_option_cache(self, settlement_manager):
 		production_builder = settlement_manager.production_builder
-		current_cache_changes = (production_builder.island.last_change_id, production_builder.last_change_id)
+		island = production_builder.island
+		current_cache_changes = (island.last_change_id, production_builder.last_change_id)
 
 		worldid = settlement_manager.worldid
 		if worldid in self.__cache and self.__cache[worldid][0] != current_cache_changes:
-			del self.__cache[worldid]
+			(island_change_id, builder_change_id), option_cache = self.__cache[worldid]
+			if builder_change_id == production_builder.last_change_id and \
+			   not island.has_changes_in(island_change_id, settlement_manager.settlement.ground_map):
+				# the options only depend on the settlement area, which wasn't touched
+				self.__cache[worldid] = (current_cache_changes, option_cache)
+			else:
+				del self.__cache[worldid]
 
 		if worldid not in self.__cache:
 			self.__cache[worldid] = (current_cache_changes, FarmOptionCache(settlement_manager))
@@ -52,6 +52,8 @@ class CollectingComponent(Component):
 		self.__collectors = []
 
 		self.path_nodes = ConsumerBuildingPathNodes(self.instance)
+		# pather class -> (path nodes change id, distance field from this building)
+		self._distance_fields = {}
 
 	def create_collector(self, collectors):
 		"""Creates collectors for building according to db."""
@@ -79,6 +81,7 @@ class CollectingComponent(Component):
 		super().remove()
 		self.__collectors = None
 		self.path_nodes = None
+		self._distance_fields = None
 
 	def save(self, db):
 		super().save(db)
@@ -95,6 +98,21 @@ class CollectingComponent(Component):
 		self.__init()
 
 	## INTERFACE
+	def get_distance_field(self, pather):
+		"""Returns the travel distances from this building on the path nodes of pather.
+		The distances are shared by all collectors with the same pather class and calculated
+		again after the path nodes have changed.
+		@param pather: pather instance of a collector
+		@return: PathDistanceField instance or None if the path nodes of pather aren't tracked"""
+		change_id = pather.get_path_nodes_change_id()
+		if change_id is None:
+			return None
+		cached = self._distance_fields.get(pather.__class__)
+		if cached is None or cached[0] != change_id:
+			cached = (change_id, pather.get_distance_field(self.instance))
+			self._distance_fields[pather.__class__] = cached
+		return cached[1]
+
 	def add_local_collector(self, collector):
 		assert collector not in self.__collectors
 		self.__collectors.append(collector)
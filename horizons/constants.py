@@ -605,6 +605,8 @@ class PATHS:
 	SCREENSHOT_DIR = os.path.join(USER_DATA_DIR, "screenshots")
 	SAVEGAME_DIR = os.path.join(USER_DATA_DIR, "save")
 	CACHE_DIR = _cache_dir
+	# snapshots of the game data database are kept here, None disables them
+	DB_SNAPSHOT_DIR = CACHE_DIR
 	ATLAS_METADATA_PATH = os.path.join(CACHE_DIR, "atlas-metadata.cache")
 
 	# paths relative to uh dir
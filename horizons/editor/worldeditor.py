@@ -138,8 +138,10 @@ class WorldEditor:
 			ground = Entities.grounds['{:d}-{}'.format(ground_id, shape)](self.session, *coords)
 			ground.act(rotation)
 			self.world.full_map[coords] = ground
+			self.world.water.pop(coords, None)
 		else:
 			self.world.full_map[coords] = self.world.fake_tile_map[coords]
+			self.world.water[coords] = 1.0
 		Minimap.update(coords)
 
 		# update cam, that's necessary because of the static layer WATER
@@ -22,6 +22,8 @@
 # ###################################################
 
 import glob
+import hashlib
+import io
 import json
 import logging
 import math
@@ -74,12 +76,30 @@ from horizons.util.loaders.tilesetloader import TileSetLoader # isort:skip
 
 
 class AtlasEntry:
-	def __init__(self, x, y, width, height, last_modified):
+	def __init__(self, x, y, width, height):
 		self.x = x
 		self.y = y
 		self.width = width
 		self.height = height
+
+
+class ImageInfo:
+	"""Metadata of a source image, used to find out which images have changed."""
+	def __init__(self, last_modified, file_size, digest, width, height):
 		self.last_modified = last_modified
+		self.file_size = file_size
+		self.digest = digest
+		self.width = width
+		self.height = height
+
+
+def probe_image(path):
+	"""Return the ImageInfo of the image at path. Runs in worker processes."""
+	stat = os.stat(path)
+	with open(path, 'rb') as png_file:
+		data = png_file.read()
+	width, height = Image.open(io.BytesIO(data)).size
+	return ImageInfo(stat.st_mtime_ns, stat.st_size, hashlib.sha1(data).hexdigest(), width, height)
 
 
 class AtlasBook:
@@ -101,7 +121,7 @@ class AtlasBook:
 		"""Return true if and only if the image was added."""
 		if self.cur_x + w <= self.max_size and self.cur_y + h <= self.max_size:
 			# add to the end of the current row
-			self.location[path] = AtlasEntry(self.cur_x, self.cur_y, w, h, int(os.path.getmtime(path)))
+			self.location[path] = AtlasEntry(self.cur_x, self.cur_y, w, h)
 			self.cur_x += w
 			self.cur_h = max(self.cur_h, h)
 			return True
@@ -111,12 +131,24 @@ class AtlasBook:
 			self.cur_x = w
 			self.cur_y += self.cur_h
 			self.cur_h = h
-			self.location[path] = AtlasEntry(0, self.cur_y, w, h, int(os.path.getmtime(path)))
+			self.location[path] = AtlasEntry(0, self.cur_y, w, h)
 			return True
 
 		# unable to fit in the given space with the current algorithm
 		return False
 
+	def repack(self):
+		"""Place the images again in their previous order, closing the gaps of removed ones.
+		@return: list of paths of images that don't fit anymore and were removed from the book
+		"""
+		entries = sorted(self.location.items(), key=lambda item: (item[1].y, item[1].x))
+		self._clear()
+		overflow = []
+		for path, entry in entries:
+			if not self.add(entry.width, entry.height, path):
+				overflow.append(path)
+		return overflow
+
 	def save(self):
 		"""Write the entire image to a file with the given path."""
 		if not os.path.exists(PATHS.ATLAS_FILES_DIR):
@@ -186,7 +218,9 @@ class ImageSetManager:
 class AtlasGenerator:
 	log = logging.getLogger("generate_atlases")
 	# increment this when the structure of the atlases changes
-	current_version = 1
+	current_version = 2
+	# probing images in worker processes only pays off if there are enough of them
+	parallel_probe_min_images = 256
 
 	def __init__(self, max_size):
 		self.version = self.current_version
@@ -194,6 +228,7 @@ class AtlasGenerator:
 		self.books = []
 		self.num_books = 0
 		self.atlas_book_lookup = {}
+		self.images = {} # path -> ImageInfo
 
 	def _init_sets(self):
 		self.sets = []
@@ -213,13 +248,15 @@ class AtlasGenerator:
 		pool.close()
 		pool.join()
 
-	def save(self):
+	def _save_db(self):
 		with open(PATHS.ATLAS_DB_PATH, 'w') as atlas_db_file:
 			atlas_db_file.write("CREATE TABLE atlas('atlas_id' INTEGER NOT NULL PRIMARY KEY, 'atlas_path' TEXT NOT NULL);\n")
 			for book in self.books:
 				atlas_db_file.write("INSERT INTO atlas VALUES({0:d}, "
 					"'{1!s}');\n".format(book.id, book.path))
 
+	def save(self):
+		self._save_db()
 		self._save_sets()
 		self._save_books(self.books)
 		self._save_metadata()
@@ -228,6 +265,7 @@ class AtlasGenerator:
 		self.books.append(AtlasBook(len(self.books), self.max_size))
 
 	def _add_image(self, w, h, path):
+		assert w <= self.max_size and h <= self.max_size, 'Image too large: ' + str((h, w, path))
 		if not self.books:
 			self._add_atlas_book()
 
@@ -237,16 +275,64 @@ class AtlasGenerator:
 
 		self.atlas_book_lookup[path] = self.books[-1]
 
-	@classmethod
-	def _get_dimensions(cls, path):
-		with open(path, 'rb') as png_file:
-			return Image.open(png_file).size
+	def _insert_image(self, w, h, path):
+		"""Add an image to the first book that has enough space left at its end.
+		@return: the book the image was added to
+		"""
+		assert w <= self.max_size and h <= self.max_size, 'Image too large: ' + str((h, w, path))
+		for book in self.books:
+			if book.add(w, h, path):
+				break
+		else:
+			self._add_atlas_book()
+			book = self.books[-1]
+			assert book.add(w, h, path)
+
+		self.atlas_book_lookup[path] = book
+		return book
+
+	def _probe_images(self, paths):
+		"""Get the metadata of the images, reusing the known metadata of unchanged files.
+		@return: tuple (dict path -> ImageInfo, set of paths whose content is unknown or has changed)
+		"""
+		images = {}
+		unknown = []
+		for path in paths:
+			info = self.images.get(path)
+			stat = os.stat(path)
+			if info is not None and info.last_modified == stat.st_mtime_ns and info.file_size == stat.st_size:
+				images[path] = info
+			else:
+				unknown.append(path)
+
+		processes = min(len(unknown), multiprocessing.cpu_count())
+		if len(unknown) >= self.parallel_probe_min_images and processes > 1:
+			pool = multiprocessing.Pool(processes=processes)
+			try:
+				infos = pool.map(probe_image, unknown, chunksize=max(1, len(unknown) // (processes * 4)))
+			finally:
+				pool.close()
+				pool.join()
+		else:
+			infos = [probe_image(path) for path in unknown]
+
+		changed = set()
+		for path, info in zip(unknown, infos):
+			old_info = self.images.get(path)
+			if old_info is None or old_info.digest != info.digest:
+				changed.add(path)
+			images[path] = info
+		return images, changed
 
 	def _get_paths(self):
+		"""Return the paths of all images in the sets, each one only once."""
 		paths = []
-		for set in self.sets:
-			for path in set.files:
-				paths.append(path)
+		seen = set()
+		for image_set in self.sets:
+			for path in image_set.files:
+				if path not in seen:
+					seen.add(path)
+					paths.append(path)
 		return paths
 
 	def recreate(self):
@@ -254,16 +340,12 @@ class AtlasGenerator:
 
 		self._init_sets()
 		paths = self._get_paths()
-		data = []
-		for path in paths:
-			w, h = self._get_dimensions(path)
-			data.append((w * h, h, w, path))
-
-		assert data, 'No files found.'
-		assert (data[0][1] <= self.max_size and data[0][2] <= self.max_size), 'Image too large: ' + str(data[0][1:])
+		assert paths, 'No files found.'
 
-		for _, h, w, path in data:
-			self._add_image(w, h, path)
+		self.images, _ = self._probe_images(paths)
+		for path in paths:
+			info = self.images[path]
+			self._add_image(info.width, info.height, path)
 		self.save()
 
 	def _update_selected_books(self, update_books):
@@ -276,63 +358,79 @@ class AtlasGenerator:
 		self._save_books(update_books)
 
 	def update(self):
+		"""Update the atlases to the current images.
+		Only the books containing added, removed or modified images are packed and saved again.
+		"""
 		self._init_sets()
 		paths = self._get_paths()
-
-		# if the sizes don't match then something has been deleted or added
-		recreate_all = False
-		if len(set(paths)) != len(self.atlas_book_lookup):
-			recreate_all = True
-			self.log.info("The old number of images (%d) doesn't match the new (%d)",
-			              len(self.atlas_book_lookup), len(set(paths)))
-
-		recreate_books = set()
-		if not recreate_all:
-			for path in paths:
-				if path not in self.atlas_book_lookup:
-					self.log.info('A new image has been added: %s', path)
-					recreate_all = True
-					break
-
-				last_modified = int(os.path.getmtime(path))
-				book = self.atlas_book_lookup[path]
-				entry = book.location[path]
-				if last_modified == entry.last_modified:
-					continue
-
-				self.log.info('An image has been modified: %s', path)
-				w, h = self._get_dimensions(path)
-				if w > entry.width or h > entry.height:
-					self.log.info('An image is larger than before: %s', path)
-					recreate_all = True
-					break
-
-				if book not in recreate_books:
-					self.log.info('Need to recreate %s', book.path)
-					recreate_books.add(book)
-
+		old_images = self.images
+		self.images, changed = self._probe_images(paths)
+
+		update_books = set()
+		repack_books = set()
+		for path in sorted(set(self.atlas_book_lookup).difference(self.images)):
+			self.log.info('An image has been removed: %s', path)
+			book = self.atlas_book_lookup.pop(path)
+			del book.location[path]
+			repack_books.add(book)
+
+		new_paths = []
+		for path in paths:
+			book = self.atlas_book_lookup.get(path)
+			if book is None:
+				self.log.info('A new image has been added: %s', path)
+				new_paths.append(path)
+				continue
+			if path not in changed:
+				continue
+
+			self.log.info('An image has been modified: %s', path)
+			info = self.images[path]
+			entry = book.location[path]
+			if info.width > entry.width or info.height > entry.height:
+				self.log.info('An image is larger than before: %s', path)
+				del self.atlas_book_lookup[path]
+				del book.location[path]
+				repack_books.add(book)
+				new_paths.append(path)
+			else:
 				# update the entry
-				entry.width = w
-				entry.height = h
-				entry.last_modified = last_modified
-
-		if recreate_all:
-			self.log.info('Forced to recreate the entire atlas.')
-			return False
-
-		if recreate_books:
+				entry.width = info.width
+				entry.height = info.height
+			update_books.add(book)
+
+		for book in sorted(repack_books, key=lambda book: book.id):
+			self.log.info('Need to repack %s', book.path)
+			for path in book.repack():
+				del self.atlas_book_lookup[path]
+				new_paths.append(path)
+			update_books.add(book)
+
+		num_books = len(self.books)
+		for path in new_paths:
+			info = self.images[path]
+			update_books.add(self._insert_image(info.width, info.height, path))
+		if len(self.books) != num_books:
+			self.log.info('Added %d books', len(self.books) - num_books)
+			self._save_db()
+
+		if update_books:
 			self.log.info('Updated selected books')
-			self._update_selected_books(recreate_books)
+			self._update_selected_books(update_books)
 			self._save_metadata()
 		else:
 			# the sets have to always be saved because the tm_N files are not otherwise taken into account
 			self._save_sets()
+			if any(self.images[path] is not old_images.get(path) for path in paths):
+				# remember the new modification times
+				self._save_metadata()
 		return True
 
 	def __getstate__(self):
 		# avoid saving self.sets
 		return {'version': self.version, 'max_size': self.max_size, 'books': self.books,
-		        'num_books': self.num_books, 'atlas_book_lookup': self.atlas_book_lookup}
+		        'num_books': self.num_books, 'atlas_book_lookup': self.atlas_book_lookup,
+		        'images': self.images}
 
 	def _save_metadata(self):
 		self.log.info('Saving metadata')
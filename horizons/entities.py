@@ -23,6 +23,8 @@
 import fnmatch
 import logging
 import os
+import time
+from typing import List, Tuple
 
 from horizons.util.loaders.tilesetloader import TileSetLoader
 from horizons.util.python.callback import Callback
@@ -46,6 +48,25 @@ class _EntitiesLazyDict(dict):
 			return elem
 
 
+class _StageTimer:
+	"""Measures the time spent in consecutive stages of loading."""
+	def __init__(self, name):
+		self.name = name
+		self.stages = [] # type: List[Tuple[str, float]]
+		self._last = time.perf_counter()
+
+	def stage(self, stage_name):
+		"""Marks the end of the stage stage_name, which started at the end of the previous one."""
+		now = time.perf_counter()
+		self.stages.append((stage_name, now - self._last))
+		self._last = now
+
+	def report(self, log, num_files):
+		log.info("Entities: loaded %d %s files in %.3fs (%s)", num_files, self.name,
+		         sum(duration for stage_name, duration in self.stages),
+		         ', '.join('{}: {:.3f}s'.format(*stage) for stage in self.stages))
+
+
 class Entities:
 	"""Class that stores all the special classes for buildings, grounds etc.
 	Stores class objects, not instances.
@@ -93,23 +114,28 @@ class Entities:
 			return
 		cls.buildings = _EntitiesLazyDict()
 		from horizons.world.building import BuildingClass
-		for root, dirnames, filenames in os.walk('content/objects/buildings'):
-			for filename in fnmatch.filter(filenames, '*.yaml'):
-				cls.log.debug("Loading: " + filename)
-				# This is needed for dict lookups! Do not convert to os.join!
-				full_file = root + "/" + filename
-				result = YamlCache.get_file(full_file, game_data=True)
-				if result is None: # discard empty yaml files
-					print("Empty yaml file {file} found, not loading!".format(file=full_file))
-					continue
-
-				result['yaml_file'] = full_file
-
-				building_id = int(result['id'])
-				cls.buildings.create_on_access(building_id, Callback(BuildingClass, db=db, id=building_id, yaml_data=result))
-				# NOTE: The current system now requires all building data to be loaded
-				if load_now or True:
-					cls.buildings[building_id]
+		timer = _StageTimer('buildings')
+
+		# This is needed for dict lookups! Do not convert to os.join!
+		files = cls._find_yaml_files('content/objects/buildings', lambda root, filename: root + "/" + filename)
+		timer.stage('discovery')
+		results = YamlCache.get_files(files, game_data=True)
+		timer.stage('data')
+
+		for full_file, result in zip(files, results):
+			if result is None: # discard empty yaml files
+				print("Empty yaml file {file} found, not loading!".format(file=full_file))
+				continue
+
+			result['yaml_file'] = full_file
+
+			building_id = int(result['id'])
+			cls.buildings.create_on_access(building_id, Callback(BuildingClass, db=db, id=building_id, yaml_data=result))
+			# NOTE: The current system now requires all building data to be loaded
+			if load_now or True:
+				cls.buildings[building_id]
+		timer.stage('classes')
+		timer.report(cls.log, len(files))
 
 	@classmethod
 	def load_units(cls, load_now=False):
@@ -120,11 +146,28 @@ class Entities:
 		cls.units = _EntitiesLazyDict()
 
 		from horizons.world.units import UnitClass
-		for root, dirnames, filenames in os.walk('content/objects/units'):
+		timer = _StageTimer('units')
+
+		files = cls._find_yaml_files('content/objects/units', os.path.join)
+		timer.stage('discovery')
+		results = YamlCache.get_files(files, game_data=True)
+		timer.stage('data')
+
+		for result in results:
+			unit_id = int(result['id'])
+			cls.units.create_on_access(unit_id, Callback(UnitClass, id=unit_id, yaml_data=result))
+			if load_now:
+				cls.units[unit_id]
+		timer.stage('classes')
+		timer.report(cls.log, len(files))
+
+	@classmethod
+	def _find_yaml_files(cls, directory, join):
+		"""Returns the paths of all yaml files in directory and its subdirectories.
+		@param join: function creating the path from a directory and a filename
+		"""
+		files = []
+		for root, dirnames, filenames in os.walk(directory):
 			for filename in fnmatch.filter(filenames, '*.yaml'):
-				full_file = os.path.join(root, filename)
-				result = YamlCache.get_file(full_file, game_data=True)
-				unit_id = int(result['id'])
-				cls.units.create_on_access(unit_id, Callback(UnitClass, id=unit_id, yaml_data=result))
-				if load_now:
-					cls.units[unit_id]
+				files.append(join(root, filename))
+		return files
@@ -20,29 +20,24 @@
 # ###################################################
 
 
-import json
 import locale
 import logging
 import os
-import re
-import subprocess
-import sys
-import tempfile
 from typing import List, Optional, Tuple
 
 import horizons.globals
 import horizons.main
-from horizons.constants import LANGUAGENAMES, PATHS, VERSION
+from horizons.constants import LANGUAGENAMES
 from horizons.extscheduler import ExtScheduler
 from horizons.gui.util import load_uh_widget
-from horizons.gui.widgets.minimap import Minimap, iter_minimap_points_colors
+from horizons.gui.widgets.minimap import Minimap
 from horizons.gui.windows import Window
 from horizons.i18n import gettext as T
 from horizons.savegamemanager import SavegameManager
 from horizons.scenario import InvalidScenarioFileFormat, ScenarioEventHandler
+from horizons.util.mappreview import RandomMapPreviewGenerator, iter_preview_points
 from horizons.util.python.callback import Callback
 from horizons.util.random_map import generate_random_map, generate_random_seed
-from horizons.util.shapes import Rect
 from horizons.util.startgameoptions import StartGameOptions
 from horizons.world import load_raw_world  # FIXME placing this import at the end results in a cycle
 
@@ -184,6 +179,9 @@ class GameSettingsWidget:
 class RandomMapWidget:
 	"""Create a random map, influence map generation with multiple sliders."""
 
+	# seconds between checks whether the preview has been rendered
+	PREVIEW_POLL_INTERVAL = 0.02
+
 	def __init__(self, windows, singleplayer_menu, aidata):
 		self._windows = windows
 		self._singleplayer_menu = singleplayer_menu
@@ -195,14 +193,11 @@ class RandomMapWidget:
 
 		# Map preview
 		self._last_map_parameters = None
-		self._preview_process = None
-		self._preview_output = None
+		self._preview_generator = RandomMapPreviewGenerator(Minimap.COLORS['island'], Minimap.COLORS['water'])
 		self._map_preview = None
 
 	def end(self):
-		if self._preview_process:
-			self._preview_process.kill()
-			self._preview_process = None
+		self._preview_generator.end()
 		ExtScheduler().rem_all_classinst_calls(self)
 
 	def get_widget(self):
@@ -282,7 +277,8 @@ class RandomMapWidget:
 		self._on_random_parameter_changed()
 
 	def _update_map_preview(self):
-		"""Start a new process to generate a map preview."""
+		"""Request a preview of the map with the current parameters.
+		Previews are rendered in a worker process and cached, see RandomMapPreviewGenerator."""
 		current_parameters = self._get_map_parameters()
 		if self._last_map_parameters == current_parameters:
 			# nothing changed, don't generate a new preview
@@ -290,55 +286,26 @@ class RandomMapWidget:
 
 		self._last_map_parameters = current_parameters
 
-		if self._preview_process:
-			self._preview_process.kill() # process exists, therefore up is scheduled already
-
-		# launch process in background to calculate minimap data
 		minimap_icon = self._gui.findChild(name='map_preview_minimap')
-		params = json.dumps(((minimap_icon.width, minimap_icon.height), current_parameters))
-
-		args = [sys.executable, sys.argv[0], "--generate-minimap", params]
-		# We're running UH in a new process, make sure fife is setup correctly
-		if horizons.main.command_line_arguments.fife_path:
-			args.extend(["--fife-path", horizons.main.command_line_arguments.fife_path])
+		size = (minimap_icon.width, minimap_icon.height)
+		if self._preview_generator.request(size, current_parameters, self._show_map_preview):
+			return
 
-		handle, self._preview_output = tempfile.mkstemp()
-		os.close(handle)
-		self._preview_process = subprocess.Popen(args=args, stdout=open(self._preview_output, "w"))
 		self._set_map_preview_status("Generating preview…")
+		ExtScheduler().rem_call(self, self._poll_map_preview)
+		ExtScheduler().add_new_object(self._poll_map_preview, self, self.PREVIEW_POLL_INTERVAL, -1)
 
-		ExtScheduler().add_new_object(self._poll_preview_process, self, 0.5)
+	def _poll_map_preview(self):
+		"""This will be called regularly while a preview is being rendered."""
+		self._preview_generator.poll()
+		if not self._preview_generator.is_busy():
+			ExtScheduler().rem_call(self, self._poll_map_preview)
 
-	def _poll_preview_process(self):
-		"""This will be called regularly to see if the process ended.
-
-		If the process has not yet finished, schedule a new callback to this function.
-		Otherwise use the data to update the minimap.
-		"""
-		if not self._preview_process:
-			return
-
-		self._preview_process.poll()
-
-		if self._preview_process.returncode is None: # not finished
-			ExtScheduler().add_new_object(self._poll_preview_process, self, 0.1)
-			return
-		elif self._preview_process.returncode != 0:
-			self._preview_process = None
+	def _show_map_preview(self, size, data):
+		if data is None:
 			self._set_map_preview_status("An unknown error occurred while generating the map preview")
 			return
 
-		with open(self._preview_output, 'r') as f:
-			data = f.read()
-			# Sometimes the subprocess outputs more then the minimap data, e.g. debug
-			# information. Since we just read from its stdout, parse out the data that
-			# is relevant to us.
-			data = re.findall(r'^DATA (\[\[.*\]\]) ENDDATA$', data, re.MULTILINE)[0]
-			data = json.loads(data)
-
-		os.unlink(self._preview_output)
-		self._preview_process = None
-
 		if self._map_preview:
 			self._map_preview.end()
 
@@ -355,7 +322,7 @@ class RandomMapWidget:
 			on_click=self._on_preview_click,
 			preview=True)
 
-		self._map_preview.draw_data(data)
+		self._map_preview.draw_data(iter_preview_points(size, data))
 		self._set_map_preview_status("")
 
 	def _set_map_preview_status(self, text):
@@ -617,35 +584,3 @@ class ScenarioMapWidget:
 		language_index = self._gui.collectData('uni_langlist')
 		return scenario[language_index][1]
 
-
-def generate_random_minimap(size, parameters):
-	"""Called as subprocess, calculates minimap data and passes it via string via stdout"""
-	# called as standalone basically, so init everything we need
-	from horizons.entities import Entities
-	from horizons.main import _create_main_db
-
-	if not VERSION.IS_DEV_VERSION:
-		# Hack enable atlases.
-		# Usually the minimap generator uses single tile files, but in release
-		# mode these are not available. Therefor we have to hackenable atlases
-		# for the minimap generation in this case. This forces the game to use
-		# the correct imageloader
-		# In normal dev mode + enabled atlases we ignore this and just continue
-		# to use single tile files instead of atlases for the minimap generation.
-		# These are always available in dev checkouts
-		PATHS.DB_FILES = PATHS.DB_FILES + (PATHS.ATLAS_DB_PATH, )
-
-	db = _create_main_db()
-	horizons.globals.db = db
-	horizons.globals.fife.init_animation_loader(not VERSION.IS_DEV_VERSION)
-	Entities.load_grounds(db, load_now=False) # create all references
-
-	map_file = generate_random_map(*parameters)
-	world = load_raw_world(map_file)
-	location = Rect.init_from_topleft_and_size_tuples((0, 0), size)
-
-	# communicate via stdout. Sometimes the process seems to print more information, therefore
-	# we add markers around our data so it's easier for the caller to get to the data.
-	args = (location, world, Minimap.COLORS['island'], Minimap.COLORS['water'])
-	data = [(x, y, r, g, b) for (x, y), (r, g, b) in iter_minimap_points_colors(*args)]
-	print('DATA', json.dumps(data), 'ENDDATA')
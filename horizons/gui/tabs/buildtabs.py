@@ -223,7 +223,7 @@ class BuildTab(TabInterface):
 		if self.__current_settlement is not None:
 			inventory = self.__current_settlement.get_component(StorageComponent).inventory
 			if not inventory.has_change_listener(self.refresh):
-				inventory.add_change_listener(self.refresh)
+				inventory.add_change_listener(self.refresh, coalesce=True)
 
 	def show(self):
 		self.__remove_changelisteners()
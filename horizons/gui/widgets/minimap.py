@@ -73,8 +73,8 @@ def iter_minimap_points_colors(location, world, island_color, water_color):
 	For every pixel, a tuple ((x, y), (r, g, b)) is returned. These are the x and y
 	coordinated and the color of the pixel in RGB.
 
-	This function is not used anymore in the in-game minimap, but it is necessary
-	for the minimap preview.
+	This function is not used anymore in the in-game minimap. Random map previews are
+	rendered without a world by horizons.util.mappreview, which must give the same result.
 	"""
 
 	transform = _MinimapTransform(world.map_dimensions, location, 0, False)
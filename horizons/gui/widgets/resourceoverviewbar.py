@@ -178,7 +178,7 @@ class ResourceOverviewBar:
 		# called when any game (also new ones) start
 		# register at player inventory for gold updates
 		inv = self.session.world.player.get_component(StorageComponent).inventory
-		inv.add_change_listener(self._update_gold, call_listener_now=True)
+		inv.add_change_listener(self._update_gold, call_listener_now=True, coalesce=True)
 		self.gold_gui.show()
 		self._update_gold() # call once more to make pychan happy
 
@@ -253,7 +253,7 @@ class ResourceOverviewBar:
 		# fill values
 		inv = self._get_current_inventory()
 		# update on all changes as well as now
-		inv.add_change_listener(self._update_resources, call_listener_now=True)
+		inv.add_change_listener(self._update_resources, call_listener_now=True, coalesce=True)
 
 	def set_construction_mode(self, resource_source_instance, build_costs):
 		"""Show resources relevant to construction and build costs
@@ -29,11 +29,9 @@ Continue to horizons.session for further ingame digging.
 """
 
 
-import json
 import logging
 import os
 import os.path
-import sys
 import threading
 import traceback
 from typing import TYPE_CHECKING, Optional
@@ -50,6 +48,7 @@ from horizons.network.networkinterface import NetworkInterface
 from horizons.savegamemanager import SavegameManager
 from horizons.util.atlasloading import generate_atlases
 from horizons.util.checkupdates import setup_async_update_check
+from horizons.util.dbsnapshot import DbSnapshot
 from horizons.util.preloader import PreloadingThread
 from horizons.util.python import parse_port
 from horizons.util.python.callback import Callback
@@ -112,13 +111,6 @@ def start(_command_line_arguments):
 	# init fife before mp_bind is parsed, since it's needed there
 	horizons.globals.fife = Fife()
 
-	if command_line_arguments.generate_minimap: # we've been called as subprocess to generate a map preview
-		from horizons.gui.modules.singleplayermenu import generate_random_minimap
-		generate_random_minimap(* json.loads(
-		  command_line_arguments.generate_minimap
-		  ))
-		sys.exit(0)
-
 	if debug: # also True if a specific module is logged (but not 'fife')
 		setup_debug_mode(command_line_arguments)
 
@@ -581,12 +573,20 @@ def edit_game_map(saved_game_name):
 
 def _create_main_db():
 	"""Returns a dbreader instance, that is connected to the main game data dbfiles.
+	The database is copied from a snapshot in PATHS.DB_SNAPSHOT_DIR if the dbfiles haven't changed.
 	NOTE: This data is read_only, so there are no concurrency issues."""
 	_db = UhDbAccessor(':memory:')
-	for i in PATHS.DB_FILES:
-		with open(i, "r") as f:
-			sql = "BEGIN TRANSACTION;" + f.read() + "COMMIT;"
-		_db.execute_script(sql)
+
+	def execute_dbfiles():
+		for i in PATHS.DB_FILES:
+			with open(i, "r") as f:
+				sql = "BEGIN TRANSACTION;" + f.read() + "COMMIT;"
+			_db.execute_script(sql)
+
+	if PATHS.DB_SNAPSHOT_DIR is None:
+		execute_dbfiles()
+	else:
+		DbSnapshot(PATHS.DB_FILES, PATHS.DB_SNAPSHOT_DIR).create(_db.connection, execute_dbfiles)
 	return _db
 
 
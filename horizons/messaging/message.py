@@ -21,7 +21,7 @@
 
 from typing import Tuple
 
-from horizons.messaging.messagebus import MessageBus
+from horizons.messaging.messagebus import DELIVERY, MessageBus
 from horizons.messaging.queuingmessagebus import QueuingMessageBus
 
 
@@ -33,9 +33,12 @@ class Message:
 	The first argument in each message is always a reference to the sender,
 	additional expected arguments are defined on the class-level attribute `arguments`,
 	these will be stored on the instance.
+
+	`delivery` is one of the DELIVERY policies, messages are delivered immediately by default.
 	"""
 	arguments = tuple() # type: Tuple[str, ...]
 	bus = MessageBus
+	delivery = DELIVERY.IMMEDIATE
 
 	def __init__(self, sender, *args):
 		self.sender = sender
@@ -170,7 +173,7 @@ class SettlerInhabitantsChanged(Message):
 
 class ResourceBarResize(Message):
 	"""Signals a change in resource bar size (not slot changes, but number of slot changes)."""
-	pass
+	delivery = DELIVERY.COALESCE_LATEST
 
 
 class UpgradePermissionsChanged(Message):
@@ -20,64 +20,179 @@
 # ###################################################
 
 import logging
-from collections import defaultdict
-from typing import Any, Callable, DefaultDict, List, Tuple
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from horizons.util.python.singleton import Singleton
 
 BusCallback = Callable[[Any], None]
 
 
+class DELIVERY:
+	"""Delivery policies of message types, set as `delivery` attribute of a Message class."""
+	IMMEDIATE = 0 # call the receivers right away
+	TICK_BATCH = 1 # collect the messages of a scheduler tick and deliver them in order at its end
+	COALESCE_LATEST = 2 # like TICK_BATCH, but only deliver the latest message per sender
+
+
 class MessageBus(object, metaclass=Singleton):
 	"""The MessageBus class is used to send Message instances from a sender to
-	one or multiple recipients."""
+	one or multiple recipients.
+
+	Only subscribed message types and (message type, sender) pairs have an entry in
+	the receiver tables, broadcasting a message nobody listens to doesn't store anything.
+	Messages with a deferred delivery policy (see DELIVERY) that are broadcast during a
+	scheduler tick are delivered at the end of that tick, outside of ticks they are
+	delivered immediately."""
 
 	log = logging.getLogger("messaging.messagebus")
 
 	def __init__(self):
 		# Register for a specific messagetype
-		self.global_receivers = defaultdict(list) # type: DefaultDict[str, List[BusCallback]]
+		self.global_receivers = {} # type: Dict[str, List[BusCallback]]
 		# Register for messages from a specific object
-		self.local_receivers = defaultdict(list) # type: DefaultDict[Tuple[str, Any], List[BusCallback]]
+		self.local_receivers = {} # type: Dict[Tuple[str, Any], List[BusCallback]]
+		# Messages that are delivered at the end of the current tick, in broadcast order
+		self._deferred_messages = [] # type: List[Any]
+		# (messagetype, sender) -> index in _deferred_messages, for DELIVERY.COALESCE_LATEST
+		self._coalesced_messages = {} # type: Dict[Tuple[str, Any], int]
+		# messagetype -> [broadcasts, deferred, coalesced, total delivery time, max delivery time]
+		self.statistics = None # type: Optional[Dict[str, List[Any]]]
 
 	def subscribe_globally(self, messagetype, callback: BusCallback):
 		"""Register for a certain message type."""
-		self.global_receivers[messagetype].append(callback)
+		receivers = self.global_receivers.get(messagetype)
+		if receivers is None:
+			receivers = self.global_receivers[messagetype] = []
+		receivers.append(callback)
 
 	def subscribe_locally(self, messagetype, instance, callback: BusCallback):
 		"""Register for a certain message type from a specific instance."""
 		pair = (messagetype, instance)
-		self.local_receivers[pair].append(callback)
+		receivers = self.local_receivers.get(pair)
+		if receivers is None:
+			receivers = self.local_receivers[pair] = []
+		receivers.append(callback)
 
 	def unsubscribe_globally(self, messagetype, callback: BusCallback):
-		assert callback in self.global_receivers[messagetype]
+		assert callback in self.global_receivers.get(messagetype, ())
 		self.global_receivers[messagetype].remove(callback)
 
 	def unsubscribe_locally(self, messagetype, instance, callback: BusCallback):
 		pair = (messagetype, instance)
-		assert callback in self.local_receivers[pair]
-		self.local_receivers[pair].remove(callback)
+		assert callback in self.local_receivers.get(pair, ())
+		receivers = self.local_receivers[pair]
+		receivers.remove(callback)
+		if not receivers:
+			# don't keep the instance alive
+			del self.local_receivers[pair]
 
 	def discard_globally(self, messagetype, callback: BusCallback):
-		if callback in self.global_receivers[messagetype]:
+		if callback in self.global_receivers.get(messagetype, ()):
 			self.unsubscribe_globally(messagetype, callback)
 
 	def discard_locally(self, messagetype, instance, callback: BusCallback):
 		pair = (messagetype, instance)
-		if pair in self.local_receivers and callback in self.local_receivers[pair]:
+		if callback in self.local_receivers.get(pair, ()):
 			self.unsubscribe_locally(messagetype, instance, callback)
 
+	def has_receivers(self, messagetype, sender):
+		"""Returns whether a message of this type from sender would reach anybody."""
+		return bool(self.global_receivers.get(messagetype)) or \
+		       (messagetype, sender) in self.local_receivers
+
 	def broadcast(self, message):
 		"""Send a message to the bus and broadcast it to all recipients"""
 		messagetype = message.__class__
-		for callback in self.global_receivers[messagetype]:
-			# Execute the callback
-			callback(message)
+		if self.statistics is not None:
+			self._count(messagetype, 0)
+		if messagetype.delivery != DELIVERY.IMMEDIATE and self._defer(message):
+			return
+		self._deliver(message)
 
-		pair = (messagetype, message.sender)
-		for callback in self.local_receivers[pair]:
-			# Execute the callback
-			callback(message)
+	def _deliver(self, message):
+		if self.statistics is not None:
+			start = time.perf_counter()
+
+		messagetype = message.__class__
+		receivers = self.global_receivers.get(messagetype)
+		if receivers:
+			for callback in receivers:
+				# Execute the callback
+				callback(message)
+
+		if self.local_receivers:
+			receivers = self.local_receivers.get((messagetype, message.sender))
+			if receivers:
+				for callback in receivers:
+					# Execute the callback
+					callback(message)
+
+		if self.statistics is not None:
+			duration = time.perf_counter() - start
+			entry = self.statistics[messagetype]
+			entry[3] += duration
+			entry[4] = max(entry[4], duration)
+
+	def _defer(self, message):
+		"""Queues message for delivery at the end of the current tick.
+		@return: whether the message has been deferred"""
+		from horizons.scheduler import Scheduler
+		scheduler = Scheduler.instance
+		if scheduler is None or not scheduler.in_tick:
+			return False
+
+		messagetype = message.__class__
+		if not self._deferred_messages:
+			scheduler.add_new_object(self._deliver_deferred, self, run_in=0)
+		if messagetype.delivery == DELIVERY.COALESCE_LATEST:
+			pair = (messagetype, message.sender)
+			index = self._coalesced_messages.get(pair)
+			if index is not None:
+				# replace the older message, but keep its position
+				self._deferred_messages[index] = message
+				if self.statistics is not None:
+					self._count(messagetype, 2)
+				return True
+			self._coalesced_messages[pair] = len(self._deferred_messages)
+
+		self._deferred_messages.append(message)
+		if self.statistics is not None:
+			self._count(messagetype, 1)
+		return True
+
+	def _deliver_deferred(self):
+		"""Delivers all messages deferred in the current tick."""
+		messages = self._deferred_messages
+		# messages broadcast by the receivers are deferred once again
+		self._deferred_messages = []
+		self._coalesced_messages = {}
+		for message in messages:
+			self._deliver(message)
+
+	def enable_statistics(self):
+		"""Start counting broadcasts and measuring delivery times per message type."""
+		if self.statistics is None:
+			self.statistics = {}
+
+	def _count(self, messagetype, field):
+		entry = self.statistics.get(messagetype)
+		if entry is None:
+			entry = self.statistics[messagetype] = [0, 0, 0, 0.0, 0.0]
+		entry[field] += 1
+
+	def get_statistics_report(self):
+		"""Returns a printable summary of the statistics, most expensive message types first.
+		@return: list of str, empty if statistics aren't enabled"""
+		if not self.statistics:
+			return []
+		lines = ['{:<32} {:>9} {:>9} {:>9} {:>10} {:>10}'.format(
+		         'message', 'count', 'deferred', 'coalesced', 'total ms', 'max ms')]
+		entries = sorted(self.statistics.items(), key=lambda item: item[1][3], reverse=True)
+		for messagetype, (count, deferred, coalesced, total, maximum) in entries:
+			lines.append('{:<32} {:>9} {:>9} {:>9} {:>10.3f} {:>10.3f}'.format(
+			             messagetype.__name__, count, deferred, coalesced, total * 1000, maximum * 1000))
+		return lines
 
 	def reset(self):
 		"""Reset to initial state. Drops all subscriptions"""
@@ -88,6 +203,8 @@ class MessageBus(object, metaclass=Singleton):
 		for messagetype, cb_list in self.local_receivers.items():
 			if cb_list:
 				self.log.debug("MessageBus: leftover local receivers {cb} for {messagetype}".format(cb=[str(i) for i in cb_list], messagetype=messagetype))
+		for line in self.get_statistics_report():
+			self.log.info(line)
 
 		# suicide, next instance will be created on demand
 		self.__class__.destroy_instance()
@@ -51,10 +51,9 @@ class QueuingMessageBus(MessageBus):
 
 	def broadcast(self, message):
 		messagetype = message.__class__
-		pair = (messagetype, message.sender)
 
 		# check if the message will go anywhere, if not, then queue it
-		if not len(self.global_receivers[messagetype]) and not len(self.local_receivers[pair]):
+		if not self.has_receivers(messagetype, message.sender):
 			self.message_queue[messagetype].append(message)
 		else:
 			MessageBus.broadcast(self, message)
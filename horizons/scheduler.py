@@ -32,11 +32,15 @@ class Scheduler(LivingObject, metaclass=ManualConstructionSingleton):
 	""""Class providing timed callbacks.
 	Master of time.
 
-	TODO:
-	- Refactor to use a data structure that is suitable for iteration (ticking) as well as
-	  searching/deleting by instance, possibly also by callback.
-	  Suggestion: { tick -> { instance -> [callback] }} (basically a k-d tree)
-
+	Pending callbacks are kept in a two-level timing wheel: the ticks of the current
+	wheel rotation map directly to a slot, everything further in the future is kept in
+	a coarse bucket per rotation and distributed into the slots once that rotation starts.
+	Every scheduled call is represented by a one-element handle list, removing a call
+	just clears its handle. The cleared handles (tombstones) are skipped while ticking
+	and compacted once they make up most of the queued entries. Calls removed during a
+	tick are only compacted after it, since the slot of the tick is being iterated.
+	Calls are additionally indexed by their class instance, so that removing all calls of
+	an instance only touches the calls of that instance.
 
 	@param timer: Timer instance the schedular registers itself with.
 	"""
@@ -46,21 +50,35 @@ class Scheduler(LivingObject, metaclass=ManualConstructionSingleton):
 	# the tick with this id is actually executed, and no tick with a smaller number can occur
 	FIRST_TICK_ID = 0
 
+	# number of ticks covered by one rotation of the wheel (must be a power of two)
+	WHEEL_BITS = 8
+	WHEEL_SIZE = 1 << WHEEL_BITS
+	WHEEL_MASK = WHEEL_SIZE - 1
+
+	# compact the queues if there are more tombstones than this and they are the majority
+	COMPACT_THRESHOLD = 1024
+
 	def __init__(self, timer):
 		"""
 		@param timer: Timer obj
 		"""
 		super().__init__()
-		self.schedule = {}
-		self.additional_cur_tick_schedule = [] # jobs to be executed at the same tick they were added
-		self.calls_by_instance = {} # for get_classinst_calls
+		self._wheel = [deque() for i in range(self.WHEEL_SIZE)] # slot -> handles of that tick
+		self._overflow = {} # rotation -> handles of ticks in that rotation, in insertion order
 		self.cur_tick = self.__class__.FIRST_TICK_ID - 1 # before ticking
+		self._rotation = self.cur_tick >> self.WHEEL_BITS
+		self._queued = 0 # number of handles in wheel and overflow, including tombstones
+		self._tombstones = 0
+		self.additional_cur_tick_schedule = [] # jobs to be executed at the same tick they were added
+		self.calls_by_instance = {} # instance -> {CallbackObject: None}, for get_classinst_calls
+		self.in_tick = False # whether a tick is being executed right now
 		self.timer = timer
 		self.timer.add_call(self.tick)
 
 	def end(self):
-		self.log.debug("Scheduler end; len: %s", len(self.schedule))
-		self.schedule = None
+		self.log.debug("Scheduler end; len: %s", self._queued - self._tombstones)
+		self._wheel = None
+		self._overflow = None
 		self.timer.remove_call(self.tick)
 		self.timer = None
 		super().end()
@@ -76,44 +94,57 @@ class Scheduler(LivingObject, metaclass=ManualConstructionSingleton):
 			horizons.main.quit()
 			return
 
-		if self.cur_tick in self.schedule:
-			self.log.debug("Scheduler: tick %s, cbs: %s", self.cur_tick, len(self.schedule[self.cur_tick]))
+		self.in_tick = True
+		rotation = tick_id >> self.WHEEL_BITS
+		if rotation != self._rotation:
+			self._cascade(rotation)
+
+		# use iteration method that works in case the deque is altered during iteration
+		# callbacks of the current tick are appended to it by add_object
+		cur_schedule = self._wheel[tick_id & self.WHEEL_MASK]
+		if cur_schedule:
+			self.log.debug("Scheduler: tick %s, cbs: %s", self.cur_tick, len(cur_schedule))
 
-			# use iteration method that works in case the list is altered during iteration
-			# this can happen for e.g. rem_all_classinst_calls
-			cur_schedule = self.schedule[self.cur_tick]
 			while cur_schedule:
-				callback = cur_schedule.popleft()
+				handle = cur_schedule.popleft()
+				self._queued -= 1
+				callback = handle[0]
+				handle[0] = None
 				# TODO: some system-level unit tests fail if this list is not processed in the correct order
 				#       (i.e. if e.g. pop() was used here). This is an indication of invalid assumptions
 				#       in the program and should be fixed.
 
-				if hasattr(callback, "invalid"):
-					self.log.debug("S(t:%s): %s: INVALID", tick_id, callback)
+				if callback is None:
+					self._tombstones -= 1
 					continue
+				callback.handle = None
 				self.log.debug("S(t:%s): %s", tick_id, callback)
 				callback.callback()
 				assert callback.loops >= -1
+
+				calls = self.calls_by_instance.get(callback.class_instance)
+				if calls is None or callback not in calls:
+					continue # removed during its own execution, e.g. by rem_all_classinst_calls
+				if callback.handle is not None:
+					continue # already added again during its own execution
 				if callback.loops != 0:
 					self.add_object(callback, readd=True)
 				else: # gone for good
-					if callback.class_instance in self.calls_by_instance:
-						# this can already be removed by e.g. rem_all_classinst_calls
-						if callback.finish_callback is not None:
-							callback.finish_callback()
-
-						try:
-							self.calls_by_instance[callback.class_instance].remove(callback)
-						except ValueError:
-							pass # also the callback can be deleted by e.g. rem_call
-			del self.schedule[self.cur_tick]
+					del calls[callback]
+					if not calls:
+						del self.calls_by_instance[callback.class_instance]
+					if callback.finish_callback is not None:
+						callback.finish_callback()
 
 			self.log.debug("Scheduler: finished tick %s", self.cur_tick)
 
 		# run jobs added in the loop above
 		self._run_additional_jobs()
+		self.in_tick = False
 
-		assert (not self.schedule) or next(iter(self.schedule.keys())) > self.cur_tick
+		# compaction replaces the slot deques, which must not happen while one is iterated
+		if self._needs_compaction():
+			self._compact()
 
 	def before_ticking(self):
 		"""Called after game load and before game has started.
@@ -129,6 +160,62 @@ class Scheduler(LivingObject, metaclass=ManualConstructionSingleton):
 			callback.callback()
 		self.additional_cur_tick_schedule = []
 
+	def _cascade(self, rotation):
+		"""Moves the calls of the new wheel rotation from their coarse bucket to the wheel slots.
+		All slots are empty at this point, so the order of the calls per tick is kept."""
+		self._rotation = rotation
+		handles = self._overflow.pop(rotation, None)
+		if not handles:
+			return
+		wheel = self._wheel
+		mask = self.WHEEL_MASK
+		for handle in handles:
+			callback = handle[0]
+			if callback is None:
+				self._queued -= 1
+				self._tombstones -= 1
+			else:
+				wheel[callback.tick & mask].append(handle)
+
+	def _enqueue(self, callback_obj, tick_key):
+		handle = [callback_obj]
+		callback_obj.tick = tick_key
+		callback_obj.handle = handle
+		rotation = tick_key >> self.WHEEL_BITS
+		if rotation == self._rotation:
+			self._wheel[tick_key & self.WHEEL_MASK].append(handle)
+		else:
+			assert rotation > self._rotation
+			if rotation not in self._overflow:
+				self._overflow[rotation] = []
+			self._overflow[rotation].append(handle)
+		self._queued += 1
+
+	def _cancel(self, callback_obj):
+		"""Removes a queued call in O(1) by turning its handle into a tombstone."""
+		handle = callback_obj.handle
+		if handle is None:
+			return
+		handle[0] = None
+		callback_obj.handle = None
+		self._tombstones += 1
+		if not self.in_tick and self._needs_compaction():
+			self._compact()
+
+	def _needs_compaction(self):
+		return self._tombstones > self.COMPACT_THRESHOLD and 2 * self._tombstones > self._queued \
+		   and self._wheel is not None
+
+	def _compact(self):
+		"""Drops all tombstones from the queues."""
+		for i, slot in enumerate(self._wheel):
+			if slot:
+				self._wheel[i] = deque(handle for handle in slot if handle[0] is not None)
+		for rotation, handles in self._overflow.items():
+			self._overflow[rotation] = [handle for handle in handles if handle[0] is not None]
+		self._queued -= self._tombstones
+		self._tombstones = 0
+
 	def add_object(self, callback_obj, readd=False):
 		"""Adds a new CallbackObject instance to the callbacks list for the first time
 		@param callback_obj: CallbackObject type object, containing all necessary  information
@@ -140,15 +227,11 @@ class Scheduler(LivingObject, metaclass=ManualConstructionSingleton):
 			self.additional_cur_tick_schedule.append(callback_obj)
 		else: # default: run in future tick
 			interval = callback_obj.loop_interval if readd else callback_obj.run_in
-			tick_key = self.cur_tick + interval
-			if tick_key not in self.schedule:
-				self.schedule[tick_key] = deque()
-			callback_obj.tick = tick_key
-			self.schedule[tick_key].append(callback_obj)
+			self._enqueue(callback_obj, self.cur_tick + interval)
 			if not readd:  # readded calls haven't been removed here
 				if callback_obj.class_instance not in self.calls_by_instance:
-					self.calls_by_instance[callback_obj.class_instance] = []
-				self.calls_by_instance[callback_obj.class_instance].append(callback_obj)
+					self.calls_by_instance[callback_obj.class_instance] = {}
+				self.calls_by_instance[callback_obj.class_instance][callback_obj] = None
 
 	def add_new_object(self, callback, class_instance, run_in=1, loops=1, loop_interval=None, finish_callback=None):
 		"""Creates a new CallbackObject instance and calls the self.add_object() function.
@@ -165,32 +248,22 @@ class Scheduler(LivingObject, metaclass=ManualConstructionSingleton):
 		@param callback_obj: CallbackObject to remove
 		@return: int, number of removed calls
 		"""
-		removed_objs = 0
-		if self.schedule is not None:
-			for key in self.schedule:
-				while callback_obj in self.schedule[key]:
-					self.schedule[key].remove(callback_obj)
-					self.calls_by_instance[callback_obj.class_instance].remove(callback_obj)
-					removed_objs += 1
-
-		if not self.calls_by_instance[callback_obj.class_instance]:
-			del self.calls_by_instance[callback_obj.class_instance]
+		calls = self.calls_by_instance.get(callback_obj.class_instance)
+		if calls is None or callback_obj not in calls:
+			return 0
 
-		return removed_objs
+		self._cancel(callback_obj)
+		del calls[callback_obj]
+		if not calls:
+			del self.calls_by_instance[callback_obj.class_instance]
+		return 1
 
 	def rem_all_classinst_calls(self, class_instance):
 		"""Removes all callbacks from the scheduler that belong to the class instance class_inst."""
-		"""
-		for key in self.schedule:
-			callback_objects = self.schedule[key]
-			for i in xrange(len(callback_objects) - 1, -1, -1):
-				if callback_objects[i].class_instance is class_instance:
-					del callback_objects[i]
-		"""
-		if class_instance in self.calls_by_instance:
-			for callback_obj in self.calls_by_instance[class_instance]:
-				callback_obj.invalid = True # don't remove, finding them all takes too long
-			del self.calls_by_instance[class_instance]
+		calls = self.calls_by_instance.pop(class_instance, None)
+		if calls is not None:
+			for callback_obj in calls:
+				self._cancel(callback_obj)
 
 		# filter additional callbacks as well
 		self.additional_cur_tick_schedule = \
@@ -205,30 +278,19 @@ class Scheduler(LivingObject, metaclass=ManualConstructionSingleton):
 		"""
 		assert callable(callback)
 		removed_calls = 0
-		for key in self.schedule:
-			callback_objects = self.schedule[key]
-			for i in range(len(callback_objects) - 1, -1, -1):
-				if (callback_objects[i].class_instance is instance
-				    and callback_objects[i].callback == callback
-				    and not hasattr(callback_objects[i], "invalid")):
-					del callback_objects[i]
-					removed_calls += 1
-
-		test = 0
-		if removed_calls > 0: # there also must be calls in the calls_by_instance dict
-			for i in range(len(self.calls_by_instance[instance]) - 1, -1, -1):
-				obj = self.calls_by_instance[instance][i]
-				if obj.callback == callback:
-					del self.calls_by_instance[instance][i]
-					test += 1
-			assert test == removed_calls, "{}, {}".format(test, removed_calls)
-			if not self.calls_by_instance[instance]:
+		calls = self.calls_by_instance.get(instance)
+		if calls is not None:
+			for callback_obj in [obj for obj in calls if obj.callback == callback]:
+				self._cancel(callback_obj)
+				del calls[callback_obj]
+				removed_calls += 1
+			if not calls:
 				del self.calls_by_instance[instance]
 
 		for i in range(len(self.additional_cur_tick_schedule) - 1, -1, -1):
 			if self.additional_cur_tick_schedule[i].class_instance is instance and \
 				self.additional_cur_tick_schedule[i].callback == callback:
-					del callback_objects[i]
+					del self.additional_cur_tick_schedule[i]
 					removed_calls += 1
 
 		return removed_calls
@@ -290,6 +352,9 @@ class _CallbackObject:
 		self.loop_interval = loop_interval if loop_interval is not None else run_in
 		self.class_instance = class_instance
 
+		self.tick = None # tick of the next execution, set by the scheduler
+		self.handle = None # queue entry of the next execution, None if not queued
+
 	def __str__(self):
 		cb = str(self.callback)
 		if "_move_tick" in cb: # very crude measure to reduce log noise
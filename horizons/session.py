@@ -45,10 +45,9 @@ from horizons.messaging.queuingmessagebus import QueuingMessageBus
 from horizons.savegamemanager import SavegameManager
 from horizons.scenario import ScenarioEventHandler
 from horizons.scheduler import Scheduler
-from horizons.util.dbreader import DbReader
 from horizons.util.living import LivingObject, livingProperty
 from horizons.util.savegameaccessor import SavegameAccessor
-from horizons.util.uhdbaccessor import read_savegame_template
+from horizons.util.savegamewriter import SavegameWriter
 from horizons.util.worldobject import WorldObject
 from horizons.view import View
 from horizons.world import World
@@ -400,7 +399,7 @@ class Session(LivingObject):
 				os.unlink(savegame)
 			self.savecounter += 1
 
-			db = DbReader(savegame)
+			db = SavegameWriter(savegame)
 		except IOError as e: # usually invalid filename
 			headline = T("Failed to create savegame file")
 			descr = T("There has been an error while creating your savegame file.")
@@ -417,7 +416,7 @@ class Session(LivingObject):
 			return self.save()
 
 		try:
-			read_savegame_template(db)
+			db.create_tables()
 
 			db("BEGIN")
 			self.world.save(db)
@@ -27,78 +27,111 @@ class BuildingIndexer:
 
 	Used to answer queries of the form 'I am at (x, y), where is the closest / random
 	building that provides resource X in my range'.
+
+	The buildings are kept in a grid of buckets. The sorted list of buildings in range
+	of a tile is computed when it is asked for and kept until the next change.
 	"""
 
-	def __init__(self, radius, coords_list, random=None, buildings=None):
+	MAX_CACHED_TILES = 4096
+
+	def __init__(self, radius, coords, random=None, buildings=None):
 		"""
 		Create a BuildingIndexer
 		@param radius: int, maximum required radius of the buildings
-		@param coords_list: list of tuples, the coordinates of the island
+		@param coords: the coordinates of the island, anything supporting `in` (e.g. a ground map)
 		@param random: the rng of the session
 		@param buildings: initial list of buildings. Will only be read.
 		"""
 		self.radius = radius
-		self._map = {}
-		for coords in coords_list:
-			self._map[coords] = BuildingIndex(coords, random)
-		self._add_set = set()
-		self._remove_set = set()
-		self._changed = False
+		self._coords = coords
+		self._random = random
+		self._cell_size = max(radius, 4)
+		self._cells = {} # {(cell x, cell y): {building: None, ...}, ...}
+		self._building_cells = {} # {building: [(cell x, cell y), ...], ...}
+		self._tile_cache = {} # {(x, y): [(distance squared, top, bottom, left, right, building), ...], ...}
 
 		if buildings:
-			self._update(add_buildings=buildings, initial=True)
+			for building in buildings:
+				self.add(building)
 
 	def add(self, building):
-		self._remove_set.discard(building)
-		self._add_set.add(building)
-		self._changed = True
+		if building in self._building_cells:
+			return
+		pos = building.position
+		cell_size = self._cell_size
+		cells = [(cell_x, cell_y)
+		         for cell_x in range(pos.left // cell_size, pos.right // cell_size + 1)
+		         for cell_y in range(pos.top // cell_size, pos.bottom // cell_size + 1)]
+		for cell in cells:
+			self._cells.setdefault(cell, {})[building] = None
+		self._building_cells[building] = cells
+		self._tile_cache.clear()
 
 	def remove(self, building):
-		self._add_set.discard(building)
-		self._remove_set.add(building)
-		self._changed = True
-
-	def _update(self, add_buildings=None, initial=False):
-		"""
-		@param add_buildings: Don't use unless you know why.
-		@param initial: can be set on first call as optimization
-		"""
-		for building in self._remove_set:
-			for coords in building.position.get_radius_coordinates(self.radius, include_self=True):
-				try:
-					index = self._map[coords]
-				except KeyError:
-					continue # should be faster than contains check, since usually True
-				index._remove_set.add(building)
-				index._add_set.discard(building)
-				index._changed = True
-
-		if not add_buildings:
-			add_buildings = self._add_set
-		for building in add_buildings:
-			for coords in building.position.get_radius_coordinates(self.radius, include_self=True):
-				try:
-					index = self._map[coords]
-				except KeyError:
-					continue # should be faster than contains check, since usually True
-				if not initial:
-					index._remove_set.discard(building)
-				index._add_set.add(building)
-				index._changed = True
-
-		self._changed = False
-		self._add_set.clear()
-		self._remove_set.clear()
+		cells = self._building_cells.pop(building, None)
+		if cells is None:
+			return
+		for cell in cells:
+			buildings = self._cells[cell]
+			del buildings[building]
+			if not buildings:
+				del self._cells[cell]
+		self._tile_cache.clear()
+
+	def _get_sorted_list(self, coords):
+		"""Returns the buildings in range of coords as sorted list of
+		(distance squared, top, bottom, left, right, building) tuples."""
+		sorted_list = self._tile_cache.get(coords)
+		if sorted_list is not None:
+			return sorted_list
+
+		x, y = coords
+		radius = self.radius
+		radius_squared = radius * radius
+		cell_size = self._cell_size
+		seen = set()
+		sorted_list = []
+		for cell_x in range((x - radius) // cell_size, (x + radius) // cell_size + 1):
+			for cell_y in range((y - radius) // cell_size, (y + radius) // cell_size + 1):
+				for building in self._cells.get((cell_x, cell_y), ()):
+					if building in seen:
+						continue
+					seen.add(building)
+					pos = building.position
+					left = pos.left
+					right = pos.right
+					top = pos.top
+					bottom = pos.bottom
+
+					x_diff = left - x
+					if x_diff < x - right:
+						x_diff = x - right
+					if x_diff < 0:
+						x_diff = 0
+
+					y_diff = top - y
+					if y_diff < y - bottom:
+						y_diff = y - bottom
+					if y_diff < 0:
+						y_diff = 0
+
+					distance_squared = x_diff * x_diff + y_diff * y_diff
+					if distance_squared <= radius_squared:
+						sorted_list.append((distance_squared, top, bottom, left, right, building))
+		sorted_list.sort()
+
+		if len(self._tile_cache) >= self.MAX_CACHED_TILES:
+			self._tile_cache.clear()
+		self._tile_cache[coords] = sorted_list
+		return sorted_list
 
 	def get_buildings_in_range(self, coords):
 		"""
 		Returns all buildings in range in the form of a Building generator
 		@param coords: tuple, the point around which to get the buildings
 		"""
-		if coords in self._map:
-			if self._changed:
-				self._update()
-			return self._map[coords].get_buildings_in_range()
+		if coords in self._coords:
+			return (element[5] for element in self._get_sorted_list(coords))
 		return []
 
 	def get_random_building_in_range(self, coords):
@@ -107,10 +140,10 @@ class BuildingIndexer:
 		Don't use this for user interactions unless you want to break multiplayer
 		@param coords: tuple, the point around which to get the building
 		"""
-		if coords in self._map:
-			if self._changed:
-				self._update()
-			return self._map[coords].get_random_building_in_range()
+		if coords in self._coords:
+			sorted_list = self._get_sorted_list(coords)
+			if sorted_list:
+				return self._random.choice(sorted_list)[5]
 		return None
 
 	def get_num_buildings_in_range(self, coords):
@@ -118,76 +151,5 @@ class BuildingIndexer:
 		Returns the number of buildings in range of the position
 		@param coords: tuple, the center point
 		"""
-		if coords in self._map:
-			if self._changed:
-				self._update()
-			return self._map[coords].get_num_buildings_in_range()
-
-
-class BuildingIndex:
-	"""
-	Indexes buildings around a tile to improve nearby building lookup speed.
-	The code isn't particularly pretty for performance reasons.
-	"""
-
-	def __init__(self, coords, random):
-		self._coords = coords
-		self._random = random
-		self._add_set = set()
-		self._remove_set = set()
-		self._list = []
-		self._changed = False
-
-	def _update(self):
-		new_list = []
-		for element in self._list:
-			if element[5] not in self._remove_set:
-				new_list.append(element)
-
-		x = self._coords[0]
-		y = self._coords[1]
-		for building in self._add_set:
-			pos = building.position
-			left = pos.left
-			right = pos.right
-			top = pos.top
-			bottom = pos.bottom
-
-			x_diff = left - x
-			if x_diff < x - right:
-				x_diff = x - right
-			if x_diff < 0:
-				x_diff = 0
-
-			y_diff = top - y
-			if y_diff < y - bottom:
-				y_diff = y - bottom
-			if y_diff < 0:
-				y_diff = 0
-
-			new_list.append((x_diff * x_diff + y_diff * y_diff, top, bottom, left, right, building))
-
-		self._list = new_list
-		self._list.sort()
-
-		self._add_set.clear()
-		self._remove_set.clear()
-		self._changed = False
-
-	def get_buildings_in_range(self):
-		if self._changed:
-			self._update()
-		for element in self._list:
-			yield element[5]
-
-	def get_random_building_in_range(self):
-		if self._changed:
-			self._update()
-		if self._list:
-			return self._random.choice(self._list)[5]
-		return None
-
-	def get_num_buildings_in_range(self):
-		if self._changed:
-			self._update()
-		return len(self._list)
+		if coords in self._coords:
+			return len(self._get_sorted_list(coords))
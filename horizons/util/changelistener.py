@@ -31,6 +31,9 @@ class ChangeListener:
 	The object that changes and the object that listens have to inherit from this class.
 	An object calls _changed every time something has changed, obviously.
 	This function calls every Callback, that has been registered to listen for a change.
+	Listeners that are added with coalesce=True are called at most once per scheduler tick:
+	all changes of the object during a tick are collected and delivered at the end of it.
+	Outside of ticks (e.g. while loading or paused), they are called immediately.
 	NOTE: ChangeListeners aren't saved, they have to be reregistered on load
 	NOTE: RemoveListeners must not access the object, as it is in progress of being destroyed.
 	"""
@@ -43,12 +46,17 @@ class ChangeListener:
 
 	def __init(self):
 		self.__listeners = WeakMethodList()
+		self.__coalesced_listeners = WeakMethodList()
 		self.__remove_listeners = WeakMethodList()
 		# number of event calls
 		# if any event is triggered increase the number, after all callbacks are executed decrease it
 		# if it reaches 0 it means that in the current object all event callbacks were executed
 		self.__event_call_number = 0
 		self.__hard_remove = True
+		# whether listeners have been replaced by None during an event call
+		self.__soft_removed = False
+		# whether a delivery to the coalesced listeners is scheduled
+		self.__coalesced_change_pending = False
 
 	def __remove_listener(self, listener_list, listener):
 		# check if the listener should be hard removed
@@ -58,12 +66,15 @@ class ChangeListener:
 				listener_list.remove(listener)
 			else:
 				listener_list[listener_list.index(listener)] = None
+				self.__soft_removed = True
 		except ValueError as e: # nicer error:
 			raise ValueError(str(e) +
 			                 "\nTried to remove: " + str(listener) + "\nat " + str(self) +
 			                 "\nList: " + str([str(i) for i in listener_list]))
 
 	def __call_listeners(self, listener_list):
+		if not listener_list:
+			return
 		# instead of removing from list, switch the listener in position to None
 		# this way, iteration won't be affected while listeners may modify the list
 		self.__hard_remove = False
@@ -82,21 +93,38 @@ class ChangeListener:
 
 		if self.__event_call_number == 0:
 			self.__hard_remove = True
-			listener_list[:] = [l for l in listener_list if l]
+			# only rebuild the lists if a listener actually was removed in the meantime
+			if self.__soft_removed:
+				self.__soft_removed = False
+				for l in (self.__listeners, self.__coalesced_listeners, self.__remove_listeners):
+					if l is not None:
+						l[:] = [i for i in l if i]
 
 	## Normal change listener
-	def add_change_listener(self, listener, call_listener_now=False, no_duplicates=False):
+	def add_change_listener(self, listener, call_listener_now=False, no_duplicates=False, coalesce=False):
+		"""
+		@param listener: callable that is called on every change
+		@param call_listener_now: also call the listener immediately
+		@param no_duplicates: don't add the listener if it has already been added
+		@param coalesce: call the listener only once per tick, after all changes of that tick
+		"""
 		assert callable(listener)
-		if not no_duplicates or listener not in self.__listeners:
-			self.__listeners.append(listener)
+		if not no_duplicates or not self.has_change_listener(listener):
+			if coalesce:
+				self.__coalesced_listeners.append(listener)
+			else:
+				self.__listeners.append(listener)
 		if call_listener_now: # also call if duplicate is added
 			listener()
 
 	def remove_change_listener(self, listener):
-		self.__remove_listener(self.__listeners, listener)
+		if listener in self.__listeners:
+			self.__remove_listener(self.__listeners, listener)
+		else:
+			self.__remove_listener(self.__coalesced_listeners, listener)
 
 	def has_change_listener(self, listener):
-		return (listener in self.__listeners)
+		return (listener in self.__listeners or listener in self.__coalesced_listeners)
 
 	def discard_change_listener(self, listener):
 		"""Remove listener if it's there"""
@@ -106,10 +134,28 @@ class ChangeListener:
 	def clear_change_listeners(self):
 		"""Removes all change listeners"""
 		self.__listeners = WeakMethodList()
+		self.__coalesced_listeners = WeakMethodList()
 
 	def _changed(self):
 		"""Calls every listener when an object changed"""
 		self.__call_listeners(self.__listeners)
+		if self.__coalesced_listeners and not self.__coalesced_change_pending:
+			self.__schedule_coalesced_change()
+
+	def __schedule_coalesced_change(self):
+		from horizons.scheduler import Scheduler
+		scheduler = Scheduler.instance
+		if scheduler is None or not scheduler.in_tick:
+			self.__call_listeners(self.__coalesced_listeners)
+			return
+		self.__coalesced_change_pending = True
+		# the list serves as class instance, so that removing all calls of self keeps this one
+		scheduler.add_new_object(self.__deliver_coalesced_change, self.__coalesced_listeners, run_in=0)
+
+	def __deliver_coalesced_change(self):
+		self.__coalesced_change_pending = False
+		if self.__coalesced_listeners is not None: # not removed in the meantime
+			self.__call_listeners(self.__coalesced_listeners)
 
 	## Removal change listener
 	def add_remove_listener(self, listener, no_duplicates=False):
@@ -138,6 +184,7 @@ class ChangeListener:
 
 	def end(self):
 		self.__listeners = None
+		self.__coalesced_listeners = None
 		self.__remove_listeners = None
 
 
@@ -49,6 +49,9 @@ class DbReader:
 		"""
 		assert not command.endswith(";")
 		command = '{};'.format(command)
+		return self._execute(command, args)
+
+	def _execute(self, command, args):
 		self.cur.execute(command, args)
 		return self.cur.fetchall()
 
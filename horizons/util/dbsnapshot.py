@@ -0,0 +1,146 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+import glob
+import hashlib
+import logging
+import os
+import sqlite3
+import tempfile
+import time
+
+
+class DbSnapshot:
+	"""Binary copy of a database that has been created from sql files.
+
+	Parsing the sql files is the expensive part of creating the game data database.
+	After the database has been created once, a copy of it is written to the cache
+	directory with the sqlite backup api. The name of the copy contains a hash of the
+	contents of the sql files, so it is only used as long as none of them changes.
+	It also contains a hash of the location of the sql files. Several installations may
+	share the cache directory, each one only replaces its own snapshots.
+
+	Errors while reading or writing snapshots are logged and otherwise ignored,
+	the caller then just has to execute the sql files.
+	"""
+
+	log = logging.getLogger("util.dbsnapshot")
+
+	# Increment this when the way snapshots are created changes.
+	version = 1
+
+	def __init__(self, dbfiles, cache_dir, prefix='gamedata'):
+		"""
+		@param dbfiles: paths of the sql files the database is created from
+		@param cache_dir: directory to keep the snapshot in
+		@param prefix: start of the snapshot file name
+		"""
+		self.dbfiles = dbfiles
+		self.cache_dir = cache_dir
+		self.prefix = prefix
+		self._filename = None
+
+		# identifies the snapshots of this installation, used to find the outdated ones
+		key = hashlib.sha1(str(self.version).encode())
+		for path in dbfiles:
+			key.update(os.path.abspath(path).encode())
+		self._own_prefix = '{}-{}'.format(prefix, key.hexdigest()[:16])
+
+	@property
+	def filename(self):
+		"""Path of the snapshot that belongs to the current content of the sql files."""
+		if self._filename is None:
+			key = hashlib.sha1()
+			for path in self.dbfiles:
+				with open(path, 'rb') as f:
+					key.update(f.read())
+			self._filename = os.path.join(self.cache_dir,
+			                              '{}-{}.sqlite'.format(self._own_prefix, key.hexdigest()))
+		return self._filename
+
+	def load(self, connection):
+		"""Copies the snapshot into the (empty) database.
+		@param connection: sqlite3 connection
+		@return: seconds it originally took to execute the sql files, or None if there is no usable snapshot"""
+		try:
+			if not os.path.exists(self.filename):
+				return None
+			source = sqlite3.connect('file:{}?mode=ro'.format(self.filename), uri=True)
+			try:
+				source.backup(connection)
+			finally:
+				source.close()
+			# the creation time is kept in the header, don't leave it in the copy
+			creation_time = connection.execute('PRAGMA user_version').fetchone()[0] / 1000000.0
+			connection.execute('PRAGMA user_version = 0')
+		except (OSError, sqlite3.Error) as e:
+			self.log.warning("Can't load database snapshot %s: %s", self._filename, e)
+			return None
+		return creation_time
+
+	def save(self, connection, creation_time):
+		"""Writes a snapshot of the database and removes the outdated ones of this installation.
+		@param connection: sqlite3 connection of the database that was created from the sql files
+		@param creation_time: seconds it took to execute the sql files"""
+		tmp_filename = None
+		try:
+			os.makedirs(self.cache_dir, exist_ok=True)
+			# write to a temporary file first, other processes might be reading the snapshot
+			fd, tmp_filename = tempfile.mkstemp(suffix='.tmp', prefix=self.prefix, dir=self.cache_dir)
+			os.close(fd)
+			target = sqlite3.connect(tmp_filename)
+			try:
+				connection.backup(target)
+				target.execute('PRAGMA user_version = {:d}'.format(int(creation_time * 1000000)))
+				target.commit()
+			finally:
+				target.close()
+			os.replace(tmp_filename, self.filename)
+			tmp_filename = None
+
+			for path in glob.glob(os.path.join(self.cache_dir, glob.escape(self._own_prefix) + '-*.sqlite')):
+				if path != self.filename:
+					os.remove(path)
+		except (OSError, sqlite3.Error) as e:
+			self.log.warning("Can't write database snapshot %s: %s", self._filename, e)
+		finally:
+			if tmp_filename is not None and os.path.exists(tmp_filename):
+				os.remove(tmp_filename)
+
+	def create(self, connection, execute_sql):
+		"""Fills the database, from the snapshot if possible, and logs how long it took.
+		@param connection: sqlite3 connection of an empty database
+		@param execute_sql: callable that executes the sql files on the database
+		"""
+		start = time.time()
+		creation_time = self.load(connection)
+		if creation_time is not None:
+			self.log.info("Loaded %s from snapshot in %.4f s (executing the sql files took %.4f s)",
+			               self.prefix, time.time() - start, creation_time)
+			return
+
+		start = time.time()
+		execute_sql()
+		creation_time = time.time() - start
+		self.save(connection, creation_time)
+		self.log.info("Created %s from sql files in %.4f s, snapshot written in %.4f s",
+		               self.prefix, creation_time, time.time() - start - creation_time)
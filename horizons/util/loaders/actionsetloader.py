@@ -21,6 +21,7 @@
 
 import logging
 import os
+import time
 from typing import Dict
 
 import horizons.globals
@@ -59,11 +60,12 @@ class ActionSetLoader:
 	def load(cls):
 		if not cls._loaded:
 			cls.log.debug("Loading action_sets...")
+			start = time.perf_counter()
 			if not horizons.globals.fife.use_atlases:
 				cls._find_action_sets(PATHS.ACTION_SETS_DIRECTORY)
 			else:
 				cls.action_sets = JsonDecoder.load(PATHS.ACTION_SETS_JSON_FILE)
-			cls.log.debug("Done!")
+			cls.log.debug("Done! Loaded %d action sets in %.3fs", len(cls.action_sets), time.perf_counter() - start)
 			cls._loaded = True
 
 	@classmethod
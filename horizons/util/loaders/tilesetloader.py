@@ -21,6 +21,7 @@
 
 import logging
 import os
+import time
 from typing import Dict, List
 
 import horizons.globals
@@ -59,11 +60,12 @@ class TileSetLoader:
 	def load(cls):
 		if not cls._loaded:
 			cls.log.debug("Loading tile_sets...")
+			start = time.perf_counter()
 			if not horizons.globals.fife.use_atlases:
 				cls._find_tile_sets(PATHS.TILE_SETS_DIRECTORY)
 			else:
 				cls.tile_sets = JsonDecoder.load(PATHS.TILE_SETS_JSON_FILE)
-			cls.log.debug("Done!")
+			cls.log.debug("Done! Loaded %d tile sets in %.3fs", len(cls.tile_sets), time.perf_counter() - start)
 			cls._loaded = True
 
 	@classmethod
@@ -0,0 +1,196 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import logging
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from horizons.constants import MAP
+from horizons.util.random_map import create_random_island, generate_random_map
+
+
+class _GroundCollector:
+	"""Takes the place of the map database for create_random_island and keeps the
+	ground id of every tile that is written."""
+
+	def __init__(self):
+		self.ground = {}
+
+	def __call__(self, command, *args):
+		if command.startswith('INSERT INTO ground '):
+			island_id, x, y, ground_id = args[:4]
+			self.ground[(x, y)] = ground_id
+		else:
+			assert command in ('BEGIN TRANSACTION', 'COMMIT'), command
+
+
+def render_random_map_preview(size, parameters, island_color, water_color):
+	"""Renders the preview of a random map.
+
+	The result looks like the preview of the world created by load_raw_world, colored
+	with iter_minimap_points_colors, but neither fife, the game database nor a world
+	is needed for it.
+	@param size: tuple (width, height) of the preview in pixels
+	@param parameters: tuple of the arguments of generate_random_map
+	@param island_color: (r, g, b) color of land
+	@param water_color: (r, g, b) color of water
+	@return: bytes with the (r, g, b) values of all pixels, row by row
+	"""
+	ground = {}
+	for island_id, island_string in enumerate(generate_random_map(*parameters)):
+		collector = _GroundCollector()
+		create_random_island(collector, island_id, island_string)
+		# where islands overlap, the world keeps the tiles of the first one
+		for coords, ground_id in collector.ground.items():
+			ground.setdefault(coords, ground_id)
+
+	# the map dimensions are calculated like in World.load_raw_map
+	min_x, min_y, max_x, max_y = 0, 0, 0, 0
+	if ground:
+		xs, ys = zip(*ground)
+		min_x, min_y = min(min(xs), 0), min(min(ys), 0)
+		max_x, max_y = max(max(xs), 0), max(max(ys), 0)
+	min_x -= MAP.PADDING
+	min_y -= MAP.PADDING
+	max_x += MAP.PADDING
+	max_y += MAP.PADDING
+
+	# transform the minimap coordinates like _MinimapTransform.minimap_to_world without rotation
+	width, height = size
+	ratio_x = width / (max_x - min_x + 1)
+	ratio_y = height / (max_y - min_y + 1)
+	center_x, center_y = (max_x + min_x) // 2, (max_y + min_y) // 2
+	location_center_x, location_center_y = (width - 1) // 2, (height - 1) // 2
+	world_xs = [int((x - location_center_x) / ratio_x + center_x) for x in range(width)]
+
+	island_pixel = bytes(island_color)
+	water_pixel = bytes(water_color)
+	data = bytearray()
+	for y in range(height):
+		world_y = int((y - location_center_y) / ratio_y + center_y)
+		for world_x in world_xs:
+			data += island_pixel if ground.get((world_x, world_y), 0) > 0 else water_pixel
+	return bytes(data)
+
+
+def iter_preview_points(size, data):
+	"""Returns an iterator over the pixels of a rendered preview, as (x, y, r, g, b) tuples.
+	@param size: tuple (width, height) of the preview in pixels
+	@param data: result of render_random_map_preview
+	"""
+	width, height = size
+	for y in range(height):
+		offset = y * width * 3
+		for x in range(width):
+			i = offset + x * 3
+			yield (x, y, data[i], data[i + 1], data[i + 2])
+
+
+class RandomMapPreviewGenerator:
+	"""Renders random map previews in a worker process and caches them.
+
+	Previews that have been rendered before are returned immediately. While the
+	worker renders a preview, only the most recent request is kept; the ones
+	before it are outdated anyway.
+	"""
+	log = logging.getLogger("util.mappreview")
+
+	# number of previews to keep, each one is width * height * 3 bytes
+	cache_size = 64
+
+	def __init__(self, island_color, water_color):
+		self._colors = (tuple(island_color), tuple(water_color))
+		self._cache = OrderedDict() # type: OrderedDict
+		self._executor = None
+		self._future = None
+		self._future_key = None
+		self._pending = None
+
+	def request(self, size, parameters, callback):
+		"""Requests the preview of a random map.
+		@param size: tuple (width, height) of the preview in pixels
+		@param parameters: tuple of the arguments of generate_random_map
+		@param callback: called with the size and the preview data once the preview is
+		                 available, or None as data if rendering it failed. Call poll
+		                 regularly to receive it.
+		@return: whether the preview was cached and callback has been called already
+		"""
+		key = (tuple(size), tuple(parameters))
+		data = self._cache.get(key)
+		if data is not None:
+			self._cache.move_to_end(key)
+			self._pending = None
+			callback(key[0], data)
+			return True
+
+		self._pending = (key, callback)
+		if self._future is None:
+			self._start_pending()
+		return False
+
+	def is_busy(self):
+		"""Returns whether a preview is being rendered or waits to be rendered."""
+		return self._future is not None or self._pending is not None
+
+	def poll(self):
+		"""Collects a finished preview and starts rendering the next one.
+		Callbacks are only called from here, so they always run in the calling thread."""
+		if self._future is None or not self._future.done():
+			return
+
+		future, key = self._future, self._future_key
+		self._future = self._future_key = None
+		try:
+			data = future.result()
+		except Exception:
+			self.log.exception("Rendering the map preview failed")
+			data = None
+		else:
+			self._add_to_cache(key, data)
+
+		if self._pending is not None and self._pending[0] == key:
+			callback = self._pending[1]
+			self._pending = None
+			callback(key[0], data)
+		elif self._pending is not None:
+			self._start_pending()
+
+	def end(self):
+		self._pending = None
+		self._future = self._future_key = None
+		if self._executor is not None:
+			self._executor.shutdown(wait=False)
+			self._executor = None
+
+	def _start_pending(self):
+		key = self._pending[0]
+		if self._executor is None:
+			# spawn a fresh interpreter, forking would copy the engine and its threads
+			context = multiprocessing.get_context('spawn')
+			self._executor = ProcessPoolExecutor(max_workers=1, mp_context=context)
+		self._future = self._executor.submit(render_random_map_preview, key[0], key[1], *self._colors)
+		self._future_key = key
+
+	def _add_to_cache(self, key, data):
+		self._cache[key] = data
+		while len(self._cache) > self.cache_size:
+			self._cache.popitem(last=False)
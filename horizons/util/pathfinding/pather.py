@@ -21,11 +21,12 @@
 
 import logging
 import weakref
+from collections import OrderedDict
 from typing import List, Tuple
 
 from horizons.util.pathfinding import PathBlockedError
-from horizons.util.pathfinding.pathfinding import FindPath
-from horizons.util.shapes import Point
+from horizons.util.pathfinding.pathfinding import GridFindPath, PathDistanceField
+from horizons.util.shapes import Circle, ConstPoint, Point, Rect
 
 
 """
@@ -84,7 +85,7 @@ class AbstractPather:
 		source = self.unit.position
 		if self.unit.is_moving() and self.path:
 			# we are moving, use next step as source
-			source = Point(*self.path[self.cur])
+			source = ConstPoint.get(self.path[self.cur])
 		else:
 			# check if we are in a building
 			building = self.session.world.get_building(self.unit.position)
@@ -105,11 +106,7 @@ class AbstractPather:
 		if source is None:
 			source = self._get_position()
 
-		# call algorithm
-		# to use a different pathfinding code, just change the following line
-		path = FindPath()(source, destination, self._get_path_nodes(),
-		                  self._get_blocked_coords(), self.move_diagonal,
-		                  self.make_target_walkable)
+		path = self._find_path(source, destination)
 
 		if path is None:
 			return False
@@ -122,6 +119,24 @@ class AbstractPather:
 
 		return True
 
+	def _find_path(self, source, destination):
+		"""Runs the pathfinding algorithm.
+		@return: list of coords tuples or None if there is no path"""
+		# to use a different pathfinding code, just change the following line
+		return GridFindPath()(source, destination, self._get_path_nodes(),
+		                      self._get_blocked_coords(), self.move_diagonal,
+		                      self.make_target_walkable)
+
+	def get_path_nodes_change_id(self):
+		"""Returns a value that changes whenever the path nodes change.
+		@return: change id or None if changes of the path nodes aren't tracked"""
+		return None
+
+	def get_distance_field(self, source):
+		"""Returns the travel distances from source to all reachable path nodes.
+		@return: PathDistanceField instance"""
+		return PathDistanceField(source, self._get_path_nodes(), self.move_diagonal)
+
 	def move_on_path(self, path, source=None, destination_in_building=False):
 		"""Start moving on a precalculated path.
 		@param path: return value of FindPath()()
@@ -154,7 +169,7 @@ class AbstractPather:
 			# path is suddenly blocked, find another path
 			self.cur -= 1 # reset, since move is not possible
 			# try to calculate another path
-			if not self.calc_path(Point(*self.path[-1]), self.destination_in_building):
+			if not self.calc_path(ConstPoint.get(self.path[-1]), self.destination_in_building):
 				self.log.info("tile suddenly %s %s blocked for %s %s",
 				               self.path[self.cur][0], self.path[self.cur][1], self.unit, self.unit.worldid)
 				# no other path can be found. since the problem cannot be fixed here,
@@ -169,17 +184,17 @@ class AbstractPather:
 			self.source_in_building = False
 			self.unit.show()
 
-		return Point(*self.path[self.cur])
+		return ConstPoint.get(self.path[self.cur])
 
 	def get_move_source(self):
 		"""Returns the source Point of the current movement.
 		@return: Point or None if no path has been calculated"""
-		return None if not self.path else Point(*self.path[0])
+		return None if not self.path else ConstPoint.get(self.path[0])
 
 	def get_move_target(self):
 		"""Returns the point where the path leads
 		@return: Point or None if no path has been calculated"""
-		return None if not self.path else Point(*self.path[-1])
+		return None if not self.path else ConstPoint.get(self.path[-1])
 
 	def end_move(self):
 		"""Pretends that the path is finished in order to make the unit stop"""
@@ -210,6 +225,58 @@ class AbstractPather:
 			return True
 
 
+class ShipRouteCache:
+	"""LRU cache of recently calculated ship paths, shared by all ShipPathers of a world.
+
+	Ships on trade routes travel between the same warehouses over and over, so their paths
+	are stored by source and destination. A cached path is only used if none of its tiles
+	is currently occupied by a ship, else it is dropped and calculated again.
+	"""
+	SIZE = 64
+
+	def __init__(self):
+		self._paths = OrderedDict() # (source key, destination key) -> path
+
+	@classmethod
+	def _get_key(cls, shape):
+		"""Returns an immutable key for a pathfinding source or destination,
+		None if it can't be cached."""
+		if hasattr(shape, 'position'):
+			shape = shape.position
+		if isinstance(shape, Point):
+			return (Point, shape.x, shape.y)
+		elif isinstance(shape, Rect):
+			return (Rect, shape.left, shape.top, shape.right, shape.bottom)
+		elif isinstance(shape, Circle):
+			return (Circle, shape.center.x, shape.center.y, shape.radius)
+		return None
+
+	def get(self, source, destination, blocked_coords):
+		"""Returns a copy of the cached path or None if there is no unblocked one."""
+		key = (self._get_key(source), self._get_key(destination))
+		path = self._paths.get(key)
+		if path is None:
+			return None
+		if any(coords in blocked_coords for coords in path[1:]):
+			del self._paths[key]
+			return None
+		self._paths.move_to_end(key)
+		return list(path)
+
+	def add(self, source, destination, path):
+		source_key = self._get_key(source)
+		destination_key = self._get_key(destination)
+		if source_key is None or destination_key is None:
+			return
+		self._paths[(source_key, destination_key)] = list(path)
+		self._paths.move_to_end((source_key, destination_key))
+		if len(self._paths) > self.SIZE:
+			self._paths.popitem(last=False)
+
+	def clear(self):
+		self._paths.clear()
+
+
 class ShipPather(AbstractPather):
 	"""Pather for ships (units that move on water tiles)"""
 	def __init__(self, unit, *args, **kwargs):
@@ -222,6 +289,44 @@ class ShipPather(AbstractPather):
 	def _get_blocked_coords(self):
 		return self.session.world.ship_map
 
+	def _get_water_bodies(self):
+		"""Returns dict {(x, y): water body id} of the path nodes."""
+		return self.session.world.water_body
+
+	def _get_route_cache(self):
+		return self.session.world.ship_route_cache
+
+	def _may_be_reachable(self, source, destination):
+		"""Checks whether destination is in the same water body as source.
+		@return: False if destination certainly can't be reached"""
+		if hasattr(source, 'position'):
+			source = source.position
+		if hasattr(destination, 'position'):
+			destination = destination.position
+
+		water_bodies = self._get_water_bodies()
+		source_bodies = set()
+		for coords in source.tuple_iter():
+			if coords not in water_bodies:
+				return True # source is on land, it may be next to any water body
+			source_bodies.add(water_bodies[coords])
+		return any(water_bodies.get(coords) in source_bodies for coords in destination.tuple_iter())
+
+	def _find_path(self, source, destination):
+		if not self._may_be_reachable(source, destination):
+			return None
+
+		route_cache = self._get_route_cache()
+		if route_cache is None:
+			return super()._find_path(source, destination)
+
+		path = route_cache.get(source, destination, self._get_blocked_coords())
+		if path is None:
+			path = super()._find_path(source, destination)
+			if path is not None:
+				route_cache.add(source, destination, path)
+		return path
+
 
 class FisherShipPather(ShipPather):
 	"""Can also drive through shallow water"""
@@ -232,6 +337,13 @@ class FisherShipPather(ShipPather):
 		# don't let fisher be blocked by other ships (#1023)
 		return []
 
+	def _get_water_bodies(self):
+		return self.session.world.shallow_water_body
+
+	def _get_route_cache(self):
+		# fishers only travel between their home and fish
+		return None
+
 
 class BuildingCollectorPather(AbstractPather):
 	"""Pather for collectors, that move freely (without depending on roads)
@@ -243,6 +355,10 @@ class BuildingCollectorPather(AbstractPather):
 		from horizons.component.collectingcomponent import CollectingComponent
 		return self.unit.home_building.get_component(CollectingComponent).path_nodes.nodes
 
+	def get_path_nodes_change_id(self):
+		# the path nodes of a home building never change
+		return 0
+
 
 class RoadPather(AbstractPather):
 	"""Pather for collectors, that depend on roads (e.g. the one used for the warehouse)"""
@@ -253,6 +369,14 @@ class RoadPather(AbstractPather):
 	def _get_path_nodes(self):
 		return self.island.path_nodes.road_nodes
 
+	def get_path_nodes_change_id(self):
+		return self.island.path_nodes.road_change_id
+
+	def _find_path(self, source, destination):
+		if not self.island.path_nodes.may_be_road_connected(source, destination):
+			return None
+		return super()._find_path(source, destination)
+
 
 class SoldierPather(AbstractPather):
 	"""Pather for units, that move absolutely freely (such as soldiers)
@@ -293,4 +417,6 @@ class StaticPather:
 		@param island: island to search path on
 		@param source, destination: Point or anything supported by FindPath
 		@return: list of tuples or None in case no path is found"""
-		return FindPath()(source, destination, island.path_nodes.road_nodes)
+		if not island.path_nodes.may_be_road_connected(source, destination):
+			return None
+		return GridFindPath()(source, destination, island.path_nodes.road_nodes)
@@ -20,6 +20,9 @@
 # ###################################################
 
 import logging
+from heapq import heappop, heappush
+
+from horizons.util.pathfinding.pathnodes import PathNodeGrid
 
 
 """
@@ -149,7 +152,6 @@ class FindPath:
 		if not dest_coords_set:
 			return None
 
-		from heapq import heappush, heappop
 		heap = []
 		for coords, data in to_check.items():
 			heappush(heap, (data[2], coords))
@@ -246,3 +248,172 @@ class FindPath:
 
 		else:
 			return None
+
+
+class GridFindPath(FindPath):
+	"""FindPath backend for path nodes stored in a PathNodeGrid.
+
+	Runs the same search as FindPath, but on flat array indices of the grid instead of
+	(x, y) tuples in dicts. The per-search state lives in buffers of the grid that are reused
+	between calls. The heap itself is a new list per search, with one (estimate, index)
+	tuple per push. Since the heap entries are ordered by (estimate, index), and the index
+	order equals the order of the coordinate tuples, the found paths are identical to
+	the ones of FindPath.
+	Falls back to FindPath if the path nodes are no complete grid or the source or the
+	destination are not inside of the grid.
+	"""
+
+	def execute(self):
+		grid = self.path_nodes
+		if not isinstance(grid, PathNodeGrid) or not grid.complete:
+			return super().execute()
+
+		destination = self.destination
+		destination_to_tuple_distance_func = destination.get_distance_function((0, 0))
+
+		source_coords = self.source.get_coordinates()
+		dest_coords = destination.get_coordinates()
+		if not self.make_target_walkable:
+			dest_coords = [coords for coords in dest_coords if coords in grid]
+		if not dest_coords:
+			return None
+
+		index = grid.index
+		source_indices = [index(coords) for coords in source_coords]
+		dest_indices = [index(coords) for coords in dest_coords]
+		if None in source_indices or None in dest_indices:
+			return super().execute()
+
+		buffers = grid.get_search_buffers()
+		gen = buffers.generation
+		seen = buffers.seen
+		passable = buffers.passable
+		target = buffers.target
+		blocked = buffers.blocked
+		parent = buffers.parent
+		distance = buffers.distance
+		walkable = grid.walkable
+		speed = grid.speed
+		height = grid.height
+		left = grid.left
+		top = grid.top
+
+		for i in source_indices:
+			passable[i] = gen
+		for i in dest_indices:
+			passable[i] = gen
+			target[i] = gen
+		for coords in self.blocked_coords:
+			i = index(coords)
+			if i is not None:
+				blocked[i] = gen
+
+		heap = []
+		for coords, i in zip(source_coords, source_indices):
+			if seen[i] != gen:
+				seen[i] = gen
+				parent[i] = -1
+				distance[i] = 0
+				heappush(heap, (destination_to_tuple_distance_func(destination, coords), i))
+
+		if self.diagonal:
+			offsets = (-height - 1, -height, -height + 1, -1, 1, height - 1, height, height + 1)
+		else:
+			offsets = (-height, height, -1, 1)
+
+		while heap:
+			cur = heappop(heap)[1]
+
+			if target[cur] == gen:
+				path = []
+				while cur != -1:
+					path.append((cur // height + left, cur % height + top))
+					cur = parent[cur]
+				path.reverse()
+				return path
+
+			# nodes are never updated once reached, like in FindPath
+			dist_to_here = distance[cur] + speed[cur]
+			for offset in offsets:
+				neighbor = cur + offset
+				if seen[neighbor] == gen or blocked[neighbor] == gen:
+					continue
+				if not walkable[neighbor] and passable[neighbor] != gen:
+					continue
+				seen[neighbor] = gen
+				parent[neighbor] = cur
+				distance[neighbor] = dist_to_here
+				coords = (neighbor // height + left, neighbor % height + top)
+				heappush(heap, (destination_to_tuple_distance_func(destination, coords) + dist_to_here, neighbor))
+
+		return None
+
+
+class PathDistanceField:
+	"""Travel distances from a source to all path nodes that can be reached from it.
+
+	They are calculated by a single Dijkstra flood using the cost model of FindPath, so that
+	many destinations can be rated by a lookup instead of a FindPath call each.
+	Temporarily blocked coords are not considered.
+	"""
+
+	def __init__(self, source, path_nodes, diagonal=False):
+		"""
+		@param source: Rect, Point or BasicBuilding
+		@param path_nodes: dict { (x, y) = speed_on_coords }  or list [(x, y), ..]
+		@param diagonal: whether the unit is able to move diagonally
+		"""
+		if hasattr(source, 'position'):
+			source = source.position
+		if isinstance(path_nodes, (list, set)):
+			path_nodes = dict.fromkeys(path_nodes, 1.0)
+		self.path_nodes = path_nodes
+		if diagonal:
+			self._offsets = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1))
+		else:
+			self._offsets = ((-1, 0), (1, 0), (0, -1), (0, 1))
+		self.distances = self._flood(set(source.get_coordinates()))
+
+	def _flood(self, source_coords):
+		"""@return: dict {(x, y): distance from source}"""
+		path_nodes = self.path_nodes
+		offsets = self._offsets
+		distances = {}
+		heap = [(0, coords) for coords in sorted(source_coords)]
+		while heap:
+			distance, coords = heappop(heap)
+			if coords in distances:
+				continue
+			distances[coords] = distance
+			# like in FindPath, leaving a node costs its speed value
+			distance += path_nodes.get(coords, 0)
+			x, y = coords
+			for dx, dy in offsets:
+				neighbor = (x + dx, y + dy)
+				if neighbor not in distances and (neighbor in path_nodes or neighbor in source_coords):
+					heappush(heap, (distance, neighbor))
+		return distances
+
+	def get_distance(self, destination):
+		"""Returns the travel distance to the nearest tile of destination.
+		Tiles of destination are considered walkable, like FindPath does with make_target_walkable.
+		@param destination: Rect, Point or BasicBuilding
+		@return: distance or None if destination can't be reached"""
+		if hasattr(destination, 'position'):
+			destination = destination.position
+		distances = self.distances
+		path_nodes = self.path_nodes
+		best = None
+		for coords in destination.tuple_iter():
+			distance = distances.get(coords)
+			if distance is None:
+				x, y = coords
+				for dx, dy in self._offsets:
+					neighbor = (x + dx, y + dy)
+					if neighbor in distances:
+						step = distances[neighbor] + path_nodes.get(neighbor, 0)
+						if distance is None or step < distance:
+							distance = step
+			if distance is not None and (best is None or distance < best):
+				best = distance
+		return best
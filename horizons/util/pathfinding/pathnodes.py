@@ -20,6 +20,7 @@
 # ###################################################
 
 import logging
+from array import array
 
 
 class PathNodes:
@@ -38,6 +39,190 @@ class PathNodes:
 		pass
 
 
+class PathNodeGrid(dict):
+	"""Path nodes dict {(x, y): speed} that mirrors its nodes into flat arrays covering the
+	rectangle `bounds`, which allows FindPath to do index arithmetic instead of tuple lookups.
+	The arrays have a border of one unwalkable tile around the bounds, so neighbors of inner
+	tiles never need to be range checked.
+	Nodes outside of the bounds are only kept in the dict, the grid is unusable while
+	there are any (see `complete`).
+	"""
+	def __init__(self, bounds, nodes=None):
+		super().__init__()
+		self.left = bounds.left - 1
+		self.top = bounds.top - 1
+		self.width = bounds.width + 2
+		self.height = bounds.height + 2
+		self.walkable = bytearray(self.width * self.height)
+		self.speed = array('d', [0.0]) * (self.width * self.height)
+		self._outside = 0 # number of nodes outside of the bounds
+		self._search_buffers = None
+		if nodes:
+			self.update(nodes)
+
+	@property
+	def complete(self):
+		"""Whether the arrays contain every node of the dict."""
+		return self._outside == 0
+
+	def index(self, coords):
+		"""Returns the array index of coords or None if coords are outside of the bounds."""
+		x = coords[0] - self.left
+		y = coords[1] - self.top
+		if 0 < x < self.width - 1 and 0 < y < self.height - 1:
+			return x * self.height + y
+		return None
+
+	def coords(self, index):
+		"""Returns the coords tuple of an array index."""
+		return (index // self.height + self.left, index % self.height + self.top)
+
+	def __setitem__(self, coords, speed):
+		index = self.index(coords)
+		if index is None:
+			if coords not in self:
+				self._outside += 1
+		else:
+			self.walkable[index] = 1
+			self.speed[index] = speed
+		super().__setitem__(coords, speed)
+
+	def __delitem__(self, coords):
+		super().__delitem__(coords)
+		index = self.index(coords)
+		if index is None:
+			self._outside -= 1
+		else:
+			self.walkable[index] = 0
+			self.speed[index] = 0.0
+
+	def pop(self, coords, *default):
+		if coords not in self:
+			return super().pop(coords, *default)
+		speed = self[coords]
+		del self[coords]
+		return speed
+
+	def popitem(self):
+		coords, speed = super().popitem()
+		super().__setitem__(coords, speed)
+		del self[coords]
+		return coords, speed
+
+	def setdefault(self, coords, speed=None):
+		if coords not in self:
+			self[coords] = speed
+		return self[coords]
+
+	def update(self, *args, **kwargs):
+		for coords, speed in dict(*args, **kwargs).items():
+			self[coords] = speed
+
+	def clear(self):
+		super().clear()
+		self.walkable = bytearray(len(self.walkable))
+		self.speed = array('d', [0.0]) * len(self.speed)
+		self._outside = 0
+
+	def __copy__(self):
+		other = self.__class__.__new__(self.__class__)
+		dict.update(other, self)
+		other.left = self.left
+		other.top = self.top
+		other.width = self.width
+		other.height = self.height
+		other.walkable = bytearray(self.walkable)
+		other.speed = array('d', self.speed)
+		other._outside = self._outside
+		other._search_buffers = None
+		return other
+
+	def label_components(self):
+		"""Finds the 8-connected components of the nodes.
+		The grid is scanned for vertical runs of nodes, each run is joined with the runs of
+		the previous column that overlap or touch it diagonally. This only costs a few
+		operations per run instead of per node.
+		@return: array with an id of the component for every index, -1 where there is no node"""
+		walkable = self.walkable
+		height = self.height
+		parents = []
+
+		def find(run):
+			while parents[run] != run:
+				parents[run] = parents[parents[run]]
+				run = parents[run]
+			return run
+
+		runs = [] # (start index, end index, run id)
+		previous = [] # (first row, end row, run id) of the previous column
+		# the first and last columns are border
+		for x in range(1, self.width - 1):
+			column_start = x * height
+			column_end = column_start + height
+			current = []
+			start = walkable.find(1, column_start, column_end)
+			while start != -1:
+				# the last row is border, so every run ends inside of the column
+				end = walkable.find(0, start, column_end)
+				run = len(parents)
+				parents.append(run)
+				runs.append((start, end, run))
+				current.append((start - column_start, end - column_start, run))
+				start = walkable.find(1, end, column_end)
+
+			i = 0
+			for first, end, run in current:
+				while i < len(previous) and previous[i][1] < first:
+					i += 1
+				j = i
+				while j < len(previous) and previous[j][0] <= end:
+					root1 = find(previous[j][2])
+					root2 = find(run)
+					if root1 != root2:
+						parents[max(root1, root2)] = min(root1, root2)
+					j += 1
+			previous = current
+
+		labels = array('i', [-1]) * len(walkable)
+		for start, end, run in runs:
+			labels[start:end] = array('i', [find(run)]) * (end - start)
+		return labels
+
+	def get_search_buffers(self):
+		"""Returns the buffers used by FindPath on this grid, they are reused for every search.
+		Entries of the stamp arrays are only valid if they equal the current generation,
+		which is increased for every search instead of clearing the arrays."""
+		if self._search_buffers is None:
+			self._search_buffers = _SearchBuffers(len(self.walkable))
+		self._search_buffers.next_generation()
+		return self._search_buffers
+
+
+class _SearchBuffers:
+	"""Generation-stamped per-tile arrays for one A* search, see PathNodeGrid.get_search_buffers."""
+	MAX_GENERATION = 2 ** 32 - 1
+
+	def __init__(self, size):
+		self.size = size
+		self.generation = 0
+		self._allocate()
+
+	def _allocate(self):
+		stamps = array('I', [0]) * self.size
+		self.seen = stamps # node has been reached (open or closed)
+		self.passable = array('I', stamps) # source and target tiles, walkable even if not a node
+		self.target = array('I', stamps)
+		self.blocked = array('I', stamps)
+		self.parent = array('i', [-1]) * self.size
+		self.distance = array('d', [0.0]) * self.size
+
+	def next_generation(self):
+		if self.generation == self.MAX_GENERATION:
+			self._allocate()
+			self.generation = 0
+		self.generation += 1
+
+
 class ConsumerBuildingPathNodes(PathNodes):
 	"""List of path nodes for a consumer, that is a building
 	Interface:
@@ -45,9 +230,10 @@ class ConsumerBuildingPathNodes(PathNodes):
 	"""
 	def __init__(self, consumerbuilding):
 		super().__init__()
-		ground_map = consumerbuilding.island.ground_map
+		island = consumerbuilding.island
+		ground_map = island.ground_map
 		self.nodes = {}
-		for coords in consumerbuilding.position.get_radius_coordinates(consumerbuilding.radius, include_self=False):
+		for coords in consumerbuilding.position.get_radius_coordinates_in(consumerbuilding.radius, island.position, include_self=False):
 			if coords in ground_map and 'coastline' not in ground_map[coords].classes:
 				self.nodes[coords] = self.NODE_DEFAULT_SPEED
 
@@ -62,6 +248,10 @@ class IslandPathNodes(PathNodes):
 	reset_tile_walkablity has to be called when the terrain changes the walkability
 	(e.g. building construction, a flood, or whatever)
 	is_walkable rechecks the walkability status of a coordinate
+
+	The connected road networks are tracked with a union-find forest over the road nodes.
+	Built roads are merged into it directly, after a road is removed the forest is
+	rebuilt on the next query. road_change_id is increased on every change of the roads.
 	"""
 	def __init__(self, island):
 		super().__init__()
@@ -71,21 +261,94 @@ class IslandPathNodes(PathNodes):
 		# generate list of walkable tiles
 		# we keep this up to date, so that path finding can use it and we don't have
 		# to calculate it every time (rather expensive!).
-		self.nodes = {}
+		self.nodes = PathNodeGrid(island.position)
 		for coord in self.island:
 			if self.is_walkable(coord):
 				self.nodes[coord] = self.NODE_DEFAULT_SPEED
 
 		# nodes where a real road is built on.
-		self.road_nodes = {}
+		self.road_nodes = PathNodeGrid(island.position)
+
+		self._road_parents = {} # {(x, y): parent (x, y)}, see get_road_network
+		self._road_parents_outdated = False
+		self.road_change_id = 0
 
 	def register_road(self, road):
 		for i in road.position:
-			self.road_nodes[(i.x, i.y)] = self.NODE_DEFAULT_SPEED
+			coords = (i.x, i.y)
+			self.road_nodes[coords] = self.NODE_DEFAULT_SPEED
+			if not self._road_parents_outdated:
+				self._road_parents[coords] = coords
+				for neighbor in ((i.x - 1, i.y), (i.x + 1, i.y), (i.x, i.y - 1), (i.x, i.y + 1)):
+					if neighbor in self._road_parents:
+						self._union_roads(coords, neighbor)
+		self.road_change_id += 1
 
 	def unregister_road(self, road):
 		for i in road.position:
 			del self.road_nodes[(i.x, i.y)]
+		# splitting a network can't be done in the union-find forest
+		self._road_parents_outdated = True
+		self.road_change_id += 1
+
+	def _find_road_root(self, coords):
+		parents = self._road_parents
+		while parents[coords] != coords:
+			parents[coords] = parents[parents[coords]] # path halving
+			coords = parents[coords]
+		return coords
+
+	def _union_roads(self, coords1, coords2):
+		root1 = self._find_road_root(coords1)
+		root2 = self._find_road_root(coords2)
+		if root1 != root2:
+			self._road_parents[max(root1, root2)] = min(root1, root2)
+
+	def _rebuild_road_networks(self):
+		self._road_parents = {coords: coords for coords in self.road_nodes}
+		for (x, y) in self.road_nodes:
+			for neighbor in ((x + 1, y), (x, y + 1)):
+				if neighbor in self._road_parents:
+					self._union_roads((x, y), neighbor)
+		self._road_parents_outdated = False
+
+	def get_road_network(self, coords):
+		"""Returns an id of the road network coords belong to, None if there is no road."""
+		if self._road_parents_outdated:
+			self._rebuild_road_networks()
+		if coords not in self._road_parents:
+			return None
+		return self._find_road_root(coords)
+
+	def may_be_road_connected(self, source, destination):
+		"""Checks whether a path on roads may exist between source and destination.
+		Like the pathfinding, a path may also lead through the tiles of source and destination.
+		@param source, destination: Point, Rect or anything with such a position (e.g. buildings)
+		@return: False if there certainly is no such path
+		"""
+		if hasattr(source, 'position'):
+			source = source.position
+		if hasattr(destination, 'position'):
+			destination = destination.position
+
+		source_coords = set(source.tuple_iter())
+		destination_coords = set(destination.tuple_iter())
+		source_networks = set()
+		for (x, y) in source_coords:
+			for coords in ((x, y), (x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+				if coords in destination_coords:
+					return True # touching each other
+				network = self.get_road_network(coords)
+				if network is not None:
+					source_networks.add(network)
+		if not source_networks:
+			return False
+
+		for (x, y) in destination_coords:
+			for coords in ((x, y), (x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+				if self.get_road_network(coords) in source_networks:
+					return True
+		return False
 
 	def is_road(self, x, y):
 		"""Return if there is a road on (x, y)"""
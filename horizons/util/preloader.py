@@ -21,6 +21,7 @@
 
 import logging
 import threading
+import time
 
 from horizons.util.loaders.actionsetloader import ActionSetLoader
 from horizons.util.loaders.tilesetloader import TileSetLoader
@@ -63,8 +64,9 @@ class PreloadingThread(threading.Thread):
 				if not self.lock.acquire(False):
 					break
 				log.debug("Preload: %s", f)
+				start = time.perf_counter()
 				f()
-				log.debug("Preload: %s is done", f)
+				log.debug("Preload: %s is done (%.3fs)", f, time.perf_counter() - start)
 				self.lock.release()
 			log.debug("Preloading done.")
 		except Exception as e:
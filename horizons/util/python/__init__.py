@@ -25,17 +25,21 @@ but rather a generic enhancement of the programming language.
 """
 
 import collections
-from typing import Any, Set, Type
+import types
+from typing import Any, Set, Tuple, Type
 
 from .decorators import *
 
 
 class Const:
 	"""An immutable type. Think C++-like const"""
+	__slots__ = () # type: Tuple[str, ...]
+
 	def __setattr__(self, name, value):
-		"""Disallow changing an already set attribute.
+		"""Disallow changing an already set attribute (stored in __dict__ or in a slot).
 		An asymptote to const behavior, which is not supported by python"""
-		if name in self.__dict__:
+		if name in getattr(self, '__dict__', ()) or \
+		   (isinstance(getattr(type(self), name, None), types.MemberDescriptorType) and hasattr(self, name)):
 			raise Exception("Can't change a Const object")
 		super().__setattr__(name, value)
 
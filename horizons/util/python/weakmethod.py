@@ -37,11 +37,12 @@ class WeakMethod:
 	def __call__(self, *args, **kwargs):
 		if self.instance is None:
 			return self.function(*args, **kwargs)
-		elif self.instance() is not None:
-			return self.function(self.instance(), *args, **kwargs)
+		instance = self.instance()
+		if instance is not None:
+			return self.function(instance, *args, **kwargs)
 		else:
 			raise ReferenceError("Instance: {}  Function: {}  Function from module: {}"
-			                     .format(self.instance(), self.function, self.function.__module__))
+			                     .format(instance, self.function, self.function.__module__))
 
 	def __eq__(self, other):
 		if isinstance(other, WeakMethod):
@@ -125,6 +125,7 @@ class SavegameAccessor(DbReader):
 		self._load_storage_global_limit()
 		self._load_health()
 		self._load_fish_data()
+		self._ground = None
 		self._hash = None
 
 	def close(self):
@@ -300,6 +301,26 @@ class SavegameAccessor(DbReader):
 	def get_last_fish_usage_tick(self, worldid):
 		return self._fish_data[worldid]
 
+	def _load_ground(self):
+		"""Reads the ground table of the map in one pass and splits it into pages per island.
+		Querying it per island would scan the whole table for every island."""
+		self._ground = defaultdict(list)
+		for row in self("SELECT island_id, x, y, ground_id, action_id, rotation FROM ground"):
+			self._ground[row[0]].append(row[1:])
+
+	def get_island_ids(self):
+		"""Returns the ids of all islands of the map in ascending order."""
+		if self._ground is None:
+			self._load_ground()
+		return sorted(self._ground)
+
+	def get_island_ground(self, island_id):
+		"""Returns the ground rows (x, y, ground_id, action_id, rotation) of an island.
+		The rows must not be modified, they are handed out again on every call."""
+		if self._ground is None:
+			self._load_ground()
+		return self._ground.get(island_id, [])
+
 	# Random savegamefile related utility that i didn't know where to put
 
 	@classmethod
@@ -0,0 +1,107 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import re
+import sqlite3
+
+from horizons.constants import PATHS
+from horizons.util.dbreader import DbReader
+
+
+class SavegameWriter(DbReader):
+	"""DbReader that is used for writing savegames.
+
+	Saving runs one INSERT per saved row. Instead of executing them one by one, the rows
+	are collected per table and written with executemany, which prepares each statement
+	only once. Any other command first writes all collected rows, so it sees the same
+	database as it would without batching.
+	Rows of a table are written in the order they were inserted, the order of rows of
+	different tables doesn't matter since the tables have no triggers or foreign keys.
+	"""
+	_template = None # in-memory database with the empty savegame tables
+
+	INSERT_RE = re.compile(r'\s*INSERT\s+(?:OR\s+\w+\s+)?INTO\s+[`"]?(\w+)[`"]?[^;]*?\bVALUES\s*\(', re.IGNORECASE)
+
+	def __init__(self, dbfile):
+		super().__init__(dbfile)
+		self._tables = {} # command -> table name, None if the command can't be batched
+		self._batches = {} # table name -> (command, [args, ...])
+
+	def create_tables(self):
+		"""Creates the tables of the savegame template.
+		They are copied from an in-memory database that is only created once, which is
+		much faster than running the template script for every save."""
+		if SavegameWriter._template is None:
+			template = sqlite3.connect(':memory:')
+			with open(PATHS.SAVEGAME_TEMPLATE, "r") as f:
+				template.executescript(f.read())
+			SavegameWriter._template = template
+		self.flush()
+		self._template.backup(self.connection)
+
+	@classmethod
+	def _get_table(cls, command):
+		"""Returns the table a command only inserts values into, None for other commands."""
+		match = cls.INSERT_RE.match(command)
+		if match is None or 'SELECT' in command.upper():
+			return None
+		return match.group(1)
+
+	def _execute(self, command, args):
+		try:
+			table = self._tables[command]
+		except KeyError:
+			table = self._tables[command] = self._get_table(command)
+
+		if table is None:
+			self.flush()
+			return super()._execute(command, args)
+
+		batch = self._batches.get(table)
+		if batch is None or batch[0] != command:
+			if batch is not None:
+				# keep the order of the rows of the table
+				self._flush_table(table)
+			batch = self._batches[table] = (command, [])
+		batch[1].append(args)
+		return []
+
+	def _flush_table(self, table):
+		command, rows = self._batches.pop(table)
+		self.cur.executemany(command, rows)
+
+	def flush(self):
+		"""Writes all collected rows."""
+		for table in list(self._batches):
+			self._flush_table(table)
+
+	def execute_many(self, command, parameters):
+		self.flush()
+		return super().execute_many(command, parameters)
+
+	def execute_script(self, script):
+		self.flush()
+		return super().execute_script(script)
+
+	def close(self):
+		# rows that are still collected belong to a failed save
+		self._batches.clear()
+		super().close()
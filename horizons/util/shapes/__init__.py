@@ -19,10 +19,13 @@
 # 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
 # ###################################################
 
+from typing import Tuple
+
 from horizons.util.shapes import distances
 
 
 class Shape:
+	__slots__ = () # type: Tuple[str, ...]
 
 	def get_coordinates(self):
 		"""Return all coordinates in the shape."""
@@ -26,6 +26,8 @@ from .point import Point
 class Annulus(Shape):
 	"""Class for the shape of an annulus
 	You can access center and radius of the annulus as public members."""
+	__slots__ = ('center', 'min_radius', 'max_radius')
+
 	def __init__(self, center, min_radius, max_radius):
 		"""
 		@param center: Point
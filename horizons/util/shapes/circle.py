@@ -26,6 +26,8 @@ from .point import Point
 class Circle(Shape):
 	"""Class for the shape of a circle
 	You can access center and radius of the circle as public members."""
+	__slots__ = ('center', 'radius')
+
 	def __init__(self, center, radius):
 		"""
 		@param center: Point
@@ -19,11 +19,17 @@
 # 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
 # ###################################################
 
+from typing import Dict, Tuple
+
 from horizons.util.python import Const
 from horizons.util.shapes import Shape
 
 
 class Point(Shape):
+	"""A coordinate. Points are treated as values: don't change a point that might be
+	referenced somewhere else, create a new one instead (see offset() and copy())."""
+	__slots__ = ('x', 'y')
+
 	def __init__(self, x, y):
 		self.x = x
 		self.y = y
@@ -87,5 +93,30 @@ class Point(Shape):
 
 
 class ConstPoint(Const, Point):
-	"""An immutable Point"""
-	pass
+	"""An immutable Point.
+	Use ConstPoint.get() for frequently created points, e.g. the steps of a path. It returns
+	shared instances, which also cache their hash."""
+	__slots__ = ('_hash', )
+
+	# number of shared points that are kept at most, the pool is emptied when it is full
+	POOL_SIZE = 1 << 16
+
+	_pool = {} # type: Dict[Tuple[int, int], ConstPoint]
+
+	def __init__(self, x, y):
+		super().__init__(x, y)
+		self._hash = hash((x, y))
+
+	@classmethod
+	def get(cls, coords):
+		"""Returns a shared ConstPoint at the coordinates.
+		@param coords: tuple (x, y)"""
+		point = cls._pool.get(coords)
+		if point is None:
+			if len(cls._pool) >= cls.POOL_SIZE:
+				cls._pool.clear()
+			point = cls._pool[coords] = cls(coords[0], coords[1])
+		return point
+
+	def __hash__(self):
+		return self._hash
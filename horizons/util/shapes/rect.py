@@ -19,6 +19,10 @@
 # 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
 # ###################################################
 
+from collections import OrderedDict
+from itertools import repeat
+from typing import Dict, Tuple
+
 from horizons.util.python import Const
 
 from . import Shape
@@ -109,12 +113,67 @@ class Rect(Shape):
 	def copy(self):
 		return Rect.init_from_borders(self.left, self.top, self.right, self.bottom)
 
+	# {(width, height, radius, include_self): ((dy, first dx, last dx), ...), ...}
+	_radius_rows = {} # type: Dict[Tuple[int, int, int, bool], Tuple[Tuple[int, int, int], ...]]
+	# the coordinates of the latest queries: {(left, top, width, height, radius, include_self): ((x, y), ...), ...}
+	_radius_coordinates = OrderedDict()
+	RADIUS_COORDINATES_CACHE_SIZE = 64
+
 	def get_radius_coordinates(self, radius, include_self=False):
-		"""Returns list of all coordinates (as tuples), that are in the radius
-		This is a generator.
-		@param include_self: whether to include coords in self"""
-		# NOTE: this function has to be very fast, since it's blocking on building select
-		#       therefore, the distance_to_tuple function is inlined manually.
+		"""Returns all coordinates (as tuples), that are in the radius.
+		@param include_self: whether to include coords in self
+		@return: tuple of coordinate tuples, don't rely on it being a tuple, just iterate over it"""
+		# NOTE: this function has to be very fast, since it's blocking on building select.
+		#       Most queries are repeated for the same building, so the latest results are kept.
+		key = (self.left, self.top, self.width, self.height, radius, include_self)
+		cache = self._radius_coordinates
+		coords = cache.get(key)
+		if coords is not None:
+			cache.move_to_end(key)
+			return coords
+
+		left = self.left
+		top = self.top
+		coords = []
+		for (dy, first_dx, last_dx) in self._get_radius_rows(key[2:]):
+			coords.extend(zip(range(left + first_dx, left + last_dx + 1), repeat(top + dy)))
+		coords = tuple(coords)
+		cache[key] = coords
+		if len(cache) > self.RADIUS_COORDINATES_CACHE_SIZE:
+			cache.popitem(last=False)
+		return coords
+
+	def get_radius_coordinates_in(self, radius, bounds, include_self=False):
+		"""Like get_radius_coordinates, but only yields the coordinates inside the Rect bounds.
+		This is a generator."""
+		left = self.left
+		top = self.top
+		for (dy, first_dx, last_dx) in self._get_radius_rows((self.width, self.height, radius, include_self)):
+			y = top + dy
+			if bounds.top <= y <= bounds.bottom:
+				for x in range(max(left + first_dx, bounds.left), min(left + last_dx, bounds.right) + 1):
+					yield (x, y)
+
+	@classmethod
+	def _get_radius_rows(cls, key):
+		"""Returns the horizontal runs of get_radius_coordinates relative to the origin of a rect.
+		@param key: (width, height, radius, include_self)"""
+		rows = cls._radius_rows.get(key)
+		if rows is None:
+			width, height, radius, include_self = key
+			rect = Rect.init_from_topleft_and_size(0, 0, width, height)
+			rows = []
+			for (dx, dy) in rect._iter_radius_coordinates(radius, include_self):
+				if rows and rows[-1][0] == dy and rows[-1][2] == dx - 1:
+					rows[-1][2] = dx
+				else:
+					rows.append([dy, dx, dx])
+			rows = tuple(tuple(row) for row in rows)
+			cls._radius_rows[key] = rows
+		return rows
+
+	def _iter_radius_coordinates(self, radius, include_self):
+		# NOTE: the distance_to_tuple function is inlined manually.
 		"""
 		ALGORITHM:
 		Idea:
@@ -289,4 +348,4 @@ class Rect(Shape):
 class ConstRect(Const, Rect):
 	"""An immutable Rect.
 	Can be used for manual const-only optimization"""
-	pass
+	__slots__ = () # type: Tuple[str, ...]
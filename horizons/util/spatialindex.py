@@ -0,0 +1,165 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import heapq
+import math
+
+
+class SpatialIndex:
+	"""
+	Uniform grid index of objects at points, used to find the objects in a radius or the
+	nearest objects without looking at all of them.
+
+	The index doesn't notice movement, `move` has to be called whenever the position of an
+	object changes. Query results are ordered by the time the objects were added, just like
+	the lists of objects the index is used for.
+	"""
+
+	CELL_SIZE = 8
+
+	def __init__(self, cell_size=CELL_SIZE):
+		self._cell_size = cell_size
+		self._cells = {} # (cell x, cell y) -> {object: None}
+		self._entries = {} # object -> [x, y, cell, serial number]
+		self._next_serial = 0
+
+	def _get_cell(self, x, y):
+		return (x // self._cell_size, y // self._cell_size)
+
+	def add(self, obj, point):
+		"""Adds obj at the coordinates of point."""
+		assert obj not in self._entries
+		cell = self._get_cell(point.x, point.y)
+		self._entries[obj] = [point.x, point.y, cell, self._next_serial]
+		self._next_serial += 1
+		self._cells.setdefault(cell, {})[obj] = None
+
+	def move(self, obj, point):
+		"""Updates the position of obj, which has to be in the index."""
+		entry = self._entries[obj]
+		entry[0] = point.x
+		entry[1] = point.y
+		cell = self._get_cell(point.x, point.y)
+		if cell != entry[2]:
+			self._remove_from_cell(obj, entry[2])
+			self._cells.setdefault(cell, {})[obj] = None
+			entry[2] = cell
+
+	def remove(self, obj):
+		entry = self._entries.pop(obj)
+		self._remove_from_cell(obj, entry[2])
+
+	def _remove_from_cell(self, obj, cell):
+		objects = self._cells[cell]
+		del objects[obj]
+		if not objects:
+			del self._cells[cell]
+
+	def __contains__(self, obj):
+		return obj in self._entries
+
+	def __len__(self):
+		return len(self._entries)
+
+	def get_in_radius(self, point, radius):
+		"""Returns all objects at most radius away from point.
+		@param point: Point
+		@param radius: number
+		@return: list of objects in the order they were added"""
+		cell_size = self._cell_size
+		min_cell_x = int(math.floor((point.x - radius) / cell_size))
+		max_cell_x = int(math.floor((point.x + radius) / cell_size))
+		min_cell_y = int(math.floor((point.y - radius) / cell_size))
+		max_cell_y = int(math.floor((point.y + radius) / cell_size))
+
+		entries = self._entries
+		cells = self._cells
+		squared_radius = radius * radius
+		found = []
+		if (max_cell_x - min_cell_x + 1) * (max_cell_y - min_cell_y + 1) > len(cells):
+			# the radius is huge, checking the occupied cells is cheaper
+			candidates = (obj for objects in cells.values() for obj in objects)
+		else:
+			candidates = (obj
+			              for cell_x in range(min_cell_x, max_cell_x + 1)
+			              for cell_y in range(min_cell_y, max_cell_y + 1)
+			              for obj in cells.get((cell_x, cell_y), ()))
+		for obj in candidates:
+			entry = entries[obj]
+			dx = entry[0] - point.x
+			dy = entry[1] - point.y
+			if dx * dx + dy * dy <= squared_radius:
+				found.append((entry[3], obj))
+		found.sort(key=lambda serial_obj: serial_obj[0])
+		return [obj for serial, obj in found]
+
+	def get_nearest(self, point, k=1, radius=None):
+		"""Returns the k objects that are nearest to point.
+		@param point: Point
+		@param k: number of objects to return at most
+		@param radius: optional, only consider objects at most this far away
+		@return: list of objects, the nearest first. Ties are broken by the time the objects were added."""
+		if k <= 0 or not self._entries:
+			return []
+		cell_size = self._cell_size
+		center_x, center_y = self._get_cell(point.x, point.y)
+		if radius is None:
+			# no object can be farther away than the farthest occupied cell
+			max_ring = max(max(abs(cell_x - center_x), abs(cell_y - center_y)) for cell_x, cell_y in self._cells)
+		else:
+			max_ring = int(math.ceil(radius / cell_size)) + 1
+
+		entries = self._entries
+		best = [] # heap of (-squared distance, -serial, object)
+		for ring in range(max_ring + 1):
+			if len(best) == k:
+				# objects in this ring or outside are at least this far away
+				min_distance = (ring - 1) * cell_size
+				if min_distance > 0 and min_distance * min_distance > -best[0][0]:
+					break
+			for cell in self._get_ring(center_x, center_y, ring):
+				for obj in self._cells.get(cell, ()):
+					entry = entries[obj]
+					dx = entry[0] - point.x
+					dy = entry[1] - point.y
+					squared_distance = dx * dx + dy * dy
+					if radius is not None and squared_distance > radius * radius:
+						continue
+					item = (-squared_distance, -entry[3], obj)
+					if len(best) < k:
+						heapq.heappush(best, item)
+					elif item[:2] > best[0][:2]:
+						heapq.heapreplace(best, item)
+		best.sort(key=lambda item: item[:2], reverse=True)
+		return [obj for distance, serial, obj in best]
+
+	@classmethod
+	def _get_ring(cls, center_x, center_y, ring):
+		"""Yields the cells whose chebyshev distance to the center cell is ring."""
+		if ring == 0:
+			yield (center_x, center_y)
+			return
+		for x in range(center_x - ring, center_x + ring + 1):
+			yield (x, center_y - ring)
+			yield (x, center_y + ring)
+		for y in range(center_y - ring + 1, center_y + ring):
+			yield (center_x - ring, y)
+			yield (center_x + ring, y)
@@ -19,10 +19,13 @@
 # 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
 # ###################################################
 
+import hashlib
 import logging
+import multiprocessing
 import os
 import threading
-from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
 
 import yaml
 
@@ -31,8 +34,10 @@ from horizons.util.yamlcachestorage import YamlCacheStorage
 
 try:
 	from yaml import CSafeLoader as SafeLoader # type: ignore
+	HAVE_LIBYAML = True
 except ImportError:
 	from yaml import SafeLoader # type: ignore
+	HAVE_LIBYAML = False
 
 
 # make SafeLoader allow unicode
@@ -81,19 +86,60 @@ def convert_game_data(data):
 		return data
 
 
+# marks entries that aren't in the cache
+_missing = object()
+
+
+def _read_and_parse_file(filename, game_data, get_cached_data=None):
+	"""Reads and parses a yaml file. Runs in worker processes too.
+	@param get_cached_data: function returning cached data for a data key or _missing
+	@return: tuple (data_key, data)
+	"""
+	with open(filename, 'rb') as f:
+		filedata = f.read()
+	data_key = 'data:{}:{:d}'.format(hashlib.sha1(filedata).hexdigest(), game_data)
+
+	if get_cached_data is not None:
+		data = get_cached_data(data_key)
+		if data is not _missing:
+			return data_key, data
+
+	data = YamlCache.load_yaml_data(filedata.decode('utf-8'))
+	if game_data: # need to convert some values
+		try:
+			data = convert_game_data(data)
+		except Exception as e:
+			# add info about file
+			to_add = "\nThis error happened in {0!s} .".format(filename)
+			e.args = (e.args[0] + to_add, ) + e.args[1:]
+			e.message = (e.message + to_add)
+			raise
+	return data_key, data
+
+
 class YamlCache:
 	"""Loads and caches YAML files in a persistent cache.
 	Threadsafe.
 
 	Use get_file for files to cache (default case) or load_yaml_data for special use cases (behaves like yaml.load).
+
+	The parsed data is stored under a digest of the file content. Additionally, the
+	modification time and size of every file are stored along with the digest of its
+	content, so unchanged files don't have to be read at all.
 	"""
 
 	cache = None # type: Optional[YamlCacheStorage]
-	cache_filename = os.path.join(PATHS.CACHE_DIR, 'yamldata.cache')
+	cache_filename = os.path.join(PATHS.CACHE_DIR, 'yamldata.sqlite')
+	# cache file of older versions
+	legacy_cache_filename = os.path.join(PATHS.CACHE_DIR, 'yamldata.cache')
 
 	sync_scheduled = False
 
-	lock = threading.Lock()
+	lock = threading.RLock()
+
+	# Starting worker processes only pays off for a lot of files. With libyaml, parsing
+	# all object files takes less time than starting a single worker, so don't use them.
+	parallel_parse_min_files = None if HAVE_LIBYAML else 32 # type: Optional[int]
 
 	log = logging.getLogger("yamlcache")
 
@@ -108,49 +154,94 @@ class YamlCache:
 		@param filename: path to the file
 		@param game_data: Whether this file contains data like BUILDINGS.LUMBERJACK to resolve
 		"""
-		with open(filename, 'r', encoding="utf-8") as f:
-			filedata = f.read()
-
-		# calc the hash
-		h = hash(filedata)
-
-		# check for updates or new files
-		if cls.cache is None:
-			cls._open_cache()
+		return cls.get_files([filename], game_data)[0]
 
-		yaml_file_in_cache = (filename in cls.cache and cls.cache[filename][0] == h)
-		if not yaml_file_in_cache:
-			data = cls.load_yaml_data(filedata)
-			if game_data: # need to convert some values
-				try:
-					data = convert_game_data(data)
-				except Exception as e:
-					# add info about file
-					to_add = "\nThis error happened in {0!s} .".format(filename)
-					e.args = (e.args[0] + to_add, ) + e.args[1:]
-					e.message = (e.message + to_add)
-					raise
-
-			cls.lock.acquire()
-			cls.cache[filename] = (h, data)
+	@classmethod
+	def get_files(cls, filenames, game_data=False):
+		"""Get contents of several yaml files.
+		Files that aren't in the cache are parsed in worker processes if there are
+		at least `parallel_parse_min_files` of them, else in this thread.
+		@param filenames: list of paths to the files
+		@param game_data: Whether these files contain data like BUILDINGS.LUMBERJACK to resolve
+		@return: list of the files' contents, in the order of filenames
+		"""
+		results = [_missing] * len(filenames)
+		misses = [] # type: List[int]
+		file_entries = {}
+
+		with cls.lock:
+			if cls.cache is None:
+				cls._open_cache()
+
+			for i, filename in enumerate(filenames):
+				stat = os.stat(filename)
+				file_key = 'file:{}:{:d}'.format(filename, game_data)
+				file_state = (stat.st_mtime_ns, stat.st_size)
+				file_entry = cls.cache.get(file_key) # (file_state, data_key)
+				file_entries[i] = (file_key, file_state, file_entry)
+				if file_entry is not None and file_entry[0] == file_state:
+					results[i] = cls.cache.get(file_entry[1], _missing)
+				if results[i] is _missing:
+					misses.append(i)
+
+		if not misses:
+			return results
+
+		min_files = cls.parallel_parse_min_files
+		workers = min(os.cpu_count() or 1, len(misses))
+		if min_files is not None and len(misses) >= min_files and workers > 1:
+			parsed = cls._parse_files_in_workers([filenames[i] for i in misses], game_data, workers)
+		else:
+			parsed = [_read_and_parse_file(filenames[i], game_data, cls._get_cached_data) for i in misses]
+
+		with cls.lock:
+			for i, (data_key, data) in zip(misses, parsed):
+				file_key, file_state, file_entry = file_entries[i]
+				if file_entry is not None and file_entry[1] != data_key and file_entry[1] in cls.cache:
+					del cls.cache[file_entry[1]] # outdated content
+				cls.cache[data_key] = data
+				cls.cache[file_key] = (file_state, data_key)
+				results[i] = data
 			if not cls.sync_scheduled:
 				cls.sync_scheduled = True
 				from horizons.extscheduler import ExtScheduler
 				ExtScheduler().add_new_object(cls._do_sync, cls, run_in=1)
-			cls.lock.release()
 
-		return cls.cache[filename][1] # returns an object from the YAML
+		return results # returns objects from the YAML
+
+	@classmethod
+	def _get_cached_data(cls, data_key):
+		with cls.lock:
+			return cls.cache.get(data_key, _missing)
+
+	@classmethod
+	def _parse_files_in_workers(cls, filenames, game_data, workers):
+		"""Parses files in a pool of worker processes.
+		Falls back to parsing them in this thread if the pool can't be used."""
+		# spawn instead of fork, this is called from the preloading thread
+		context = multiprocessing.get_context('spawn')
+		try:
+			with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+				return list(pool.map(_read_and_parse_file, filenames, [game_data] * len(filenames),
+				                     chunksize=max(1, len(filenames) // (workers * 4))))
+		except (OSError, RuntimeError) as e:
+			# BrokenProcessPool is a RuntimeError
+			cls.log.warning("Parsing yaml files in worker processes failed, parsing them here: %s", e)
+			return [_read_and_parse_file(filename, game_data, cls._get_cached_data) for filename in filenames]
 
 	@classmethod
 	def _open_cache(cls):
-		cls.lock.acquire()
-		cls.cache = YamlCacheStorage.open(cls.cache_filename)
-		cls.lock.release()
+		with cls.lock:
+			if os.path.exists(cls.legacy_cache_filename):
+				try:
+					os.remove(cls.legacy_cache_filename)
+				except OSError:
+					pass
+			cls.cache = YamlCacheStorage.open(cls.cache_filename)
 
 	@classmethod
 	def _do_sync(cls):
 		"""Only write to disc once in a while, it's too slow when done every time"""
-		cls.lock.acquire()
-		cls.sync_scheduled = False
-		cls.cache.sync()
-		cls.lock.release()
+		with cls.lock:
+			cls.sync_scheduled = False
+			cls.cache.sync()
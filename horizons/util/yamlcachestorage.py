@@ -20,57 +20,69 @@
 # ###################################################
 
 import logging
-import os.path
+import os
 import pickle
+import sqlite3
+import threading
 
 
 class YamlCacheStorage:
 	"""
 	Store the YamlCache data in a cache.
 
-	An instance of this class provides a implements a cache that always has all the data
-	in memory. It tries to also load the data from disk and write it back on disk but
-	if it fails then it just ignores the errors and keeps working.
+	An instance of this class provides a implements a cache that keeps the data
+	it has been asked for in memory. It tries to also load the data from disk and write
+	it back on disk but if it fails then it just ignores the errors and keeps working.
+
+	On disk, the cache is a sqlite database with one row per entry. Entries are only
+	unpickled when they are requested, and sync() only writes the entries that have
+	been changed since the last sync.
 	"""
 
 	log = logging.getLogger("yamlcachestorage")
 
 	# Increment this when the users of this class change the way they use it.
-	version = 1
+	version = 2
 
 	def __init__(self, filename):
 		super().__init__() # TODO: check if this call is needed
 		self._filename = filename
 		self._data = {}
+		self._changed = set() # keys that have been set or deleted since the last sync
+		self._db = None # sqlite3 connection, None if the data on disk isn't available
+		# the connection may be used by different threads, but only one at a time
+		self._lock = threading.RLock()
 
-	@classmethod
-	def _validate(cls, data):
-		"""Make sure data is a tuple (version no, _data dict) with the right version."""
-		if not isinstance(data, tuple):
-			return False
-		if len(data) != 2:
-			return False
-		if not isinstance(data[1], dict):
-			return False
-		return data[0] == cls.version
+	def _connect(self):
+		db = sqlite3.connect(self._filename, check_same_thread=False)
+		try:
+			version = db.execute('PRAGMA user_version').fetchone()[0]
+			if version == 0:
+				db.execute('CREATE TABLE IF NOT EXISTS entry (key TEXT PRIMARY KEY, value BLOB NOT NULL)')
+				db.execute('PRAGMA user_version = {:d}'.format(self.version))
+				db.commit()
+			elif version != self.version:
+				raise RuntimeError('Bad YamlCacheStorage data format')
+		except Exception:
+			db.close()
+			raise
+		return db
 
 	def _reload(self):
-		"""Load the cache from disk if possible. Create an empty cache otherwise."""
-		if os.path.exists(self._filename):
-			self.log.debug('%s._reload(): loading cache from disk', self)
-			with open(self._filename, 'rb') as f:
-				data = pickle.load(f)
-			if not self._validate(data):
-				raise RuntimeError('Bad YamlCacheStorage data format')
-			self._data = data[1]
-			self.log.debug('%s._reload(): successfully loaded cache from disk', self)
-		else:
-			self._clear()
+		"""Open the cache on disk if possible. Create an empty cache otherwise."""
+		self.log.debug('%s._reload(): opening cache on disk', self)
+		self._clear()
+		self._db = self._connect()
+		self.log.debug('%s._reload(): successfully opened cache on disk', self)
 
 	def _clear(self):
 		"""Clear the cache in memory."""
 		self.log.debug('%s._clear(): creating a new cache', self)
+		if self._db is not None:
+			self._db.close()
+		self._db = None
 		self._data = {}
+		self._changed = set()
 
 	@classmethod
 	def open(cls, filename):
@@ -88,37 +100,93 @@ class YamlCacheStorage:
 		return obj
 
 	def sync(self):
-		"""Write the file to disk if possible. Do nothing otherwise."""
-		try:
-			with open(self._filename, 'wb') as f:
-				pickle.dump((self.version, self._data), f)
+		"""Write the changed entries to disk if possible. Do nothing otherwise."""
+		with self._lock:
+			if not self._changed and self._db is not None:
+				return
+			try:
+				if self._db is None:
+					# the file is missing or unusable (e.g. from an old version), start over
+					if os.path.exists(self._filename):
+						os.remove(self._filename)
+					self._db = self._connect()
+					changed = set(self._data)
+				else:
+					changed = self._changed
+				with self._db:
+					for key in changed:
+						if key in self._data:
+							value = pickle.dumps(self._data[key], pickle.HIGHEST_PROTOCOL)
+							self._db.execute('INSERT OR REPLACE INTO entry(key, value) VALUES(?, ?)', (key, value))
+						else:
+							self._db.execute('DELETE FROM entry WHERE key = ?', (key, ))
+				self._changed = set()
 				self.log.debug('%s.sync(): success', self)
-		except Exception as e:
-			# Ignore all exceptions because saving the cache on disk is not critical.
-			self.log.warning("Warning: Unable to save cache into {0!s}: {1!s}".
-				format(self._filename, str(e)))
+			except Exception as e:
+				# Ignore all exceptions because saving the cache on disk is not critical.
+				self.log.warning("Warning: Unable to save cache into {0!s}: {1!s}".
+					format(self._filename, str(e)))
 
 	def close(self):
 		"""Write the file to disk if possible and then invalidate the object in memory."""
 		self.log.debug('%s.close()', self)
 		self.sync()
-		self._filename = None
-		self._data = None
+		with self._lock:
+			if self._db is not None:
+				self._db.close()
+			self._db = None
+			self._filename = None
+			self._data = None
+
+	def _load(self, key):
+		"""Loads the entry from disk into memory.
+		@return: whether there is such an entry"""
+		if self._db is None or key in self._changed:
+			return False
+		try:
+			row = self._db.execute('SELECT value FROM entry WHERE key = ?', (key, )).fetchone()
+			if row is None:
+				return False
+			self._data[key] = pickle.loads(row[0])
+		except Exception as e:
+			self.log.warning("Warning: Failed to load {0!s} from cache: {1!s}".format(key, e))
+			return False
+		return True
 
 	def __getitem__(self, key):
 		"""This function enables the following syntax: cache[key]"""
 		self.log.debug("%s.__getitem__('%s')", self, key)
-		return self._data[key]
+		with self._lock:
+			if key not in self._data and not self._load(key):
+				raise KeyError(key)
+			return self._data[key]
+
+	def get(self, key, default=None):
+		with self._lock:
+			if key not in self._data and not self._load(key):
+				return default
+			return self._data[key]
 
 	def __setitem__(self, key, value):
 		"""This function enables the following syntax: cache[key] = value"""
 		self.log.debug("%s.__setitem__('%s', data excluded)", self, key)
-		self._data[key] = value
+		with self._lock:
+			self._data[key] = value
+			self._changed.add(key)
+
+	def __delitem__(self, key):
+		"""This function enables the following syntax: del cache[key]"""
+		with self._lock:
+			if key not in self._data and not self._load(key):
+				raise KeyError(key)
+			del self._data[key]
+			self._changed.add(key)
 
 	def __contains__(self, item):
 		"""This function enables the following syntax: item in cache"""
 		self.log.debug("%s.__contains__('%s')", self, item)
-		return item in self._data
+		with self._lock:
+			return item in self._data or self._load(item)
 
 	def __str__(self):
-		return "YamlCacheStorage('{0!s}', {1:d} items)".format(self._filename, len(self._data))
+		return "YamlCacheStorage('{0!s}', {1:d} items in memory)".format(self._filename, len(self._data))
@@ -40,8 +40,12 @@ from horizons.messaging import LoadingProgress
 from horizons.scheduler import Scheduler
 from horizons.util.buildingindexer import BuildingIndexer
 from horizons.util.color import Color
+from horizons.util.pathfinding.pather import ShipRouteCache
+from horizons.util.pathfinding.pathnodes import PathNodeGrid
+from horizons.util.python.callback import Callback
 from horizons.util.savegameaccessor import SavegameAccessor
 from horizons.util.shapes import Circle, Point, Rect
+from horizons.util.spatialindex import SpatialIndex
 from horizons.util.worldobject import WorldObject
 from horizons.world import worldutils
 from horizons.world.buildingowner import BuildingOwner
@@ -49,6 +53,7 @@ from horizons.world.diplomacy import Diplomacy
 from horizons.world.disaster.disastermanager import DisasterManager
 from horizons.world.island import Island
 from horizons.world.player import HumanPlayer
+from horizons.world.tilemap import TileMap
 from horizons.world.units.weapon import Weapon
 
 
@@ -63,12 +68,15 @@ class World(BuildingOwner, WorldObject):
 	   * players - a list of all the session's players - Player instances
 	   * islands - a list of all the map's islands - Island instances
 	   * grounds - a list of all the map's groundtiles
-	   * ground_map - a dictionary that binds tuples of coordinates with a reference to the tile:
+	   * ground_map - a TileMap that binds tuples of coordinates with a reference to the water tile:
 	                  { (x, y): tileref, ...}
 	                 This is important for pathfinding and quick tile fetching.
-	   * island_map - a dictionary that binds tuples of coordinates with a reference to the island
+	   * full_map - same as ground_map, but also contains the tiles of the islands
+	   * island_map - a TileMap that binds tuples of coordinates with a reference to the island
 	   * ships - a list of all the ships ingame - horizons.world.units.ship.Ship instances
 	   * ship_map - same as ground_map, but for ships
+	   * ship_index, ground_unit_index, building_index - SpatialIndex instances to find the
+	                 ships, ground units and buildings in a radius
 	   * session - reference to horizons.session.Session instance of the current game
 	   * trader - The world's ingame free trader player instance (can control multiple ships)
 	   * pirate - The world's ingame pirate player instance
@@ -94,8 +102,15 @@ class World(BuildingOwner, WorldObject):
 		# and having at least one reference to them
 		self.ships = []
 		self.ground_units = []
+		self.ship_index = SpatialIndex()
+		self.ground_unit_index = SpatialIndex()
+		self.building_index = SpatialIndex()
 
 		self.islands = []
+		# warehouses by owner and by the player who can trade with them, built on demand
+		self._warehouses = None
+		self._warehouses_by_owner = None
+		self._tradeable_warehouses = {}
 
 		super().__init__(worldid=GAME.WORLD_WORLDID)
 
@@ -126,8 +141,12 @@ class World(BuildingOwner, WorldObject):
 		self.water = None
 		self.ships = None
 		self.ship_map = None
+		self.ship_route_cache = None
 		self.fish_indexer = None
 		self.ground_units = None
+		self.ship_index = None
+		self.ground_unit_index = None
+		self.building_index = None
 
 		if self.pirate is not None:
 			self.pirate.end()
@@ -139,6 +158,9 @@ class World(BuildingOwner, WorldObject):
 
 		self.islands = None
 		self.diplomacy = None
+		self._warehouses = None
+		self._warehouses_by_owner = None
+		self._tradeable_warehouses = None
 
 	def _init(self, savegame_db, force_player_id=None, disasters_enabled=True):
 		"""
@@ -171,7 +193,7 @@ class World(BuildingOwner, WorldObject):
 
 		# use a dict because it's directly supported by the pathfinding algo
 		LoadingProgress.broadcast(self, 'world_init_water')
-		self.water = {tile: 1.0 for tile in self.ground_map}
+		self.water = PathNodeGrid(self.map_dimensions, dict.fromkeys(self.ground_map, 1.0))
 		self._init_water_bodies()
 		self.sea_number = self.water_body[(self.min_x, self.min_y)]
 		for island in self.islands:
@@ -192,6 +214,7 @@ class World(BuildingOwner, WorldObject):
 		# create ship position list. entries: ship_map[(x, y)] = ship
 		self.ship_map = {}
 		self.ground_unit_map = {}
+		self.ship_route_cache = ShipRouteCache()
 
 		if self.session.is_game_loaded():
 			# there are 0 or 1 trader AIs so this is safe
@@ -247,6 +270,7 @@ class World(BuildingOwner, WorldObject):
 		self.diplomacy = Diplomacy()
 		if self.session.is_game_loaded():
 			self.diplomacy.load(self, savegame_db)
+		self.diplomacy.add_diplomacy_status_changed_listener(Callback(self._tradeable_warehouses.clear))
 
 	def _load_disasters(self, savegame_db):
 		# disasters are only enabled if they are explicitly set to be enabled
@@ -259,8 +283,8 @@ class World(BuildingOwner, WorldObject):
 		self.map_name = savegame_db.map_name
 
 		# Load islands.
-		for (islandid,) in savegame_db("SELECT DISTINCT island_id + 1001 FROM ground"):
-			island = Island(savegame_db, islandid, self.session, preview=preview)
+		for island_id in savegame_db.get_island_ids():
+			island = Island(savegame_db, island_id + 1001, self.session, preview=preview)
 			self.islands.append(island)
 
 		# Calculate map dimensions.
@@ -279,7 +303,7 @@ class World(BuildingOwner, WorldObject):
 
 		# Add water.
 		self.log.debug("Filling world with water...")
-		self.ground_map = {}
+		self.ground_map = TileMap(Rect.init_from_borders(self.min_x, self.min_y, self.max_x - 1, self.max_y - 1))
 
 		# big sea water tile class
 		if not preview:
@@ -294,6 +318,7 @@ class World(BuildingOwner, WorldObject):
 				if not preview:
 					# we don't need no references, we don't need no mem control
 					default_grounds(self.session, fake_tile_x, fake_tile_y)
+				# every coordinate needs its own tile, they carry per-tile state like object and blocked
 				for x_offset in range(fake_tile_size):
 					if self.min_x <= x + x_offset < self.max_x:
 						for y_offset in range(fake_tile_size):
@@ -302,12 +327,12 @@ class World(BuildingOwner, WorldObject):
 		self.fake_tile_map = copy.copy(self.ground_map)
 
 		# Remove parts that are occupied by islands, create the island map and the full map.
-		self.island_map = {}
+		self.island_map = TileMap(self.ground_map.bounds)
 		self.full_map = copy.copy(self.ground_map)
 		for island in self.islands:
-			for coords in island.ground_map:
+			for coords, tile in island.ground_map.items():
 				if coords in self.ground_map:
-					self.full_map[coords] = island.ground_map[coords]
+					self.full_map[coords] = tile
 					del self.ground_map[coords]
 					self.island_map[coords] = island
 
@@ -356,9 +381,23 @@ class World(BuildingOwner, WorldObject):
 			                 'are no or multiple candidates.')
 
 	@classmethod
-	def _recognize_water_bodies(cls, map_dict):
+	def _recognize_water_bodies(cls, map_dict, grid=None):
 		"""This function runs the flood fill algorithm on the water to make it easy
-		to recognize different water bodies."""
+		to recognize different water bodies.
+		The water bodies are numbered in the order in which they first appear in map_dict.
+		@param map_dict: dict {(x, y): None}, the ids of the water bodies are written into it
+		@param grid: PathNodeGrid with the same nodes as map_dict. If it is given, its
+		             connected components are used instead of the flood fill."""
+		if grid is not None and grid.complete:
+			labels = grid.label_components()
+			left, top, height = grid.left, grid.top, grid.height
+			coords_list = list(map_dict)
+			coords_labels = [labels[(x - left) * height + y - top] for (x, y) in coords_list]
+			# dicts keep the order of insertion, so this numbers the labels by first appearance
+			ids = {label: num for num, label in enumerate(dict.fromkeys(coords_labels))}
+			map_dict.update(zip(coords_list, map(ids.__getitem__, coords_labels)))
+			return
+
 		moves = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
 
 		n = 0
@@ -381,13 +420,13 @@ class World(BuildingOwner, WorldObject):
 		"""This function runs the flood fill algorithm on the water to make it easy
 		to recognize different water bodies."""
 		self.water_body = dict.fromkeys(self.water)
-		self._recognize_water_bodies(self.water_body)
+		self._recognize_water_bodies(self.water_body, self.water)
 
 	def _init_shallow_water_bodies(self):
 		"""This function runs the flood fill algorithm on the water and the coast to
 		make it easy to recognise different water bodies for fishers."""
 		self.shallow_water_body = dict.fromkeys(self.water_and_coastline)
-		self._recognize_water_bodies(self.shallow_water_body)
+		self._recognize_water_bodies(self.shallow_water_body, self.water_and_coastline)
 
 	def init_fish_indexer(self):
 		radius = Entities.buildings[BUILDINGS.FISHER].radius
@@ -559,12 +598,45 @@ class World(BuildingOwner, WorldObject):
 		@return set of islands in radius"""
 		islands = set()
 		for island in self.islands:
+			# only look at the tiles if the bounding box of the island is in range
+			if island.position.distance(point) > radius:
+				continue
 			for tile in island.get_surrounding_tiles(point, radius=radius,
 			                                         include_corners=False):
 				islands.add(island)
 				break
 		return islands
 
+	def _get_warehouse_index(self):
+		"""Returns all warehouses and a dict mapping owners to their warehouses.
+		Both are in the order of islands and settlements."""
+		if self._warehouses is None:
+			self._warehouses = []
+			self._warehouses_by_owner = {}
+			for island in self.islands:
+				for settlement in island.settlements:
+					warehouse = settlement.warehouse
+					if warehouse is not None:
+						self._warehouses.append(warehouse)
+						self._warehouses_by_owner.setdefault(warehouse.owner, []).append(warehouse)
+		return self._warehouses, self._warehouses_by_owner
+
+	def _get_tradeable_warehouses(self, player):
+		"""Returns the warehouses player can trade with, including its own ones."""
+		if player not in self._tradeable_warehouses:
+			warehouses, warehouses_by_owner = self._get_warehouse_index()
+			tradeable_owners = {owner for owner in warehouses_by_owner
+			                    if self.diplomacy.can_trade(owner, player)}
+			self._tradeable_warehouses[player] = [warehouse for warehouse in warehouses
+			                                      if warehouse.owner in tradeable_owners]
+		return self._tradeable_warehouses[player]
+
+	def notify_warehouses_changed(self):
+		"""Has to be called when a warehouse is added to or removed from the world."""
+		self._warehouses = None
+		self._warehouses_by_owner = None
+		self._tradeable_warehouses.clear()
+
 	def get_warehouses(self, position=None, radius=None, owner=None, include_tradeable=False):
 		"""Returns all warehouses on the map, optionally only those in range
 		around the specified position.
@@ -574,56 +646,44 @@ class World(BuildingOwner, WorldObject):
 		@param include_tradeable also list the warehouses the owner can trade with
 		@return: List of warehouses.
 		"""
-		warehouses = []
-		islands = []
-		if radius is not None and position is not None:
-			islands = self.get_islands_in_radius(position, radius)
-		else:
-			islands = self.islands
+		warehouses, warehouses_by_owner = self._get_warehouse_index()
+		if owner is not None:
+			if include_tradeable:
+				warehouses = self._get_tradeable_warehouses(owner)
+			else:
+				warehouses = warehouses_by_owner.get(owner, [])
 
-		for island in islands:
-			for settlement in island.settlements:
-				warehouse = settlement.warehouse
-				if (radius is None or position is None or
-				    warehouse.position.distance(position) <= radius) and \
-				   (owner is None or warehouse.owner == owner or
-				    (include_tradeable and self.diplomacy.can_trade(warehouse.owner, owner))):
-					warehouses.append(warehouse)
-		return warehouses
+		if radius is not None and position is not None:
+			return [warehouse for warehouse in warehouses if warehouse.position.distance(position) <= radius]
+		return list(warehouses)
 
 	def get_ships(self, position=None, radius=None):
 		"""Returns all ships on the map, optionally only those in range
 		around the specified position.
-		@param position: Point or Rect instance.
+		@param position: Point instance.
 		@param radius: int radius to use.
 		@return: List of ships.
 		"""
 		if position is not None and radius is not None:
-			circle = Circle(position, radius)
-			return [ship for ship in self.ships if circle.contains(ship.position)]
+			return self.ship_index.get_in_radius(position, radius)
 		else:
 			return self.ships
 
 	def get_ground_units(self, position=None, radius=None):
 		"""@see get_ships"""
 		if position is not None and radius is not None:
-			circle = Circle(position, radius)
-			return [unit for unit in self.ground_units if circle.contains(unit.position)]
+			return self.ground_unit_index.get_in_radius(position, radius)
 		else:
 			return self.ground_units
 
 	def get_buildings(self, position=None, radius=None):
-		"""@see get_ships"""
-		buildings = []
+		"""Returns the buildings on the islands, optionally only those whose center is in range
+		around the specified position.
+		@see get_ships"""
 		if position is not None and radius is not None:
-			circle = Circle(position, radius)
-			for island in self.islands:
-				for building in island.buildings:
-					if circle.contains(building.position.center):
-						buildings.append(building)
-			return buildings
+			return self.building_index.get_in_radius(position, radius)
 		else:
-			return [b for b in island.buildings for island in self.islands]
+			return [b for island in self.islands for b in island.buildings]
 
 	def get_all_buildings(self):
 		"""Yields all buildings independent of owner"""
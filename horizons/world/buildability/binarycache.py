@@ -19,56 +19,10 @@
 # 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
 # ###################################################
 
+from horizons.world.buildability.changecounter import ChangeCounter
 from horizons.world.buildability.terraincache import TerrainBuildabilityCache
 
 
-class LazyBinaryBuildabilityCacheElement:
-	"""
-	Lazily computed cache element of a BinaryBuildabilityCache instance.
-
-	Instances of this class are used to make less frequently needed caches of the
-	BinaryBuildabilityCache class instances get computed lazily just when it is needed.
-	"""
-
-	def __init__(self, buildability_cache, width):
-		self._buildability_cache = buildability_cache
-		self._width = width
-		self._cache = None
-
-	def _init_size_cache(self):
-		if self._cache is not None:
-			return
-
-		r3x3 = self._buildability_cache.cache[(3, 3)]
-		offset = self._width - 3
-
-		usable = set()
-		for coords in r3x3:
-			x, y = coords
-			if (x + offset, y) in r3x3 and (x, y + offset) in r3x3 and (x + offset, y + offset) in r3x3:
-				usable.add(coords)
-
-		self._cache = usable
-		size = (self._width, self._width)
-		# Replace the reference to this instance with the actual cache
-		self._buildability_cache.cache[size] = usable
-
-	def __getattr__(self, name):
-		# required to make set methods such as set.intersect work
-		self._init_size_cache()
-		return getattr(self._cache, name)
-
-	def __contains__(self, key):
-		# required to make the syntax "coords in cache" work efficiently
-		self._init_size_cache()
-		return key in self._cache
-
-	def __iter__(self):
-		# required to make iteration work
-		self._init_size_cache()
-		return iter(self._cache)
-
-
 class BinaryBuildabilityCache:
 	"""
 	A cache that knows where rectangles can be placed such that they are entirely inside the area.
@@ -90,6 +44,7 @@ class BinaryBuildabilityCache:
 		self.terrain_cache = terrain_cache
 		self.coords_set = set() # set((x, y), ...)
 		self._row2 = set()
+		self.change_counter = ChangeCounter(self.__class__.__name__)
 
 		self.cache = {} # {(width, height): set((x, y), ...), ...}
 		self.cache[(1, 1)] = self.coords_set
@@ -99,10 +54,6 @@ class BinaryBuildabilityCache:
 				if size[0] != size[1]:
 					self.cache[(size[1], size[0])] = set()
 
-	def _reset_lazy_sets(self):
-		self.cache[(4, 4)] = LazyBinaryBuildabilityCacheElement(self, 4)
-		self.cache[(6, 6)] = LazyBinaryBuildabilityCacheElement(self, 6)
-
 	@classmethod
 	def _extend_set(cls, cur_set, prev_set, prev_set_additions, dx, dy):
 		base_set_additions = set()
@@ -118,6 +69,19 @@ class BinaryBuildabilityCache:
 				base_set_additions.add(coords)
 		return base_set_additions
 
+	@classmethod
+	def _extend_square(cls, cur_set, r3x3, r3x3_additions, offset):
+		# a square of size offset + 3 fits at (x, y) iff 3x3 squares fit at its corners,
+		# so only the squares that have one of the new 3x3 squares in a corner can be new
+		for x, y in r3x3_additions:
+			for coords in ((x, y), (x - offset, y), (x, y - offset), (x - offset, y - offset)):
+				if coords in cur_set:
+					continue
+				origin_x, origin_y = coords
+				if coords in r3x3 and (origin_x + offset, origin_y) in r3x3 and \
+				   (origin_x, origin_y + offset) in r3x3 and (origin_x + offset, origin_y + offset) in r3x3:
+					cur_set.add(coords)
+
 	def add_area(self, new_coords_list):
 		"""
 		Add a list of new coordinates to the area.
@@ -132,6 +96,7 @@ class BinaryBuildabilityCache:
 			assert coords not in self.coords_set
 			assert coords in self.terrain_cache.land_or_coast
 			self.coords_set.add(coords)
+		self.change_counter.add(len(new_coords_list))
 
 		coords_set = self.coords_set
 		new_coords_set = set(new_coords_list)
@@ -145,8 +110,12 @@ class BinaryBuildabilityCache:
 		new_r3x2 = self._extend_set(self.cache[(3, 2)], self.cache[(2, 2)], new_r2x2, 1, 0)
 		new_r4x2 = self._extend_set(self.cache[(4, 2)], self.cache[(3, 2)], new_r3x2, 1, 0)
 
-		self._extend_set(self.cache[(3, 3)], self.cache[(3, 2)], new_r3x2, 0, 1)
-		self._reset_lazy_sets()
+		new_r3x3 = self._extend_set(self.cache[(3, 3)], self.cache[(3, 2)], new_r3x2, 0, 1)
+
+		# the larger squares are made of four (possibly overlapping) 3x3 squares
+		r3x3 = self.cache[(3, 3)]
+		self._extend_square(self.cache[(4, 4)], r3x3, new_r3x3, 1)
+		self._extend_square(self.cache[(6, 6)], r3x3, new_r3x3, 3)
 
 	@classmethod
 	def _reduce_set(cls, cur_set, prev_set_removals, dx, dy):
@@ -163,12 +132,21 @@ class BinaryBuildabilityCache:
 				base_set_removals.add(coords)
 		return base_set_removals
 
+	@classmethod
+	def _reduce_square(cls, cur_set, r3x3_removals, offset):
+		for x, y in r3x3_removals:
+			cur_set.discard((x, y))
+			cur_set.discard((x - offset, y))
+			cur_set.discard((x, y - offset))
+			cur_set.discard((x - offset, y - offset))
+
 	def remove_area(self, removed_coords_list):
 		"""Remove a list of existing coordinates from the area."""
 		for coords in removed_coords_list:
 			assert coords in self.coords_set
 			assert coords in self.terrain_cache.land_or_coast
 			self.coords_set.discard(coords)
+		self.change_counter.add(len(removed_coords_list))
 		removed_coords_set = set(removed_coords_list)
 
 		removed_row2 = self._reduce_set(self._row2, removed_coords_set, 1, 0)
@@ -180,5 +158,6 @@ class BinaryBuildabilityCache:
 		removed_r3x2 = self._reduce_set(self.cache[(3, 2)], removed_r2x2, 1, 0)
 		removed_r4x2 = self._reduce_set(self.cache[(4, 2)], removed_r3x2, 1, 0)
 
-		self._reduce_set(self.cache[(3, 3)], removed_r3x2, 0, 1)
-		self._reset_lazy_sets()
+		removed_r3x3 = self._reduce_set(self.cache[(3, 3)], removed_r3x2, 0, 1)
+		self._reduce_square(self.cache[(4, 4)], removed_r3x3, 1)
+		self._reduce_square(self.cache[(6, 6)], removed_r3x3, 3)
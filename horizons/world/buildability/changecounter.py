@@ -0,0 +1,56 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import logging
+
+
+class ChangeCounter:
+	"""
+	Counts the changes of a buildability cache and the number of tiles they touched.
+
+	This is meant for finding out whether the caches are updated with more tiles than
+	necessary, e.g. when a whole settlement area is passed instead of the changed part.
+	Every change is logged with debug level to the world.buildability logger.
+	"""
+
+	log = logging.getLogger("world.buildability")
+
+	def __init__(self, name):
+		"""
+		@param name: name of the counted cache, used in the log messages
+		"""
+		self.name = name
+		self.changes = 0
+		self.tiles = 0
+		self.last_tiles = 0 # number of tiles touched by the latest change
+
+	def add(self, num_tiles):
+		self.changes += 1
+		self.tiles += num_tiles
+		self.last_tiles = num_tiles
+		self.log.debug("%s: %s", self.name, self)
+
+	def get_average(self):
+		"""Returns the average number of tiles per change."""
+		return self.tiles / self.changes if self.changes else 0.0
+
+	def __str__(self):
+		return '{:d} changes touched {:d} tiles (last: {:d})'.format(self.changes, self.tiles, self.last_tiles)
@@ -39,6 +39,8 @@ class FreeIslandBuildabilityCache:
 	def __init__(self, island):
 		self._binary_cache = BinaryBuildabilityCache(island.terrain_cache)
 		self.cache = self._binary_cache.cache # {(width, height): set((x, y), ...), ...}
+		self.change_counter = self._binary_cache.change_counter
+		self.change_counter.name = self.__class__.__name__
 		self.island = island
 		self._init()
 
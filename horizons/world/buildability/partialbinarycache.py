@@ -19,6 +19,7 @@
 # 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
 # ###################################################
 
+from horizons.world.buildability.changecounter import ChangeCounter
 from horizons.world.buildability.terraincache import TerrainBuildabilityCache
 
 
@@ -43,6 +44,7 @@ class PartialBinaryBuildabilityCache:
 		self.terrain_cache = terrain_cache
 		self.coords_set = set() # set((x, y), ...)
 		self._row2 = set()
+		self.change_counter = ChangeCounter(self.__class__.__name__)
 
 		sizes = set(TerrainBuildabilityCache.sizes)
 		# extra sizes for the intermediate computation
@@ -80,6 +82,7 @@ class PartialBinaryBuildabilityCache:
 			assert coords not in self.coords_set
 			assert coords in self.terrain_cache.land_or_coast
 			self.coords_set.add(coords)
+		self.change_counter.add(len(new_coords_list))
 
 		added_coords_set = set(new_coords_list)
 		new_row2 = self._extend_set(self._row2, added_coords_set, 1, 0)
@@ -122,6 +125,7 @@ class PartialBinaryBuildabilityCache:
 			assert coords in self.coords_set
 			assert coords in self.terrain_cache.land_or_coast
 			self.coords_set.discard(coords)
+		self.change_counter.add(len(removed_coords_list))
 		removed_coords_set = set(removed_coords_list)
 
 		removed_row2 = self._reduce_set(self._row2, self.coords_set, removed_coords_set, 1, 0)
@@ -20,6 +20,7 @@
 # ###################################################
 
 from horizons.ai.aiplayer.constants import BUILDING_PURPOSE
+from horizons.world.buildability.changecounter import ChangeCounter
 from horizons.world.buildability.connectedareacache import ConnectedAreaCache
 
 
@@ -37,8 +38,11 @@ class PotentialRoadConnectivityCache:
 		self._area_builder = area_builder
 		self._land_manager = area_builder.land_manager
 		self._settlement_ground_map = area_builder.settlement.ground_map
+		self._island = area_builder.island
+		self._island_change_id = self._island.last_change_id
 		self._cache = ConnectedAreaCache()
 		self.area_numbers = self._cache.area_numbers # {(x, y): area id, ...}
+		self.change_counter = ChangeCounter(self.__class__.__name__)
 
 	def modify_area(self, coords_list):
 		"""
@@ -78,6 +82,23 @@ class PotentialRoadConnectivityCache:
 			self._cache.add_area(add_list)
 		if remove_list:
 			self._cache.remove_area(remove_list)
+		self.change_counter.add(len(coords_list))
+
+	def _apply_island_changes(self):
+		"""Refresh the coordinates whose owner may have changed since the last query."""
+		rects = self._island.get_changes_since(self._island_change_id)
+		self._island_change_id = self._island.last_change_id
+		if rects is None:
+			# the journal doesn't reach back far enough, refresh everything that could be in the area
+			coords_set = set(self.area_numbers)
+			coords_set.update(self._area_builder.plan)
+			coords_set.update(self._land_manager.roads)
+		else:
+			coords_set = set()
+			for rect in rects:
+				coords_set.update(rect.tuple_iter())
+		if coords_set:
+			self.modify_area(sorted(coords_set))
 
 	def is_connection_possible(self, coords_set1, coords_set2):
 		"""Return True if and only if it is possible to connect the two coordinate sets.
@@ -87,6 +108,7 @@ class PotentialRoadConnectivityCache:
 		the area. This is done cheaply using the underlying ConnectedAreaCache.
 		"""
 
+		self._apply_island_changes()
 		areas1 = set()
 		for coords in coords_set1:
 			if coords in self.area_numbers:
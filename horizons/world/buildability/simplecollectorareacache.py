@@ -36,6 +36,8 @@ class SimpleCollectorAreaCache:
 		self.terrain_cache = terrain_cache
 		self._area_cache = PartialBinaryBuildabilityCache(terrain_cache)
 		self.cache = self._area_cache.cache # {(width, height): set((x, y), ...), ...}
+		self.change_counter = self._area_cache.change_counter
+		self.change_counter.name = self.__class__.__name__
 		self._buildings = set()
 		self._area_coverage = {}
 
@@ -82,6 +82,7 @@ class Warehouse(StorageBuilding, BuildableSingleFromShip):
 		self.settlement.warehouse = self
 		# we never need to unset this since warehouses are indestructible
 		# settlement warehouse setting is done at the settlement for loading
+		self.session.world.notify_warehouses_changed()
 
 	def get_status_icons(self):
 		banned_classes = (InventoryFullStatus,)
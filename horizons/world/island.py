@@ -20,7 +20,7 @@
 # ###################################################
 
 import logging
-from collections import defaultdict
+from collections import defaultdict, deque
 
 from horizons.command.building import Tear
 from horizons.constants import BUILDINGS, RES, UNITS
@@ -90,7 +90,7 @@ class Island(BuildingOwner, WorldObject):
 			# Create building indexers.
 			from horizons.world.units.animal import WildAnimal
 			self.building_indexers = {}
-			self.building_indexers[BUILDINGS.TREE] = BuildingIndexer(WildAnimal.walking_range, self, self.session.random)
+			self.building_indexers[BUILDINGS.TREE] = BuildingIndexer(WildAnimal.walking_range, self.ground_map, self.session.random)
 
 		# Load settlements.
 		for (settlement_id,) in db("SELECT rowid FROM settlement WHERE island = ?", island_id):
@@ -126,10 +126,8 @@ class Island(BuildingOwner, WorldObject):
 		Load the actual island from a file
 		@param preview: flag, map preview mode
 		"""
-		p_x, p_y, width, height = db("SELECT MIN(x), MIN(y), (1 + MAX(x) - MIN(x)), (1 + MAX(y) - MIN(y)) FROM ground WHERE island_id = ?", island_id - 1001)[0]
-
 		self.ground_map = {}
-		for (x, y, ground_id, action_id, rotation) in db("SELECT x, y, ground_id, action_id, rotation FROM ground WHERE island_id = ?", island_id - 1001): # Load grounds
+		for (x, y, ground_id, action_id, rotation) in db.get_island_ground(island_id - 1001): # Load grounds
 			if not preview: # actual game, need actual tiles
 				ground = Entities.grounds[str('{:d}-{}'.format(ground_id, action_id))](self.session, x, y)
 				ground.act(rotation)
@@ -151,15 +149,14 @@ class Island(BuildingOwner, WorldObject):
 		self.num_trees = 0
 
 		# define the rectangle with the smallest area that contains every island tile its position
-		min_x = min(list(zip(*self.ground_map.keys()))[0])
-		max_x = max(list(zip(*self.ground_map.keys()))[0])
-		min_y = min(list(zip(*self.ground_map.keys()))[1])
-		max_y = max(list(zip(*self.ground_map.keys()))[1])
-		self.position = Rect.init_from_borders(min_x, min_y, max_x, max_y)
+		xs, ys = zip(*self.ground_map.keys())
+		self.position = Rect.init_from_borders(min(xs), min(ys), max(xs), max(ys))
+
+		# the path nodes are only created once they are needed, see path_nodes
+		self._path_nodes = None
 
 		if not preview:
 			# This isn't needed for map previews, but it is in actual games.
-			self.path_nodes = IslandPathNodes(self)
 			self.barrier_nodes = IslandBarrierNodes(self)
 
 			# Repopulate wild animals every 2 mins if they die out.
@@ -172,6 +169,15 @@ class Island(BuildingOwner, WorldObject):
 		Please proceed to horizons/component/componentholder.py.
 		"""
 
+	@property
+	def path_nodes(self):
+		"""The IslandPathNodes of the island.
+		Checking the walkability of every tile is expensive and most islands are never walked
+		on or built on, so they are created on first access."""
+		if self._path_nodes is None and self.ground_map is not None:
+			self._path_nodes = IslandPathNodes(self)
+		return self._path_nodes
+
 	def save(self, db):
 		super().save(db)
 		for settlement in self.settlements:
@@ -234,7 +240,7 @@ class Island(BuildingOwner, WorldObject):
 		@param settlement:
 		"""
 		settlement_coords_changed = []
-		for coords in position.get_radius_coordinates(radius, include_self=True):
+		for coords in position.get_radius_coordinates_in(radius, self.position, include_self=True):
 			if coords not in self.ground_map:
 				continue
 
@@ -280,7 +286,7 @@ class Island(BuildingOwner, WorldObject):
 		Minimap.update(None)
 		self.available_land_cache.remove_area(settlement_coords_changed)
 
-		self._register_change()
+		self._register_change(settlement_coords_changed)
 		if self.terrain_cache:
 			settlement.buildability_cache.modify_area(settlement_coords_changed)
 
@@ -321,7 +327,7 @@ class Island(BuildingOwner, WorldObject):
 		Minimap.update(None)
 		self.available_land_cache.add_area(clean_coords)
 
-		self._register_change()
+		self._register_change(settlement_coords_to_change)
 		if self.terrain_cache:
 			settlement.buildability_cache.modify_area(clean_coords)
 
@@ -350,12 +356,15 @@ class Island(BuildingOwner, WorldObject):
 			building.settlement.add_building(building, load)
 		if building.id in self.building_indexers:
 			self.building_indexers[building.id].add(building)
+		self.session.world.building_index.add(building, building.position.center)
 
 		# Reset the tiles this building was covering
-		for coords in building.position.tuple_iter():
-			self.path_nodes.reset_tile_walkability(coords)
+		# (path nodes that don't exist yet will see the building when they are created)
+		if self._path_nodes is not None:
+			for coords in building.position.tuple_iter():
+				self._path_nodes.reset_tile_walkability(coords)
 		if not load:
-			self._register_change()
+			self._register_change(building.position.tuple_iter())
 
 		# keep track of the number of trees for animal population control
 		if building.id == BUILDINGS.TREE:
@@ -379,11 +388,15 @@ class Island(BuildingOwner, WorldObject):
 		super().remove_building(building)
 		if building.id in self.building_indexers:
 			self.building_indexers[building.id].remove(building)
+		self.session.world.building_index.remove(building)
+		if building.id == BUILDINGS.WAREHOUSE:
+			self.session.world.notify_warehouses_changed()
 
 		# Reset the tiles this building was covering (after building has been completely removed)
-		for coords in building.position.tuple_iter():
-			self.path_nodes.reset_tile_walkability(coords)
-			self._register_change()
+		if self._path_nodes is not None:
+			for coords in building.position.tuple_iter():
+				self._path_nodes.reset_tile_walkability(coords)
+		self._register_change(building.position.tuple_iter())
 
 		# keep track of the number of trees for animal population control
 		if building.id == BUILDINGS.TREE:
@@ -412,7 +425,7 @@ class Island(BuildingOwner, WorldObject):
 		@param location: anything that supports get_radius_coordinates (usually Rect).
 		@param include_self: bool, whether to include the coordinates in location
 		"""
-		for coord in location.get_radius_coordinates(radius, include_self):
+		for coord in location.get_radius_coordinates_in(radius, self.position, include_self):
 			try:
 				yield self.ground_map[coord]
 			except KeyError:
@@ -439,13 +452,43 @@ class Island(BuildingOwner, WorldObject):
 				animal.initialize()
 				return
 
+	CHANGE_JOURNAL_LENGTH = 64
+
 	def _init_cache(self):
 		""" initializes the cache that knows when the last time the buildability of a rectangle may have changed on this island """
 		self.last_change_id = -1
+		self._change_journal = deque(maxlen=self.CHANGE_JOURNAL_LENGTH) # [(change id, dirty Rect), ...]
 
-	def _register_change(self):
-		""" registers the possible buildability change of a rectangle on this island """
+	def _register_change(self, coords_iter):
+		""" registers the possible buildability change of the given coordinates on this island """
 		self.last_change_id += 1
+		coords_list = list(coords_iter)
+		if coords_list:
+			xs, ys = zip(*coords_list)
+			self._change_journal.append((self.last_change_id, Rect.init_from_borders(min(xs), min(ys), max(xs), max(ys))))
+
+	def get_changes_since(self, change_id):
+		"""Returns the rectangles in which the buildability may have changed after the given change.
+		@param change_id: a former value of last_change_id
+		@return: list of Rects, or None if the journal doesn't reach back that far"""
+		if change_id == self.last_change_id:
+			return []
+		if not self._change_journal or self._change_journal[0][0] > change_id + 1:
+			return None
+		return [rect for (rect_change_id, rect) in self._change_journal if rect_change_id > change_id]
+
+	def has_changes_in(self, change_id, coords_container):
+		"""Returns whether the buildability of any of the given coordinates may have changed
+		after the given change.
+		@param change_id: a former value of last_change_id
+		@param coords_container: set or dict of coordinate tuples, e.g. the ground map of a settlement"""
+		rects = self.get_changes_since(change_id)
+		if rects is None:
+			return True
+		for rect in rects:
+			if any(coords in coords_container for coords in rect.tuple_iter()):
+				return True
+		return False
 
 	def end(self):
 		# NOTE: killing animals before buildings is an optimization, else they would
@@ -457,6 +500,6 @@ class Island(BuildingOwner, WorldObject):
 			settlement.end()
 		self.wild_animals = None
 		self.ground_map = None
-		self.path_nodes = None
+		self._path_nodes = None
 		self.barrier_nodes = None
 		self.building_indexers = None
@@ -20,12 +20,13 @@
 # ###################################################
 
 import logging
-from collections import defaultdict, deque
+from collections import defaultdict
 
 from horizons.constants import PRODUCTION
 from horizons.scheduler import Scheduler
 from horizons.util.changelistener import ChangeListener, metaChangeListenerDecorator
 from horizons.world.production.productionline import ProductionLine
+from horizons.world.production.statehistory import StateHistory
 
 
 @metaChangeListenerDecorator("production_finished")
@@ -66,7 +67,7 @@ class Production(ChangeListener):
 		super().__init__(**kwargs)
 		# this has grown to be a bit weird compared to other init/loads
 		# __init__ is always called before load, therefore load just overwrites some of the values here
-		self._state_history = deque()
+		self._state_history = self._create_state_history()
 		self.prod_id = prod_id
 		self.prod_data = prod_data
 		self.__start_finished = start_finished
@@ -141,7 +142,7 @@ class Production(ChangeListener):
 			# saving, where it hasn't triggered yet, therefore it won't now
 			self._add_listeners()
 
-		self._state_history = db.get_production_state_history(worldid, self.prod_id)
+		self._state_history = self._create_state_history(db.get_production_state_history(worldid, self.prod_id))
 
 	def remove(self):
 		self._remove_listeners()
@@ -251,27 +252,9 @@ class Production(ChangeListener):
 		Returns the part of time 0 <= x <= 1 the production has been in a state during the last history_length ticks.
 		"""
 		self._clean_state_history()
-		result = defaultdict(int)
 		current_tick = Scheduler().cur_tick
-		pause_state = PRODUCTION.STATES.paused.index
 		first_relevant_tick = self._get_first_relevant_tick(ignore_pause)
-		num_entries = len(self._state_history)
-
-		for i in range(num_entries):
-			if ignore_pause and self._state_history[i][1] == pause_state:
-				continue
-			tick = self._state_history[i][0]
-			if tick >= current_tick:
-				break
-
-			next_tick = min(self._state_history[i + 1][0], current_tick) if i + 1 < num_entries else current_tick
-			if next_tick <= first_relevant_tick:
-				continue
-			relevant_ticks = next_tick - tick
-			if tick < first_relevant_tick:
-				# the beginning is not relevant
-				relevant_ticks -= first_relevant_tick - tick
-			result[self._state_history[i][1]] += relevant_ticks
+		result = defaultdict(int, self._state_history.get_times(first_relevant_tick, current_tick, ignore_pause))
 
 		total_length = sum(result.values())
 		if total_length == 0:
@@ -310,36 +293,23 @@ class Production(ChangeListener):
 			return first_relevant_tick
 
 		# ignore paused time
-		pause_state = PRODUCTION.STATES.paused.index
-		for i in range(len(self._state_history) - 1, -1, -1):
-			if self._state_history[i][1] != pause_state:
-				continue
-			tick = self._state_history[i][0]
-			next_tick = self._state_history[i + 1][0] if i + 1 < len(self._state_history) else current_tick
-			if next_tick <= first_relevant_tick:
-				break
-			first_relevant_tick -= next_tick - tick
+		first_relevant_tick = self._state_history.get_first_relevant_tick(first_relevant_tick, current_tick)
 		return max(self._creation_tick, first_relevant_tick)
 
+	@staticmethod
+	def _create_state_history(entries=()):
+		return StateHistory(len(PRODUCTION.STATES), PRODUCTION.STATES.paused.index, entries)
+
 	def _clean_state_history(self):
 		""" remove the part of the state history that is too old to matter """
-		first_relevant_tick = self._get_first_relevant_tick(True)
-		while len(self._state_history) > 1 and self._state_history[1][0] < first_relevant_tick:
-			self._state_history.popleft()
+		self._state_history.drop_before(self._get_first_relevant_tick(True))
 
 	def _changed(self):
 		super()._changed()
 		if not self._prod_line.save_statistics:
 			return
 
-		state = self._state.index
-		current_tick = Scheduler().cur_tick
-
-		if self._state_history and self._state_history[-1][0] == current_tick:
-			self._state_history.pop() # make sure no two events are on the same tick
-		if not self._state_history or self._state_history[-1][1] != state:
-			self._state_history.append((current_tick, state))
-
+		self._state_history.change(Scheduler().cur_tick, self._state.index)
 		self._clean_state_history()
 
 	def _check_inventory(self):
@@ -0,0 +1,146 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+from bisect import bisect_right
+from collections import deque
+
+
+class StateHistory:
+	"""Log of the state changes of a production, used for utilization statistics.
+
+	Every entry stores the tick of a change and the new state, plus the number of ticks
+	spent in each state between the first entry and that change. This way, the time spent
+	in each state during an interval only requires looking up the entries at the borders
+	of the interval. The entries are kept in lists that are used as a queue: old entries are
+	dropped by moving the start index forward, the lists are compacted once in a while.
+	"""
+
+	# compact the lists if at least this many entries have been dropped and they are the majority
+	COMPACT_THRESHOLD = 32
+
+	def __init__(self, num_states, pause_state, entries=()):
+		"""
+		@param num_states: number of different states
+		@param pause_state: index of the state that can be ignored in queries
+		@param entries: iterable of (tick, state) pairs in tick order, e.g. from a savegame
+		"""
+		self._num_states = num_states
+		self._pause_state = pause_state
+		self._ticks = []
+		self._states = []
+		self._totals = [] # per entry: list with the ticks spent in each state before it
+		self._start = 0 # index of the first entry that hasn't been dropped
+		self._pause_entries = deque() # indices of the entries that start a pause
+		for tick, state in entries:
+			self._append(tick, state)
+
+	def __len__(self):
+		return len(self._ticks) - self._start
+
+	def __iter__(self):
+		"""Yields all (tick, state) pairs, oldest first."""
+		return zip(self._ticks[self._start:], self._states[self._start:])
+
+	def change(self, tick, state):
+		"""Records that the state has changed to state at tick.
+		There is at most one entry per tick, consecutive entries with the same state are merged."""
+		if len(self) and self._ticks[-1] == tick:
+			self._pop() # make sure no two events are on the same tick
+		if not len(self) or self._states[-1] != state:
+			self._append(tick, state)
+
+	def _append(self, tick, state):
+		if len(self):
+			last_totals = self._totals[-1]
+			totals = last_totals[:]
+			totals[self._states[-1]] += tick - self._ticks[-1]
+		else:
+			totals = [0] * self._num_states
+		if state == self._pause_state:
+			self._pause_entries.append(len(self._ticks))
+		self._ticks.append(tick)
+		self._states.append(state)
+		self._totals.append(totals)
+
+	def _pop(self):
+		if self._pause_entries and self._pause_entries[-1] == len(self._ticks) - 1:
+			self._pause_entries.pop()
+		self._ticks.pop()
+		self._states.pop()
+		self._totals.pop()
+
+	def _totals_at(self, tick):
+		"""Returns the ticks spent in each state before tick (counted from the first entry)."""
+		i = bisect_right(self._ticks, tick, self._start) - 1
+		if i < self._start:
+			return self._totals[self._start]
+		if self._ticks[i] == tick:
+			return self._totals[i]
+		totals = self._totals[i][:]
+		totals[self._states[i]] += tick - self._ticks[i]
+		return totals
+
+	def get_times(self, first_tick, current_tick, ignore_pause):
+		"""Returns the number of ticks spent in each state between first_tick and current_tick.
+		@return: dict {state: ticks}, only contains states with ticks > 0"""
+		if not len(self) or first_tick >= current_tick:
+			return {}
+		start = self._totals_at(first_tick)
+		end = self._totals_at(current_tick)
+		result = {}
+		for state in range(self._num_states):
+			ticks = end[state] - start[state]
+			if ticks > 0 and not (ignore_pause and state == self._pause_state):
+				result[state] = ticks
+		return result
+
+	def get_first_relevant_tick(self, first_tick, current_tick):
+		"""Moves first_tick back by the length of each pause since then.
+		Pauses are considered from the latest on, every pause that ended after the current
+		first tick moves it back further."""
+		ticks = self._ticks
+		for i in reversed(self._pause_entries):
+			next_tick = ticks[i + 1] if i + 1 < len(ticks) else current_tick
+			if next_tick <= first_tick:
+				break
+			first_tick -= next_tick - ticks[i]
+		return first_tick
+
+	def drop_before(self, tick):
+		"""Drops entries that have been replaced by another entry before tick.
+		The latest entry is always kept."""
+		ticks = self._ticks
+		start = self._start
+		while len(ticks) - start > 1 and ticks[start + 1] < tick:
+			start += 1
+		if start == self._start:
+			return
+		self._start = start
+		while self._pause_entries and self._pause_entries[0] < start:
+			self._pause_entries.popleft()
+
+		if start >= self.COMPACT_THRESHOLD and 2 * start > len(ticks):
+			del self._ticks[:start]
+			del self._states[:start]
+			del self._totals[:start]
+			self._pause_entries = deque(i - start for i in self._pause_entries)
+			self._start = 0
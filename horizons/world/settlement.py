@@ -187,6 +187,7 @@ class Settlement(ComponentHolder, WorldObject, ChangeListener, ResourceHandler):
 			building = load_building(session, db, building_type, building_id)
 			if building_type == BUILDINGS.WAREHOUSE:
 				self.warehouse = building
+				session.world.notify_warehouses_changed()
 
 		for res, amount in db("SELECT res, amount FROM settlement_produced_res WHERE settlement = ?", worldid):
 			self.produced_res[res] = amount
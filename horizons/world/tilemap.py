@@ -0,0 +1,141 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+from collections.abc import MutableMapping
+
+
+class TileMap(MutableMapping):
+	"""Dict-like mapping {(x, y): value} for the coords of the rectangle `bounds`.
+
+	The values are stored in one flat list in column-major order, so no tuple keys or
+	dict entries are allocated per tile. This matters for the world maps, which have an
+	entry for every tile of the map. A cell that contains None has no value, therefore
+	None can't be stored. Coords outside of the bounds are never contained.
+	"""
+	def __init__(self, bounds):
+		self.bounds = bounds
+		self.left = bounds.left
+		self.top = bounds.top
+		self.width = bounds.width
+		self.height = bounds.height
+		self._cells = [None] * (self.width * self.height)
+		self._len = 0
+
+	def index(self, coords):
+		"""Returns the list index of coords or None if coords are outside of the bounds."""
+		x = coords[0] - self.left
+		y = coords[1] - self.top
+		if 0 <= x < self.width and 0 <= y < self.height:
+			return x * self.height + y
+		return None
+
+	def coords(self, index):
+		"""Returns the coords tuple of a list index."""
+		return (index // self.height + self.left, index % self.height + self.top)
+
+	def fill(self, rect, value):
+		"""Sets value for all coords of rect, coords outside of the bounds are ignored.
+		This is much faster than setting them one by one.
+		@param rect: Rect
+		@param value: value to set, None removes the entries"""
+		rect = self.bounds.intersect(rect)
+		if rect is None:
+			return
+		cells = self._cells
+		column_length = rect.height
+		column = [value] * column_length
+		filled = 0 if value is None else column_length
+		for x in range(rect.left, rect.right + 1):
+			start = (x - self.left) * self.height + rect.top - self.top
+			end = start + column_length
+			self._len += filled - (column_length - cells[start:end].count(None))
+			cells[start:end] = column
+
+	def __getitem__(self, coords):
+		index = self.index(coords)
+		value = None if index is None else self._cells[index]
+		if value is None:
+			raise KeyError(coords)
+		return value
+
+	def get(self, coords, default=None):
+		index = self.index(coords)
+		value = None if index is None else self._cells[index]
+		return default if value is None else value
+
+	def __contains__(self, coords):
+		index = self.index(coords)
+		return index is not None and self._cells[index] is not None
+
+	def __setitem__(self, coords, value):
+		assert value is not None
+		index = self.index(coords)
+		if index is None:
+			raise KeyError(coords)
+		if self._cells[index] is None:
+			self._len += 1
+		self._cells[index] = value
+
+	def __delitem__(self, coords):
+		index = self.index(coords)
+		if index is None or self._cells[index] is None:
+			raise KeyError(coords)
+		self._cells[index] = None
+		self._len -= 1
+
+	def __iter__(self):
+		left = self.left
+		top = self.top
+		height = self.height
+		for index, value in enumerate(self._cells):
+			if value is not None:
+				yield (index // height + left, index % height + top)
+
+	def items(self):
+		left = self.left
+		top = self.top
+		height = self.height
+		for index, value in enumerate(self._cells):
+			if value is not None:
+				yield (index // height + left, index % height + top), value
+
+	def values(self):
+		return (value for value in self._cells if value is not None)
+
+	def __len__(self):
+		return self._len
+
+	def clear(self):
+		self._cells = [None] * len(self._cells)
+		self._len = 0
+
+	def copy(self):
+		other = self.__class__.__new__(self.__class__)
+		other.bounds = self.bounds
+		other.left = self.left
+		other.top = self.top
+		other.width = self.width
+		other.height = self.height
+		other._cells = list(self._cells)
+		other._len = self._len
+		return other
+
+	__copy__ = copy
@@ -153,6 +153,7 @@ class BuildingCollector(Collector):
 			return None
 
 		jobs = JobList(self, self.job_ordering)
+		distance_field = self.get_distance_field()
 		# iterate all building that provide one of the resources
 		for building in self.get_buildings_in_range(reslist=collectable_res):
 			# check if we can pickup here on principle
@@ -161,6 +162,10 @@ class BuildingCollector(Collector):
 				target_possible = self.check_possible_job_target(building)
 				self._target_possible_cache[building] = target_possible
 
+			if target_possible and distance_field is not None and \
+			   distance_field.get_distance(building.loading_area) is None:
+				continue # we can't walk there
+
 			if target_possible:
 				# check for res here
 				reslist = (self.check_possible_job_target_for(
@@ -177,6 +182,13 @@ class BuildingCollector(Collector):
 
 		return self.get_best_possible_job(jobs)
 
+	def get_distance_field(self):
+		"""Returns the travel distances from the home building, which are shared with
+		the colleague collectors. Only available while the collector is at home."""
+		if self.home_building is None or not self.home_building.position.contains(self.position):
+			return None
+		return self.home_building.get_component(CollectingComponent).get_distance_field(self.path)
+
 	def search_job(self):
 		self._clean_job_history_log()
 		super().search_job()
@@ -31,7 +31,6 @@ from horizons.constants import COLLECTORS
 from horizons.ext.enum import Enum
 from horizons.scheduler import Scheduler
 from horizons.util.pathfinding import PathBlockedError
-from horizons.util.python import decorators
 from horizons.util.python.callback import Callback
 from horizons.util.worldobject import WorldObject
 from horizons.world.units.unit import Unit
@@ -224,6 +223,11 @@ class Collector(Unit):
 		"""Returns the next job or None"""
 		raise NotImplementedError
 
+	def get_distance_field(self):
+		"""Returns travel distances from the current position of the collector.
+		@return: PathDistanceField instance or None if they aren't available"""
+		return None
+
 	# BEHAVIOR
 	def search_job(self):
 		"""Search for a job, only called if the collector does not have a job.
@@ -456,6 +460,8 @@ class Job:
 	"""Data structure for storing information of collector jobs"""
 	ResListEntry = namedtuple("ResListEntry", ["res", "amount", "target_inventory_full"])
 
+	__slots__ = ('object', 'reslist', 'path', '_amount_sum', '_resources', '_target_inventory_full_num')
+
 	def __init__(self, obj, reslist):
 		"""
 		@param obj: ResourceHandler that provides res
@@ -475,20 +481,31 @@ class Job:
 
 		self.path = None # attribute to temporarily store path
 
-	@decorators.cachedproperty
+		# cached values of the properties below
+		self._amount_sum = None
+		self._resources = None
+		self._target_inventory_full_num = None
+
+	@property
 	def amount_sum(self):
 		# NOTE: only guaranteed to be correct during job search phase
-		return sum(entry.amount for entry in self.reslist)
+		if self._amount_sum is None:
+			self._amount_sum = sum(entry.amount for entry in self.reslist)
+		return self._amount_sum
 
-	@decorators.cachedproperty
+	@property
 	def resources(self):
 		# NOTE: only guaranteed to be correct during job search phase
-		return [entry.res for entry in self.reslist]
+		if self._resources is None:
+			self._resources = [entry.res for entry in self.reslist]
+		return self._resources
 
-	@decorators.cachedproperty
+	@property
 	def target_inventory_full_num(self):
 		# NOTE: only guaranteed to be correct during job search phase
-		return sum(1 for entry in self.reslist if entry.target_inventory_full)
+		if self._target_inventory_full_num is None:
+			self._target_inventory_full_num = sum(1 for entry in self.reslist if entry.target_inventory_full)
+		return self._target_inventory_full_num
 
 	def __str__(self):
 		return "Job({}, {})".format(self.object, self.reslist)
@@ -554,8 +571,13 @@ class JobList(list):
 
 	def _sort_jobs_distance(self):
 		"""Prefer targets that are nearer"""
-		collector_point = self.collector.position
-		self.sort(key=lambda job: collector_point.distance(job.object.loading_area))
+		distance_field = self.collector.get_distance_field()
+		if distance_field is not None:
+			# travel distance, all jobs are reachable
+			self.sort(key=lambda job: distance_field.get_distance(job.object.loading_area))
+		else:
+			collector_point = self.collector.position
+			self.sort(key=lambda job: collector_point.distance(job.object.loading_area))
 
 	def _sort_target_inventory_full(self):
 		"""Prefer targets with full inventory"""
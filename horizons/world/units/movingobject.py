@@ -152,6 +152,10 @@ class MovingObject(ComponentHolder, ConcreteObject):
 			# assumed e.g. in the collector code
 			Scheduler().add_new_object(self._move_tick, self)
 
+	def _get_spatial_index(self):
+		"""Returns the SpatialIndex of the world that contains this unit, None if there is none."""
+		return None
+
 	def _movement_finished(self):
 		self.log.debug("%s: movement finished. calling callbacks %s", self, self.move_callbacks)
 		self._next_target = self.position
@@ -174,6 +178,10 @@ class MovingObject(ComponentHolder, ConcreteObject):
 			#self.log.debug("%s move tick from %s to %s", self, self.last_position, self._next_target)
 			self.last_position = self.position
 			self.position = self._next_target
+			# listeners and callbacks may query the index, it has to know the new position
+			index = self._get_spatial_index()
+			if index is not None and self in index:
+				index.move(self, self.position)
 			self._changed()
 
 		# try to get next step, handle a blocked path
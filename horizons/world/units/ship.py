@@ -70,6 +70,7 @@ class Ship(Unit):
 	def __init(self):
 		# register ship in world
 		self.session.world.ships.append(self)
+		self.session.world.ship_index.add(self, self.position)
 		if self.in_ship_map:
 			self.session.world.ship_map[self.position.to_tuple()] = weakref.ref(self)
 
@@ -78,6 +79,7 @@ class Ship(Unit):
 
 	def remove(self):
 		self.session.world.ships.remove(self)
+		self.session.world.ship_index.remove(self)
 		self.session.view.discard_change_listener(self.draw_health)
 		if self.in_ship_map:
 			if self.position.to_tuple() in self.session.world.ship_map:
@@ -95,6 +97,9 @@ class Ship(Unit):
 	def create_route(self):
 		self.route = TradeRoute(self)
 
+	def _get_spatial_index(self):
+		return self.session.world.ship_index
+
 	def _move_tick(self, resume=False):
 		"""Keeps track of the ship's position in the global ship_map"""
 
@@ -36,6 +36,20 @@ def pytest_configure(config):
 	config.addinivalue_line('markers', 'long: mark test as long-running')
 
 
+@pytest.fixture(autouse=True, scope='session')
+def db_snapshot_dir(tmpdir_factory):
+	"""
+	Keep the snapshots of the game data database out of the cache directory of the user.
+	"""
+	from horizons.constants import PATHS
+	old_dir = PATHS.DB_SNAPSHOT_DIR
+	PATHS.DB_SNAPSHOT_DIR = str(tmpdir_factory.mktemp('dbsnapshot'))
+
+	yield PATHS.DB_SNAPSHOT_DIR
+
+	PATHS.DB_SNAPSHOT_DIR = old_dir
+
+
 def pytest_runtest_setup(item):
 	"""
 	Called for every test, here we skip expensive tests from the default test run.
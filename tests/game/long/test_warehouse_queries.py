@@ -0,0 +1,63 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+from functools import partial
+
+import pytest
+
+from horizons.util.random_map import generate_map_from_seed
+from tests.game import game_test
+
+
+def get_warehouses_by_tiles(world, position, radius, owner):
+	"""The former implementation of World.get_warehouses, which looked at every tile in range."""
+	warehouses = []
+	for island in world.islands:
+		if any(True for tile in island.get_surrounding_tiles(position, radius=radius, include_corners=False)):
+			for settlement in island.settlements:
+				warehouse = settlement.warehouse
+				if warehouse.position.distance(position) <= radius and \
+				   world.diplomacy.can_trade(warehouse.owner, owner):
+					warehouses.append(warehouse)
+	return warehouses
+
+
+@pytest.mark.long
+def test_warehouse_queries_match_tile_scan():
+	@game_test(mapgen=partial(generate_map_from_seed, 2), human_player=False, ai_players=8, timeout=20 * 60)
+	def test(session, _):
+		session.run(seconds=4 * 60)
+		world = session.world
+		assert len(world.settlements) > 1
+
+		queries = [(ship.position, ship.radius, owner)
+		           for ship in world.ships if ship.owner is not None
+		           for owner in world.players]
+		queries += [(settlement.warehouse.position.center, radius, settlement.owner)
+		            for settlement in world.settlements
+		            for radius in (1, 10, 50)]
+
+		for position, radius, owner in queries:
+			expected = get_warehouses_by_tiles(world, position, radius, owner)
+			found = world.get_warehouses(position, radius, owner, include_tradeable=True)
+			assert found == expected
+
+	test()
@@ -20,13 +20,18 @@
 # ###################################################
 
 from itertools import product
+from unittest import mock
 
 import pytest
 
+from horizons.ai.aiplayer import AIPlayer
+from horizons.ai.aiplayer.building import AbstractBuilding
+from horizons.ai.aiplayer.building.farm import AbstractFarm
 from horizons.command.building import Build, Tear
 from horizons.command.unit import CreateUnit
 from horizons.component.storagecomponent import StorageComponent
 from horizons.constants import BUILDINGS, RES, UNITS
+from horizons.util.shapes import Point
 from horizons.util.worldobject import WorldObject, WorldObjectNotFound
 from horizons.world.production.producer import Producer
 from tests.game import game_test, settle
@@ -131,6 +136,24 @@ def test_fisherman(s, p):
 	assert fisherman.get_component(StorageComponent).inventory[RES.FOOD]
 
 
+@game_test()
+def test_fish_deposit_only_occupies_its_own_tiles(s, p):
+	"""
+	Water tiles around a fish deposit must neither be blocked nor refer to the deposit.
+	"""
+	school = Build(BUILDINGS.FISH_DEPOSIT, 30, 18, s.world, ownerless=True)(None)
+	assert school
+
+	for coords in school.position.get_radius_coordinates(3, include_self=True):
+		tile = s.world.get_tile(Point(*coords))
+		if school.position.contains_tuple(coords):
+			assert tile.object is school
+			assert tile.blocked
+		elif coords in s.world.ground_map:
+			assert tile.object is None
+			assert not tile.blocked
+
+
 @game_test()
 def test_brick_production_chain(s, p):
 	"""
@@ -663,3 +686,96 @@ def test_barracks_production_chain(s, p):
 	s.run(seconds=200)
 	assert barracks.get_component(StorageComponent).inventory[UNITS.SWORDSMAN]
 	#TODO: expand test when more units are added to the game
+
+
+@game_test()
+def test_island_path_nodes_created_later(s, p):
+	"""
+	Path nodes of an island are created on first access and have to see the buildings
+	that were built before.
+	"""
+	settlement, island = settle(s)
+	island._path_nodes = None
+
+	jack = Build(BUILDINGS.LUMBERJACK, 30, 30, island, settlement=settlement)(p)
+	assert jack
+	assert (30, 30) not in island.path_nodes.nodes
+
+	Tear(jack)(p)
+	assert (30, 30) in island.path_nodes.nodes
+
+
+@game_test()
+def test_island_change_journal(s, p):
+	"""
+	The island records where buildability may have changed, so that caches can update
+	just the affected area.
+	"""
+	settlement, island = settle(s)
+	change_id = island.last_change_id
+	assert island.get_changes_since(change_id) == []
+
+	jack = Build(BUILDINGS.LUMBERJACK, 30, 30, island, settlement=settlement)(p)
+	assert jack
+	assert island.get_changes_since(change_id) == [jack.position]
+
+	counter = settlement.buildability_cache.change_counter
+	changes = counter.changes
+	Tear(jack)(p)
+	assert island.get_changes_since(change_id) == [jack.position, jack.position]
+	assert island.get_changes_since(change_id + 1) == [jack.position]
+	assert counter.changes == changes + 1
+	assert counter.last_tiles == len(list(jack.position.tuple_iter()))
+
+	# the journal doesn't reach back forever
+	for i in range(island.CHANGE_JOURNAL_LENGTH):
+		island._register_change([(30, 30)])
+	assert island.get_changes_since(change_id) is None
+
+
+@game_test()
+def test_island_changes_outside_of_settlement(s, p):
+	"""
+	Caches that only depend on the area of a settlement (e.g. the farm options of the AI)
+	are kept if the island only changed elsewhere.
+	"""
+	settlement, island = settle(s)
+	change_id = island.last_change_id
+	assert not island.has_changes_in(change_id, settlement.ground_map)
+
+	# a coordinate right of the settlement, the settlement may cover the whole island
+	outside = (max(x for (x, y) in settlement.ground_map) + 1, 30)
+	assert outside not in settlement.ground_map
+	island._register_change([outside])
+	assert not island.has_changes_in(change_id, settlement.ground_map)
+
+	jack = Build(BUILDINGS.LUMBERJACK, 30, 30, island, settlement=settlement)(p)
+	assert jack
+	assert island.has_changes_in(change_id, settlement.ground_map)
+	assert not island.has_changes_in(island.last_change_id, settlement.ground_map)
+
+
+@game_test()
+def test_farm_option_cache_survives_changes_outside_of_settlement(s, p):
+	settlement, island = settle(s)
+	AIPlayer.load_abstract_buildings(s.db)
+	abstract_farm = AbstractBuilding.buildings[BUILDINGS.FARM]
+	settlement_manager = mock.Mock(worldid=settlement.worldid, settlement=settlement)
+	settlement_manager.production_builder.island = island
+	settlement_manager.production_builder.last_change_id = 0
+
+	with mock.patch('horizons.ai.aiplayer.building.farm.FarmOptionCache') as option_cache_class:
+		option_cache_class.side_effect = lambda manager: object()
+		try:
+			option_cache = abstract_farm._get_option_cache(settlement_manager)
+			assert abstract_farm._get_option_cache(settlement_manager) is option_cache
+
+			island._register_change([(max(x for (x, y) in settlement.ground_map) + 1, 30)])
+			assert abstract_farm._get_option_cache(settlement_manager) is option_cache
+
+			jack = Build(BUILDINGS.LUMBERJACK, 30, 30, island, settlement=settlement)(p)
+			assert jack
+			assert abstract_farm._get_option_cache(settlement_manager) is not option_cache
+			assert option_cache_class.call_count == 2
+		finally:
+			AbstractFarm.clear_cache()
@@ -0,0 +1,41 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+from horizons.gui.widgets.minimap import Minimap, iter_minimap_points_colors
+from horizons.util.mappreview import iter_preview_points, render_random_map_preview
+from horizons.util.random_map import generate_random_map
+from horizons.util.shapes import Rect
+from tests.game import game_test
+
+MAP_PARAMETERS = ('preview', 100, 50, 50, 40, 10)
+
+
+@game_test(mapgen=lambda: generate_random_map(*MAP_PARAMETERS))
+def test_random_map_preview(s, p):
+	"""The preview looks like the minimap of the world created from the map."""
+	colors = (Minimap.COLORS['island'], Minimap.COLORS['water'])
+	for size in ((120, 120), (97, 64)):
+		location = Rect.init_from_topleft_and_size_tuples((0, 0), size)
+		expected = sorted((x, y) + color for (x, y), color in iter_minimap_points_colors(location, s.world, *colors))
+
+		data = render_random_map_preview(size, MAP_PARAMETERS, *colors)
+		assert sorted(iter_preview_points(size, data)) == expected
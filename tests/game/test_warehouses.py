@@ -0,0 +1,49 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+from horizons.util.shapes import Point
+from tests.game import new_session, saveload, settle
+
+
+def test_warehouse_index():
+	session, player = new_session(ai_players=1)
+	settlement, island = settle(session)
+	warehouse = settlement.warehouse
+	ai_player = [p for p in session.world.players if p is not player][0]
+	position = warehouse.position.center
+
+	assert session.world.get_warehouses() == [warehouse]
+	assert session.world.get_warehouses(owner=player) == [warehouse]
+	assert session.world.get_warehouses(owner=ai_player) == []
+	assert session.world.get_warehouses(position, 5, owner=ai_player, include_tradeable=True) == [warehouse]
+	assert session.world.get_warehouses(position + Point(40, 40), 5) == []
+
+	# diplomacy changes are picked up
+	session.world.diplomacy.add_enemy_pair(player, ai_player)
+	assert session.world.get_warehouses(owner=ai_player, include_tradeable=True) == []
+	session.world.diplomacy.add_neutral_pair(player, ai_player)
+	assert session.world.get_warehouses(owner=ai_player, include_tradeable=True) == [warehouse]
+
+	session = saveload(session)
+	warehouses = session.world.get_warehouses()
+	assert len(warehouses) == 1
+	assert warehouses[0].owner is session.world.player
+	session.end()
@@ -23,7 +23,9 @@ from unittest import mock
 
 import pytest
 
-from horizons.messaging import Message
+from horizons.messaging import DELIVERY, Message
+from horizons.messaging.messagebus import MessageBus
+from horizons.scheduler import Scheduler
 
 
 class ExampleMessage(Message):
@@ -34,6 +36,37 @@ class FooMessage(Message):
 	arguments = ('a', 'b', )
 
 
+class BatchedMessage(Message):
+	arguments = ('value', )
+	delivery = DELIVERY.TICK_BATCH
+
+
+class CoalescedMessage(Message):
+	arguments = ('value', )
+	delivery = DELIVERY.COALESCE_LATEST
+
+
+@pytest.fixture
+def bus():
+	MessageBus.destroy_instance()
+	yield MessageBus()
+	MessageBus.destroy_instance()
+
+
+@pytest.fixture
+def scheduler():
+	Scheduler.create_instance(mock.Mock())
+	scheduler = Scheduler()
+	scheduler.before_ticking()
+	yield scheduler
+	Scheduler.destroy_instance()
+
+
+def run_in_tick(scheduler, function):
+	scheduler.add_new_object(function, None)
+	scheduler.tick(scheduler.cur_tick + 1)
+
+
 def test_message_sender_argument():
 	sender = object()
 	msg = Message(sender)
@@ -135,3 +168,84 @@ def test_messagebus_unsubscribe():
 	ExampleMessage.broadcast(sender)
 	Message.broadcast(sender)
 	assert not cb.called
+
+
+def test_messagebus_no_entries_without_subscription(bus):
+	"""
+	Broadcasting must not create entries for message types nobody subscribed to.
+	"""
+	cb = mock.Mock()
+	sender = object()
+
+	ExampleMessage.broadcast(sender)
+	assert not bus.global_receivers
+	assert not bus.local_receivers
+
+	ExampleMessage.subscribe(cb, sender=sender)
+	ExampleMessage.broadcast(sender)
+	ExampleMessage.broadcast(object())
+	assert cb.call_count == 1
+	assert list(bus.local_receivers) == [(ExampleMessage, sender)]
+
+	ExampleMessage.unsubscribe(cb, sender=sender)
+	assert not bus.local_receivers
+	ExampleMessage.discard(cb, sender=sender)
+
+
+def test_messagebus_tick_batch(bus, scheduler):
+	received = []
+	BatchedMessage.subscribe(lambda msg: received.append(msg.value))
+
+	# outside of ticks, messages are delivered immediately
+	BatchedMessage.broadcast(None, 0)
+	assert received == [0]
+
+	def send():
+		BatchedMessage.broadcast(None, 1)
+		BatchedMessage.broadcast(None, 2)
+		assert received == [0]
+
+	run_in_tick(scheduler, send)
+	assert received == [0, 1, 2]
+
+
+def test_messagebus_coalesce_latest(bus, scheduler):
+	received = []
+	first, second = object(), object()
+	CoalescedMessage.subscribe(lambda msg: received.append((msg.sender, msg.value)))
+
+	def send():
+		CoalescedMessage.broadcast(first, 1)
+		CoalescedMessage.broadcast(second, 2)
+		CoalescedMessage.broadcast(first, 3)
+
+	run_in_tick(scheduler, send)
+	assert received == [(first, 3), (second, 2)]
+
+	# the receivers may broadcast again during delivery
+	def resend(msg):
+		if msg.value == 3:
+			CoalescedMessage.broadcast(first, 4)
+
+	CoalescedMessage.subscribe(resend)
+	run_in_tick(scheduler, send)
+	assert received[2:] == [(first, 3), (second, 2), (first, 4)]
+
+
+def test_messagebus_statistics(bus, scheduler):
+	bus.enable_statistics()
+	ExampleMessage.subscribe(mock.Mock())
+	ExampleMessage.broadcast(None)
+	ExampleMessage.broadcast(None)
+
+	def send():
+		CoalescedMessage.broadcast(None, 1)
+		CoalescedMessage.broadcast(None, 2)
+
+	run_in_tick(scheduler, send)
+
+	assert bus.statistics[ExampleMessage][:3] == [2, 0, 0]
+	assert bus.statistics[CoalescedMessage][:3] == [2, 1, 1]
+	report = bus.get_statistics_report()
+	assert len(report) == 3
+	assert any(line.startswith('CoalescedMessage') for line in report)
@@ -22,6 +22,8 @@
 from unittest import TestCase
 from unittest.mock import Mock
 
+import pytest
+
 from horizons.scheduler import Scheduler
 
 
@@ -217,3 +219,92 @@ class TestScheduler(TestCase):
 		self.assertEqual(2, self.scheduler.get_remaining_ticks(instance, self.callback))
 		self.scheduler.tick(Scheduler.FIRST_TICK_ID + 2)
 		self.assertEqual(1, self.scheduler.get_remaining_ticks(instance, self.callback))
+
+	def test_callbacks_of_same_tick_run_in_insertion_order(self):
+		self.scheduler.before_ticking()
+		order = []
+		run_in = Scheduler.WHEEL_SIZE + 5 # scheduled beyond the current wheel rotation
+		for i in range(5):
+			self.scheduler.add_new_object(lambda i=i: order.append(i), None, run_in=run_in - i)
+			self.scheduler.tick(Scheduler.FIRST_TICK_ID + i)
+		self.scheduler.add_new_object(lambda: order.append(5), None, run_in=run_in - 5)
+
+		for i in range(Scheduler.FIRST_TICK_ID + 5, run_in + 1):
+			self.scheduler.tick(i)
+		self.assertEqual(list(range(6)), order)
+
+	def test_remove_call_during_own_execution(self):
+		self.scheduler.before_ticking()
+		instance = Mock()
+		self.callback.side_effect = lambda: self.scheduler.rem_call(instance, self.callback)
+		self.scheduler.add_new_object(self.callback, instance, run_in=1, loops=-1)
+
+		self.scheduler.tick(Scheduler.FIRST_TICK_ID)
+		self.scheduler.tick(Scheduler.FIRST_TICK_ID + 1)
+		self.callback.assert_called_once_with()
+		self.assertEqual({}, self.scheduler.get_classinst_calls(instance))
+
+	def test_removed_calls_are_compacted(self):
+		self.scheduler.before_ticking()
+		instances = [Mock() for i in range(2 * Scheduler.COMPACT_THRESHOLD + 2)]
+		for instance in instances:
+			self.scheduler.add_new_object(self.callback, instance, run_in=Scheduler.WHEEL_SIZE * 2)
+		for instance in instances:
+			self.scheduler.rem_all_classinst_calls(instance)
+		self.assertLessEqual(self.scheduler._tombstones, Scheduler.COMPACT_THRESHOLD + 1)
+
+		for i in range(Scheduler.FIRST_TICK_ID, Scheduler.WHEEL_SIZE * 2 + 1):
+			self.scheduler.tick(i)
+		self.assertFalse(self.callback.called)
+		self.assertEqual(0, self.scheduler._queued)
+		self.assertEqual(0, self.scheduler._tombstones)
+
+	def test_mass_removal_during_tick(self):
+		self.scheduler.before_ticking()
+		victims = [Mock() for i in range(3 * Scheduler.COMPACT_THRESHOLD)]
+		for victim in victims:
+			self.scheduler.add_new_object(self.callback, victim, run_in=50)
+
+		def remove_victims():
+			for victim in victims:
+				self.scheduler.rem_all_classinst_calls(victim)
+		ticks = []
+		self.scheduler.add_new_object(remove_victims, None, run_in=10)
+		self.scheduler.add_new_object(lambda: ticks.append(self.scheduler.cur_tick), None, run_in=10)
+
+		for i in range(Scheduler.FIRST_TICK_ID, Scheduler.WHEEL_SIZE * 2):
+			self.scheduler.tick(i)
+		self.assertEqual([Scheduler.FIRST_TICK_ID + 9], ticks)
+		self.assertFalse(self.callback.called)
+		self.assertEqual(0, self.scheduler._queued)
+		self.assertEqual(0, self.scheduler._tombstones)
+
+
+
+@pytest.mark.long
+@pytest.mark.parametrize('pending', [10000, 100000])
+def test_mass_removal(pending):
+	"""Schedule `pending` callbacks, remove the calls of 100 instances (e.g. buildings burning
+	down) one by one and tick through the rest."""
+	instances = [object() for i in range(pending)]
+	removed = set(instances[::pending // 100])
+	calls = []
+
+	Scheduler.create_instance(Mock())
+	try:
+		scheduler = Scheduler()
+		for i, instance in enumerate(instances):
+			scheduler.add_new_object(lambda instance=instance: calls.append(instance), instance, run_in=1 + i % 1000)
+		for instance in removed:
+			for callback_obj in scheduler.get_classinst_calls(instance):
+				assert scheduler.rem_object(callback_obj) == 1
+		assert scheduler._tombstones == len(removed)
+
+		for tick_id in range(Scheduler.FIRST_TICK_ID, 1001):
+			scheduler.tick(tick_id)
+		assert len(calls) == pending - len(removed)
+		assert removed.isdisjoint(calls)
+		assert scheduler._queued == 0
+		assert scheduler._tombstones == 0
+	finally:
+		Scheduler.destroy_instance()
@@ -0,0 +1,82 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import random
+
+from horizons.util.buildingindexer import BuildingIndexer
+from horizons.util.shapes import Rect
+
+
+class DummyBuilding:
+	def __init__(self, x, y, width, height):
+		self.position = Rect.init_from_topleft_and_size(x, y, width, height)
+
+	def get_borders(self):
+		pos = self.position
+		return (pos.left, pos.top, pos.right, pos.bottom)
+
+
+def get_sorted_list(buildings, coords, radius):
+	"""Sorted list of the buildings whose radius coordinates contain coords, like the indexer builds it."""
+	result = []
+	for building in buildings:
+		if coords in set(building.position.get_radius_coordinates(radius, include_self=True)):
+			pos = building.position
+			result.append((pos.distance(coords) ** 2, pos.top, pos.bottom, pos.left, pos.right, building))
+	result.sort(key=lambda element: element[:5])
+	return result
+
+
+def test_buildings_in_range():
+	rand = random.Random(2)
+	coords = {(x, y) for x in range(40) for y in range(30) if (x - 20) ** 2 + (y - 15) ** 2 < 200}
+	buildings = [DummyBuilding(rand.randrange(-3, 40), rand.randrange(-3, 30), rand.randint(1, 3), rand.randint(1, 3))
+	             for i in range(60)]
+	# distinct positions, so that the order doesn't depend on comparing buildings
+	buildings = list({building.get_borders(): building for building in buildings}.values())
+	buildings.sort(key=DummyBuilding.get_borders)
+
+	indexer = BuildingIndexer(5, coords, random.Random(4), buildings=buildings[:20])
+	present = buildings[:20]
+	expected_rng = random.Random(4)
+	for i in range(300):
+		if rand.random() < 0.2:
+			building = rand.choice(buildings)
+			if building in present:
+				indexer.remove(building)
+				present.remove(building)
+			else:
+				indexer.add(building)
+				present.append(building)
+
+		query = (rand.randrange(-2, 42), rand.randrange(-2, 32))
+		expected = get_sorted_list(present, query, 5)
+		if query not in coords:
+			assert list(indexer.get_buildings_in_range(query)) == []
+			assert indexer.get_num_buildings_in_range(query) is None
+			assert indexer.get_random_building_in_range(query) is None
+			continue
+
+		assert list(indexer.get_buildings_in_range(query)) == [element[5] for element in expected]
+		assert indexer.get_num_buildings_in_range(query) == len(expected)
+		# the rng has to be called the same way as before, or multiplayer games desync
+		expected_choice = expected_rng.choice(expected)[5] if expected else None
+		assert indexer.get_random_building_in_range(query) is expected_choice
@@ -0,0 +1,162 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+from unittest import TestCase
+from unittest.mock import Mock
+
+from horizons.scheduler import Scheduler
+from horizons.util.changelistener import ChangeListener
+
+
+class Listener:
+	def __init__(self):
+		self.calls = 0
+
+	def notify(self):
+		self.calls += 1
+
+
+class TestChangeListener(TestCase):
+
+	def setUp(self):
+		self.obj = ChangeListener()
+
+	def test_listeners_called_in_order(self):
+		calls = []
+		first = lambda: calls.append(1)
+		second = lambda: calls.append(2)
+		self.obj.add_change_listener(first)
+		self.obj.add_change_listener(second)
+		self.obj._changed()
+		self.obj._changed()
+		self.assertEqual(calls, [1, 2, 1, 2])
+
+	def test_remove_during_call(self):
+		calls = []
+
+		def first():
+			calls.append(1)
+			self.obj.discard_change_listener(second)
+
+		def second():
+			calls.append(2)
+
+		self.obj.add_change_listener(first)
+		self.obj.add_change_listener(second)
+		self.obj._changed()
+		self.assertEqual(calls, [1])
+		self.assertFalse(self.obj.has_change_listener(second))
+		self.obj._changed()
+		self.assertEqual(calls, [1, 1])
+
+	def test_nested_change(self):
+		calls = []
+
+		def listener():
+			calls.append(len(calls))
+			if len(calls) == 1:
+				self.obj.remove_change_listener(listener)
+				self.obj._changed()
+
+		other = Listener()
+		self.obj.add_change_listener(listener)
+		self.obj.add_change_listener(other.notify)
+		self.obj._changed()
+		self.assertEqual(calls, [0])
+		self.assertEqual(other.calls, 2)
+		self.obj._changed()
+		self.assertEqual(other.calls, 3)
+
+	def test_weak_listener(self):
+		listener = Listener()
+		self.obj.add_change_listener(listener.notify, no_duplicates=True)
+		self.obj.add_change_listener(listener.notify, no_duplicates=True)
+		self.obj._changed()
+		self.assertEqual(listener.calls, 1)
+		self.assertTrue(self.obj.has_change_listener(listener.notify))
+		self.obj.discard_change_listener(listener.notify)
+		self.assertFalse(self.obj.has_change_listener(listener.notify))
+
+
+class TestCoalescedChangeListener(TestCase):
+
+	def setUp(self):
+		Scheduler.create_instance(Mock())
+		self.scheduler = Scheduler()
+		self.scheduler.before_ticking()
+		self.obj = ChangeListener()
+
+	def tearDown(self):
+		Scheduler.destroy_instance()
+
+	def test_outside_of_tick(self):
+		listener = Listener()
+		self.obj.add_change_listener(listener.notify, coalesce=True)
+		self.obj._changed()
+		self.obj._changed()
+		self.assertEqual(listener.calls, 2)
+
+	def test_once_per_tick(self):
+		listener = Listener()
+		direct = Listener()
+		self.obj.add_change_listener(listener.notify, coalesce=True)
+		self.obj.add_change_listener(direct.notify)
+
+		def change():
+			calls = listener.calls
+			for i in range(5):
+				self.obj._changed()
+			self.assertEqual(listener.calls, calls)
+
+		self.scheduler.add_new_object(change, self, run_in=1, loops=2)
+		self.scheduler.tick(Scheduler.FIRST_TICK_ID)
+		self.assertEqual(listener.calls, 1)
+		self.assertEqual(direct.calls, 5)
+		self.scheduler.tick(Scheduler.FIRST_TICK_ID + 1)
+		self.assertEqual(listener.calls, 2)
+		self.assertEqual(direct.calls, 10)
+		self.scheduler.tick(Scheduler.FIRST_TICK_ID + 2)
+		self.assertEqual(listener.calls, 2)
+
+	def test_removed_before_delivery(self):
+		listener = Listener()
+		self.obj.add_change_listener(listener.notify, coalesce=True)
+
+		def change():
+			self.obj._changed()
+			self.obj.remove_change_listener(listener.notify)
+
+		self.scheduler.add_new_object(change, self, run_in=1)
+		self.scheduler.tick(Scheduler.FIRST_TICK_ID)
+		self.assertEqual(listener.calls, 0)
+
+	def test_object_removed_before_delivery(self):
+		listener = Listener()
+		self.obj.add_change_listener(listener.notify, coalesce=True)
+
+		def change():
+			self.obj._changed()
+			self.scheduler.rem_all_classinst_calls(self.obj)
+			self.obj.remove()
+
+		self.scheduler.add_new_object(change, self, run_in=1)
+		self.scheduler.tick(Scheduler.FIRST_TICK_ID)
+		self.assertEqual(listener.calls, 0)
@@ -0,0 +1,109 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+import os
+import sqlite3
+from unittest import mock
+
+from horizons.util.dbsnapshot import DbSnapshot
+
+
+def create_db(snapshot, sql_files):
+	connection = sqlite3.connect(':memory:')
+
+	def execute_sql():
+		for path in sql_files:
+			with open(path) as f:
+				connection.executescript(f.read())
+
+	execute_sql = mock.Mock(side_effect=execute_sql)
+	snapshot.create(connection, execute_sql)
+	return connection, execute_sql
+
+
+def test_snapshot(tmpdir):
+	sql_file = str(tmpdir.join('data.sql'))
+	with open(sql_file, 'w') as f:
+		f.write("CREATE TABLE data(value INT); INSERT INTO data VALUES(1);")
+	cache_dir = str(tmpdir.join('cache'))
+
+	connection, execute_sql = create_db(DbSnapshot([sql_file], cache_dir), [sql_file])
+	assert execute_sql.call_count == 1
+	assert connection.execute("SELECT value FROM data").fetchall() == [(1, )]
+	snapshots = os.listdir(cache_dir)
+	assert len(snapshots) == 1
+
+	# the second database is copied from the snapshot
+	connection, execute_sql = create_db(DbSnapshot([sql_file], cache_dir), [sql_file])
+	assert not execute_sql.called
+	assert connection.execute("SELECT value FROM data").fetchall() == [(1, )]
+	assert connection.execute("PRAGMA user_version").fetchone()[0] == 0
+	# the copy is writable
+	connection.execute("DELETE FROM data")
+
+	# changing the sql file replaces the snapshot
+	with open(sql_file, 'a') as f:
+		f.write("INSERT INTO data VALUES(2);")
+	connection, execute_sql = create_db(DbSnapshot([sql_file], cache_dir), [sql_file])
+	assert execute_sql.call_count == 1
+	assert connection.execute("SELECT value FROM data").fetchall() == [(1, ), (2, )]
+	assert len(os.listdir(cache_dir)) == 1
+	assert os.listdir(cache_dir) != snapshots
+
+
+def test_broken_snapshot(tmpdir):
+	sql_file = str(tmpdir.join('data.sql'))
+	with open(sql_file, 'w') as f:
+		f.write("CREATE TABLE data(value INT); INSERT INTO data VALUES(1);")
+	cache_dir = str(tmpdir.join('cache'))
+
+	snapshot = DbSnapshot([sql_file], cache_dir)
+	os.makedirs(cache_dir)
+	with open(snapshot.filename, 'w') as f:
+		f.write("garbage")
+
+	connection, execute_sql = create_db(snapshot, [sql_file])
+	assert execute_sql.call_count == 1
+	assert connection.execute("SELECT value FROM data").fetchall() == [(1, )]
+
+
+def test_snapshots_of_other_installations_are_kept(tmpdir):
+	cache_dir = str(tmpdir.join('cache'))
+	sql_files = []
+	for name in ('one', 'two'):
+		os.makedirs(str(tmpdir.join(name)))
+		sql_file = str(tmpdir.join(name, 'data.sql'))
+		with open(sql_file, 'w') as f:
+			f.write("CREATE TABLE data(value INT); INSERT INTO data VALUES(1);")
+		sql_files.append(sql_file)
+
+	create_db(DbSnapshot([sql_files[0]], cache_dir), [sql_files[0]])
+	create_db(DbSnapshot([sql_files[1]], cache_dir), [sql_files[1]])
+	assert len(os.listdir(cache_dir)) == 2
+
+	# the first installation only replaces its own snapshot
+	with open(sql_files[0], 'a') as f:
+		f.write("INSERT INTO data VALUES(2);")
+	create_db(DbSnapshot([sql_files[0]], cache_dir), [sql_files[0]])
+	snapshots = os.listdir(cache_dir)
+	assert len(snapshots) == 2
+	assert os.path.basename(DbSnapshot([sql_files[1]], cache_dir).filename) in snapshots
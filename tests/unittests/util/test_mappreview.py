@@ -0,0 +1,89 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+import time
+
+import pytest
+
+from horizons.util.mappreview import RandomMapPreviewGenerator, render_random_map_preview
+
+ISLAND = (137, 117, 87)
+WATER = (198, 188, 165)
+SIZE = (40, 30)
+
+
+def parameters(seed):
+	return (seed, 50, 80, 30, 30, 5)
+
+
+@pytest.fixture
+def generator():
+	generator = RandomMapPreviewGenerator(ISLAND, WATER)
+	yield generator
+	generator.end()
+
+
+def wait(generator):
+	deadline = time.time() + 60
+	while generator.is_busy():
+		assert time.time() < deadline, 'Rendering the preview took too long.'
+		generator.poll()
+		time.sleep(0.01)
+
+
+def test_render_random_map_preview():
+	data = render_random_map_preview(SIZE, parameters('a'), ISLAND, WATER)
+	assert len(data) == SIZE[0] * SIZE[1] * 3
+	pixels = {tuple(data[i:i + 3]) for i in range(0, len(data), 3)}
+	assert pixels == {ISLAND, WATER}
+	assert render_random_map_preview(SIZE, parameters('a'), ISLAND, WATER) == data
+
+
+def test_cache(generator):
+	results = []
+	callback = lambda size, data: results.append((size, data))
+
+	assert not generator.request(SIZE, parameters('a'), callback)
+	assert not results
+	wait(generator)
+	expected = render_random_map_preview(SIZE, parameters('a'), ISLAND, WATER)
+	assert results == [(SIZE, expected)]
+
+	# cached previews are delivered immediately
+	assert generator.request(SIZE, parameters('a'), callback)
+	assert results == [(SIZE, expected)] * 2
+	assert not generator.is_busy()
+
+
+def test_only_latest_request(generator):
+	results = []
+
+	for seed in 'abc':
+		generator.request(SIZE, parameters(seed), lambda size, data, seed=seed: results.append(seed))
+	wait(generator)
+	assert results == ['c']
+
+	# the first request was rendered anyway and is cached, the one in between was skipped
+	assert generator.request(SIZE, parameters('a'), lambda size, data: results.append('a'))
+	assert not generator.request(SIZE, parameters('b'), lambda size, data: results.append('b'))
+	wait(generator)
+	assert results == ['c', 'a', 'b']
@@ -0,0 +1,182 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import copy
+import random
+from unittest.mock import Mock
+
+import pytest
+
+from horizons.util.pathfinding.pather import ShipPather, ShipRouteCache
+from horizons.util.pathfinding.pathfinding import FindPath, GridFindPath, PathDistanceField
+from horizons.util.pathfinding.pathnodes import IslandPathNodes, PathNodeGrid
+from horizons.util.shapes import Circle, Point, Rect
+
+
+def create_map(seed, size=40, density=0.3):
+	rng = random.Random(seed)
+	nodes = {(x, y): 1.0 for x in range(size) for y in range(size) if rng.random() > density}
+	blocked = [(rng.randrange(size), rng.randrange(size)) for i in range(size)]
+	return rng, nodes, blocked
+
+
+@pytest.mark.parametrize('seed', range(20))
+@pytest.mark.parametrize('diagonal', [False, True])
+@pytest.mark.parametrize('make_target_walkable', [False, True])
+def test_grid_backend_finds_same_paths(seed, diagonal, make_target_walkable):
+	rng, nodes, blocked = create_map(seed)
+	grid = PathNodeGrid(Rect.init_from_borders(0, 0, 39, 39), nodes)
+
+	for i in range(10):
+		source = Point(rng.randrange(40), rng.randrange(40))
+		destination = Rect.init_from_topleft_and_size(rng.randrange(38), rng.randrange(38), 2, 2)
+		expected = FindPath()(source, destination, nodes, blocked, diagonal, make_target_walkable)
+		path = GridFindPath()(source, destination, grid, blocked, diagonal, make_target_walkable)
+		assert path == expected
+
+
+@pytest.mark.parametrize('seed', range(10))
+@pytest.mark.parametrize('diagonal', [False, True])
+def test_distance_field_matches_find_path(seed, diagonal):
+	rng, nodes, _ = create_map(seed)
+	source = Point(rng.randrange(40), rng.randrange(40))
+	field = PathDistanceField(source, nodes, diagonal)
+
+	for i in range(20):
+		destination = Rect.init_from_topleft_and_size(rng.randrange(38), rng.randrange(38), 2, 2)
+		path = FindPath()(source, destination, nodes, diagonal=diagonal)
+		if path is None:
+			assert field.get_distance(destination) is None
+		elif diagonal:
+			# the euclidean estimate of FindPath doesn't guarantee shortest diagonal paths
+			assert field.get_distance(destination) <= sum(nodes.get(coords, 0) for coords in path[:-1])
+		else:
+			assert field.get_distance(destination) == sum(nodes.get(coords, 0) for coords in path[:-1])
+
+
+def test_grid_backend_falls_back_outside_of_grid():
+	_, nodes, _ = create_map(0)
+	grid = PathNodeGrid(Rect.init_from_borders(0, 0, 39, 39), nodes)
+	grid[(45, 45)] = 1.0
+	assert not grid.complete
+
+	destination = Point(45, 45)
+	expected = FindPath()(Point(0, 0), destination, dict(grid), diagonal=True)
+	assert GridFindPath()(Point(0, 0), destination, grid, diagonal=True) == expected
+
+	del grid[(45, 45)]
+	assert grid.complete
+
+
+def test_path_node_grid_mirrors_dict():
+	grid = PathNodeGrid(Rect.init_from_borders(0, 0, 9, 9))
+	grid[(1, 2)] = 1.0
+	grid.setdefault((3, 4), 2.0)
+	grid.update({(5, 5): 1.0})
+	assert grid.walkable[grid.index((3, 4))]
+	assert grid.speed[grid.index((3, 4))] == 2.0
+
+	assert grid.pop((5, 5)) == 1.0
+	assert not grid.walkable[grid.index((5, 5))]
+	assert grid.coords(grid.index((1, 2))) == (1, 2)
+	assert grid.index((10, 0)) is None
+
+	other = copy.copy(grid)
+	del other[(1, 2)]
+	assert (1, 2) in grid
+	assert grid.walkable[grid.index((1, 2))]
+	assert not other.walkable[other.index((1, 2))]
+
+
+def test_ship_route_cache():
+	cache = ShipRouteCache()
+	path = [(0, 0), (1, 1), (2, 2)]
+	cache.add(Point(0, 0), Circle(Point(2, 2), 1), path)
+
+	cached = cache.get(Point(0, 0), Circle(Point(2, 2), 1), {(0, 0): 'own ship'})
+	assert cached == path
+	cached.pop()
+	assert cache.get(Point(0, 0), Circle(Point(2, 2), 1), {}) == path
+
+	assert cache.get(Point(0, 0), Circle(Point(2, 2), 2), {}) is None
+	assert cache.get(Point(0, 0), Circle(Point(2, 2), 1), {(1, 1): 'other ship'}) is None
+	# blocked paths are dropped
+	assert cache.get(Point(0, 0), Circle(Point(2, 2), 1), {}) is None
+
+
+def test_ship_route_cache_evicts_least_recently_used():
+	cache = ShipRouteCache()
+	for i in range(ShipRouteCache.SIZE):
+		cache.add(Point(i, 0), Point(0, 0), [(i, 0), (0, 0)])
+	cache.get(Point(0, 0), Point(0, 0), {})
+	cache.add(Point(-1, 0), Point(0, 0), [(-1, 0), (0, 0)])
+
+	assert cache.get(Point(0, 0), Point(0, 0), {}) is not None
+	assert cache.get(Point(1, 0), Point(0, 0), {}) is None
+
+
+def test_ship_pather_rejects_other_water_bodies():
+	# two lakes, separated by a land column at x == 5
+	water = {(x, y): 1.0 for x in range(11) for y in range(5) if x != 5}
+	world = Mock()
+	world.water = PathNodeGrid(Rect.init_from_borders(0, 0, 10, 4), water)
+	world.water_body = {coords: int(coords[0] > 5) for coords in water}
+	world.ship_map = {}
+	world.ship_route_cache = ShipRouteCache()
+	pather = ShipPather(Mock(), session=Mock(world=world))
+
+	assert not pather._may_be_reachable(Point(0, 0), Point(10, 0))
+	assert pather.calc_path(Point(10, 0), check_only=True, source=Point(0, 0)) is False
+	assert pather.calc_path(Point(4, 4), check_only=True, source=Point(0, 0))
+
+
+def create_road(x, y):
+	return Mock(position=Rect.init_from_topleft_and_size(x, y, 1, 1))
+
+
+def test_road_networks():
+	island = Mock(position=Rect.init_from_borders(0, 0, 20, 20))
+	island.__iter__ = Mock(return_value=iter([]))
+	path_nodes = IslandPathNodes(island)
+	roads = [create_road(x, 5) for x in range(3, 10)]
+	for road in roads:
+		path_nodes.register_road(road)
+	path_nodes.register_road(create_road(15, 5))
+
+	house1 = Rect.init_from_topleft_and_size(1, 4, 2, 2)
+	house2 = Rect.init_from_topleft_and_size(8, 6, 2, 2)
+	house3 = Rect.init_from_topleft_and_size(16, 5, 2, 2)
+	assert path_nodes.get_road_network((3, 5)) == path_nodes.get_road_network((9, 5))
+	assert path_nodes.get_road_network((3, 5)) != path_nodes.get_road_network((15, 5))
+	assert path_nodes.get_road_network((3, 6)) is None
+	assert path_nodes.may_be_road_connected(house1, house2)
+	assert not path_nodes.may_be_road_connected(house1, house3)
+	assert path_nodes.may_be_road_connected(house3, Point(15, 5))
+
+	change_id = path_nodes.road_change_id
+	path_nodes.unregister_road(roads[3])
+	assert path_nodes.road_change_id > change_id
+	assert not path_nodes.may_be_road_connected(house1, house2)
+	assert path_nodes.get_road_network((4, 5)) != path_nodes.get_road_network((8, 5))
+
+	for x in range(10, 15):
+		path_nodes.register_road(create_road(x, 5))
+	assert path_nodes.may_be_road_connected(house2, house3)
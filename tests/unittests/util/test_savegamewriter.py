@@ -0,0 +1,133 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import os
+import tempfile
+
+import pytest
+
+from horizons.util.dbreader import DbReader
+from horizons.util.savegamewriter import SavegameWriter
+from horizons.util.uhdbaccessor import read_savegame_template
+
+
+@pytest.fixture
+def db_path():
+	fd, path = tempfile.mkstemp()
+	os.close(fd)
+	yield path
+	os.unlink(path)
+
+
+def create_tables(db):
+	db.execute_script("""
+		CREATE TABLE unit (type INTEGER, owner INTEGER);
+		CREATE TABLE unit_path (`unit` INTEGER, `index` INTEGER, `x` INTEGER, `y` INTEGER);
+	""")
+
+
+def test_inserts_are_batched_in_order(db_path):
+	db = SavegameWriter(db_path)
+	create_tables(db)
+	db("BEGIN")
+	for i in range(3):
+		db("INSERT INTO unit(rowid, type, owner) VALUES(?, ?, ?)", i + 1, 10, 1)
+		for step in range(4):
+			db("INSERT INTO unit_path(`unit`, `index`, `x`, `y`) VALUES(?, ?, ?, ?)", i + 1, step, step, i)
+	db("INSERT INTO unit(type, owner) VALUES(?, ?)", 11, 2)
+	assert db._batches
+
+	# queries see everything inserted so far
+	assert db("SELECT count(*) FROM unit_path") == [(12, )]
+	assert not db._batches
+	db("INSERT INTO unit(type, owner) VALUES(?, ?)", 12, 2)
+	db("COMMIT")
+	db.close()
+
+	db = DbReader(db_path)
+	assert db("SELECT rowid, type FROM unit") == [(1, 10), (2, 10), (3, 10), (4, 11), (5, 12)]
+	assert db("SELECT `unit`, `index` FROM unit_path WHERE `unit` = 2") == [(2, i) for i in range(4)]
+	db.close()
+
+
+def test_only_plain_inserts_are_batched():
+	get_table = SavegameWriter._get_table
+	assert get_table("INSERT INTO unit(type) VALUES(?);") == 'unit'
+	assert get_table("INSERT OR REPLACE INTO `metadata` VALUES(?, ?);") == 'metadata'
+	assert get_table("INSERT INTO unit SELECT * FROM other;") is None
+	assert get_table("UPDATE unit SET type = ?;") is None
+
+
+def test_create_tables(db_path):
+	db = SavegameWriter(db_path)
+	db.create_tables()
+	db("INSERT INTO unit(type, owner) VALUES(?, ?)", 11, 2)
+	assert db("SELECT type, owner FROM unit") == [(11, 2)]
+	db.close()
+
+
+class CountingCursor:
+	"""Cursor wrapper that counts the statements that are sent to SQLite."""
+
+	def __init__(self, cur):
+		self._cur = cur
+		self.statements = 0
+
+	def execute(self, *args):
+		self.statements += 1
+		return self._cur.execute(*args)
+
+	def executemany(self, *args):
+		self.statements += 1
+		return self._cur.executemany(*args)
+
+	def __getattr__(self, name):
+		return getattr(self._cur, name)
+
+
+def test_save_writes_same_rows_with_fewer_statements(db_path):
+	def save(db):
+		db.cur = CountingCursor(db.cur)
+		db("BEGIN")
+		for unit in range(200):
+			db("INSERT INTO unit(rowid, type, owner) VALUES(?, ?, ?)", unit + 1, 10, 1)
+			for step in range(20):
+				db("INSERT INTO unit_path(`unit`, `index`, `x`, `y`) VALUES(?, ?, ?, ?)", unit + 1, step, step, unit)
+		db("COMMIT")
+		statements = db.cur.statements
+		rows = (db("SELECT rowid, type, owner FROM unit"),
+		        db("SELECT rowid, `unit`, `index`, `x`, `y` FROM unit_path"))
+		db.close()
+		return statements, rows
+
+	db = DbReader(db_path)
+	read_savegame_template(db)
+	reader_statements, reader_rows = save(db)
+	os.unlink(db_path)
+
+	db = SavegameWriter(db_path)
+	db.create_tables()
+	writer_statements, writer_rows = save(db)
+
+	assert writer_rows == reader_rows
+	assert reader_statements == 2 + 200 * 21
+	# BEGIN, one executemany per table and COMMIT
+	assert writer_statements == 4
@@ -19,9 +19,11 @@
 # 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
 # ###################################################
 
+import pickle
+
 import pytest
 
-from horizons.util.shapes import Circle, Point, Rect
+from horizons.util.shapes import Circle, ConstPoint, ConstRect, Point, Rect
 
 
 def test_point():
@@ -53,3 +55,46 @@ def test_circle():
 	assert c1 != c2
 	assert c1.get_coordinates() == [(-1, 0), (0, -1), (0, 0), (0, 1), (1, 0)]
 	assert c3.get_coordinates() == [(0, 0)]
+
+
+@pytest.mark.parametrize('size', [(1, 1), (2, 2), (3, 2), (4, 4)])
+@pytest.mark.parametrize('radius', [0, 1, 3, 8, 12])
+@pytest.mark.parametrize('include_self', [False, True])
+def test_rect_radius_coordinates(size, radius, include_self):
+	rect = Rect.init_from_topleft_and_size_tuples((7, -3), size)
+	coords = list(rect.get_radius_coordinates(radius, include_self))
+	# the cached offsets yield the same coordinates in the same order
+	assert coords == list(rect._iter_radius_coordinates(radius, include_self))
+	assert coords == list(rect.get_radius_coordinates(radius, include_self))
+
+	for coord in coords:
+		assert rect.distance(coord) <= radius
+		assert include_self or not rect.contains_tuple(coord)
+
+	bounds = Rect.init_from_borders(5, -4, 10, 2)
+	assert list(rect.get_radius_coordinates_in(radius, bounds, include_self)) == \
+	       [coord for coord in coords if bounds.contains_tuple(coord)]
+
+
+@pytest.mark.parametrize('shape', [Point(1, 2), ConstPoint(1, 2), Rect(1, 2, 3, 4), ConstRect(1, 2, 3, 4),
+                                   Circle(Point(1, 2), 3)])
+def test_shape_slots(shape):
+	assert not hasattr(shape, '__dict__')
+	assert pickle.loads(pickle.dumps(shape, 2)) == shape
+
+
+def test_const_point():
+	p1 = ConstPoint.get((3, 4))
+	assert p1 is ConstPoint.get((3, 4))
+	assert p1 == Point(3, 4)
+	assert hash(p1) == hash(Point(3, 4))
+	assert p1.distance(Point(3, 6)) == 2
+	with pytest.raises(Exception):
+		p1.x = 5
+	p2 = p1.copy()
+	p2.x = 5
+	assert p1.x == 3
+
+	r = ConstRect(1, 2, 3, 4)
+	with pytest.raises(Exception):
+		r.left = 0
@@ -0,0 +1,110 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import random
+
+import pytest
+
+from horizons.util.shapes import Circle, Point
+from horizons.util.spatialindex import SpatialIndex
+
+
+def create_index(count, size, seed=3):
+	rand = random.Random(seed)
+	index = SpatialIndex()
+	objects = []
+	for i in range(count):
+		obj = object()
+		point = Point(rand.randint(-size, size), rand.randint(-size, size))
+		index.add(obj, point)
+		objects.append((obj, point))
+	return index, objects
+
+
+def brute_force_in_radius(objects, position, radius):
+	circle = Circle(position, radius)
+	return [obj for obj, point in objects if circle.contains(point)]
+
+
+def test_in_radius():
+	index, objects = create_index(300, 40)
+	assert len(index) == 300
+	rand = random.Random(5)
+	for i in range(200):
+		position = Point(rand.randint(-50, 50), rand.randint(-50, 50))
+		radius = rand.choice([0, 1, 3, 7.5, 12, 30, 100])
+		assert index.get_in_radius(position, radius) == brute_force_in_radius(objects, position, radius)
+
+
+def test_move_and_remove():
+	index, objects = create_index(100, 30)
+	rand = random.Random(7)
+	for i in range(500):
+		n = rand.randrange(len(objects))
+		obj, point = objects[n]
+		point = Point(point.x + rand.randint(-1, 1), point.y + rand.randint(-20, 20))
+		objects[n] = (obj, point)
+		index.move(obj, point)
+
+	for obj, point in objects[::3]:
+		index.remove(obj)
+		assert obj not in index
+	del objects[::3]
+	assert len(index) == len(objects)
+
+	for i in range(100):
+		position = Point(rand.randint(-40, 40), rand.randint(-40, 40))
+		radius = rand.randint(0, 25)
+		assert index.get_in_radius(position, radius) == brute_force_in_radius(objects, position, radius)
+
+
+def test_nearest():
+	index, objects = create_index(200, 50)
+	rand = random.Random(11)
+	serials = {obj: i for i, (obj, point) in enumerate(objects)}
+	for i in range(100):
+		position = Point(rand.randint(-70, 70), rand.randint(-70, 70))
+		k = rand.randint(1, 10)
+		expected = sorted(objects, key=lambda obj_point: (obj_point[1].distance(position), serials[obj_point[0]]))
+		assert index.get_nearest(position, k) == [obj for obj, point in expected[:k]]
+
+		radius = rand.randint(0, 30)
+		expected = [obj for obj, point in expected if point.distance(position) <= radius]
+		assert index.get_nearest(position, k, radius) == expected[:k]
+
+
+def test_nearest_empty():
+	index = SpatialIndex()
+	assert index.get_nearest(Point(0, 0), 3) == []
+	index.add('a', Point(100, 100))
+	assert index.get_nearest(Point(0, 0), 3) == ['a']
+	assert index.get_nearest(Point(0, 0), 3, radius=10) == []
+	assert index.get_nearest(Point(0, 0), 0) == []
+
+
+@pytest.mark.long
+def test_in_radius_of_large_index():
+	index, objects = create_index(1000, 150)
+	rand = random.Random(13)
+	for i in range(1000):
+		position = Point(rand.randint(-150, 150), rand.randint(-150, 150))
+		radius = rand.randint(5, 15)
+		assert index.get_in_radius(position, radius) == brute_force_in_radius(objects, position, radius)
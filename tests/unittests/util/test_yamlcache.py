@@ -0,0 +1,100 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+import os
+from unittest import mock
+
+import pytest
+
+from horizons.constants import RES
+from horizons.util.yamlcache import YamlCache
+from horizons.util.yamlcachestorage import YamlCacheStorage
+
+
+@pytest.fixture
+def yaml_cache(tmpdir):
+	cache_filename = str(tmpdir.join('yamldata.sqlite'))
+	YamlCache.cache = YamlCacheStorage.open(cache_filename)
+	with mock.patch('horizons.extscheduler.ExtScheduler'):
+		yield cache_filename
+	YamlCache.cache = None
+	YamlCache.sync_scheduled = False
+
+
+def test_get_file(yaml_cache, tmpdir):
+	filename = str(tmpdir.join('building.yaml'))
+	with open(filename, 'w') as f:
+		f.write("name: foo\ncosts: {RES.GOLD: 5}\n")
+
+	data = YamlCache.get_file(filename, game_data=True)
+	assert data == {'name': 'foo', 'costs': {RES.GOLD: 5}}
+	assert YamlCache.get_file(filename) == {'name': 'foo', 'costs': {'RES.GOLD': 5}}
+	YamlCache._do_sync()
+
+	# a warm cache doesn't need to parse the file
+	YamlCache.cache = YamlCacheStorage.open(yaml_cache)
+	with mock.patch.object(YamlCache, 'load_yaml_data') as load_yaml_data:
+		assert YamlCache.get_file(filename, game_data=True) == data
+		assert not load_yaml_data.called
+
+		# same content with a different modification time
+		os.utime(filename, ns=(0, 0))
+		assert YamlCache.get_file(filename, game_data=True) == data
+		assert not load_yaml_data.called
+
+	with open(filename, 'w') as f:
+		f.write("name: bar\n")
+	assert YamlCache.get_file(filename, game_data=True) == {'name': 'bar'}
+
+
+def test_get_files(yaml_cache, tmpdir):
+	filenames = []
+	for i in range(4):
+		filename = str(tmpdir.join('unit{:d}.yaml'.format(i)))
+		with open(filename, 'w') as f:
+			f.write("id: {:d}\ncosts: {{RES.GOLD: {:d}}}\n".format(i, i * 10))
+		filenames.append(filename)
+	expected = [{'id': i, 'costs': {RES.GOLD: i * 10}} for i in range(4)]
+
+	assert YamlCache.get_file(filenames[2], game_data=True) == expected[2]
+	with mock.patch.object(YamlCache, 'parallel_parse_min_files', None):
+		assert YamlCache.get_files(filenames, game_data=True) == expected
+
+
+@pytest.mark.long
+def test_get_files_parallel(yaml_cache, tmpdir):
+	filenames = []
+	for i in range(4):
+		filename = str(tmpdir.join('unit{:d}.yaml'.format(i)))
+		with open(filename, 'w') as f:
+			f.write("id: {:d}\ncosts: {{RES.GOLD: {:d}}}\n".format(i, i * 10))
+		filenames.append(filename)
+	expected = [{'id': i, 'costs': {RES.GOLD: i * 10}} for i in range(4)]
+
+	with mock.patch.object(YamlCache, 'parallel_parse_min_files', 1), \
+	     mock.patch('os.cpu_count', return_value=2):
+		assert YamlCache.get_files(filenames, game_data=True) == expected
+
+	# results are cached
+	with mock.patch.object(YamlCache, 'load_yaml_data') as load_yaml_data:
+		assert YamlCache.get_files(filenames, game_data=True) == expected
+		assert not load_yaml_data.called
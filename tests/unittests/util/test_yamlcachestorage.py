@@ -43,3 +43,34 @@ class YamlCacheStorageTest(unittest.TestCase):
 
 		new_cache = YamlCacheStorage.open(self.tmp_file.name)
 		self.assertEqual(new_cache['foo'], 'bar')
+
+	def test_partial_sync(self):
+		cache = YamlCacheStorage.open(self.tmp_file.name)
+		cache['foo'] = 'bar'
+		cache['baz'] = [1, 2]
+		cache.sync()
+
+		cache = YamlCacheStorage.open(self.tmp_file.name)
+		self.assertIn('baz', cache)
+		self.assertNotIn('qux', cache)
+		cache['foo'] = 'changed'
+		del cache['baz']
+		self.assertNotIn('baz', cache)
+		cache.sync()
+		cache.close()
+
+		new_cache = YamlCacheStorage.open(self.tmp_file.name)
+		self.assertEqual(new_cache['foo'], 'changed')
+		self.assertNotIn('baz', new_cache)
+		self.assertEqual(new_cache.get('baz', 1), 1)
+
+	def test_unusable_file(self):
+		with open(self.tmp_file.name, 'wb') as f:
+			f.write(b'not a database' * 100)
+		cache = YamlCacheStorage.open(self.tmp_file.name)
+		self.assertNotIn('foo', cache)
+		cache['foo'] = 'bar'
+		cache.sync()
+
+		new_cache = YamlCacheStorage.open(self.tmp_file.name)
+		self.assertEqual(new_cache['foo'], 'bar')
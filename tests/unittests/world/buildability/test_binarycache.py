@@ -0,0 +1,121 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import random
+
+import pytest
+
+from horizons.world.buildability.binarycache import BinaryBuildabilityCache
+from horizons.world.buildability.terraincache import TerrainBuildabilityCache
+from tests.unittests import TestCase
+
+
+class MockTerrainBuildabilityCache:
+	sizes = TerrainBuildabilityCache.sizes
+
+	def __init__(self, land_or_coast):
+		self.land_or_coast = land_or_coast
+
+
+def get_fitting_origins(coords_set, width, height):
+	"""Returns the origins of all rectangles of the given size that are entirely in coords_set."""
+	res = set()
+	for (x, y) in coords_set:
+		if all((x + dx, y + dy) in coords_set for dx in range(width) for dy in range(height)):
+			res.add((x, y))
+	return res
+
+
+class TestBinaryBuildabilityCache(TestCase):
+	def setUp(self):
+		super().setUp()
+		self.size = 20
+		coords_list = [(x, y) for x in range(self.size) for y in range(self.size)]
+		self.terrain_cache = MockTerrainBuildabilityCache(set(coords_list))
+		self.buildability_cache = BinaryBuildabilityCache(self.terrain_cache)
+
+	def check_cache(self):
+		bc = self.buildability_cache
+		for (width, height), cache_set in bc.cache.items():
+			self.assertEqual(cache_set, get_fitting_origins(bc.coords_set, width, height))
+
+	def test_squares(self):
+		bc = self.buildability_cache
+		r4x4 = bc.cache[(4, 4)]
+		r6x6 = bc.cache[(6, 6)]
+
+		bc.add_area([(x, y) for x in range(6) for y in range(6)])
+		self.assertEqual(r4x4, {(x, y) for x in range(3) for y in range(3)})
+		self.assertEqual(r6x6, {(0, 0)})
+
+		bc.remove_area([(5, 5)])
+		self.assertEqual(r4x4, {(x, y) for x in range(3) for y in range(3)} - {(2, 2)})
+		self.assertEqual(r6x6, set())
+
+		bc.add_area([(5, 5)])
+		self.assertEqual(r6x6, {(0, 0)})
+		self.check_cache()
+
+	def test_random_changes(self):
+		bc = self.buildability_cache
+		rand = random.Random(17)
+		all_coords = list(self.terrain_cache.land_or_coast)
+		for i in range(60):
+			if rand.random() < 0.6:
+				# add a random rectangle of the coordinates that aren't in the area yet
+				x, y = rand.randrange(self.size), rand.randrange(self.size)
+				width, height = rand.randint(1, 8), rand.randint(1, 8)
+				coords_list = [(x + dx, y + dy) for dx in range(width) for dy in range(height)
+				               if (x + dx, y + dy) in self.terrain_cache.land_or_coast and
+				               (x + dx, y + dy) not in bc.coords_set]
+				bc.add_area(coords_list)
+			else:
+				coords_list = [coords for coords in all_coords if coords in bc.coords_set and rand.random() < 0.1]
+				bc.remove_area(coords_list)
+			self.check_cache()
+
+
+@pytest.mark.long
+def test_single_tile_changes_of_large_area():
+	"""Remove and add back single tiles of a large area, the squares have to match rebuilt ones after each change."""
+	size = 100
+	coords_list = [(x, y) for x in range(size) for y in range(size)]
+	bc = BinaryBuildabilityCache(MockTerrainBuildabilityCache(set(coords_list)))
+	bc.add_area(coords_list)
+	rand = random.Random(3)
+	changed = rand.sample(coords_list, 50)
+
+	def rebuild_square(width):
+		# how the squares used to be computed after every change
+		r3x3 = bc.cache[(3, 3)]
+		offset = width - 3
+		return {(x, y) for (x, y) in r3x3 if (x + offset, y) in r3x3 and (x, y + offset) in r3x3 and
+		        (x + offset, y + offset) in r3x3}
+
+	for coords in changed:
+		bc.remove_area([coords])
+		assert bc.cache[(4, 4)] == rebuild_square(4)
+		assert bc.cache[(6, 6)] == rebuild_square(6)
+		bc.add_area([coords])
+		assert bc.cache[(4, 4)] == rebuild_square(4)
+		assert bc.cache[(6, 6)] == rebuild_square(6)
+	assert bc.cache[(4, 4)] == get_fitting_origins(bc.coords_set, 4, 4)
+	assert bc.cache[(6, 6)] == get_fitting_origins(bc.coords_set, 6, 6)
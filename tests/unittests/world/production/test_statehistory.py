@@ -0,0 +1,115 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+import random
+from collections import defaultdict, deque
+
+import pytest
+
+from horizons.world.production.statehistory import StateHistory
+
+NUM_STATES = 6
+PAUSE_STATE = 4
+WINDOW = 100
+
+
+class ReferenceHistory:
+	"""Straightforward implementation that walks the whole history on every query."""
+
+	def __init__(self):
+		self.history = deque()
+
+	def change(self, tick, state):
+		if self.history and self.history[-1][0] == tick:
+			self.history.pop()
+		if not self.history or self.history[-1][1] != state:
+			self.history.append((tick, state))
+
+	def first_relevant_tick(self, first_tick, current_tick):
+		for i in range(len(self.history) - 1, -1, -1):
+			if self.history[i][1] != PAUSE_STATE:
+				continue
+			tick = self.history[i][0]
+			next_tick = self.history[i + 1][0] if i + 1 < len(self.history) else current_tick
+			if next_tick <= first_tick:
+				break
+			first_tick -= next_tick - tick
+		return first_tick
+
+	def drop_before(self, tick):
+		while len(self.history) > 1 and self.history[1][0] < tick:
+			self.history.popleft()
+
+	def get_times(self, first_tick, current_tick, ignore_pause):
+		result = defaultdict(int)
+		num_entries = len(self.history)
+		for i in range(num_entries):
+			if ignore_pause and self.history[i][1] == PAUSE_STATE:
+				continue
+			tick = self.history[i][0]
+			if tick >= current_tick:
+				break
+			next_tick = min(self.history[i + 1][0], current_tick) if i + 1 < num_entries else current_tick
+			if next_tick <= first_tick:
+				continue
+			relevant_ticks = next_tick - tick
+			if tick < first_tick:
+				relevant_ticks -= first_tick - tick
+			result[self.history[i][1]] += relevant_ticks
+		return dict(result)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_state_history(seed):
+	rand = random.Random(seed)
+	history = StateHistory(NUM_STATES, PAUSE_STATE)
+	reference = ReferenceHistory()
+
+	tick = 0
+	for i in range(2000):
+		tick += rand.choice([0, 1, 1, 2, 5, 20])
+		state = rand.choice([0, 1, 2, 3, 3, 4])
+		history.change(tick, state)
+		reference.change(tick, state)
+
+		first_tick = history.get_first_relevant_tick(tick - WINDOW, tick)
+		assert first_tick == reference.first_relevant_tick(tick - WINDOW, tick)
+		history.drop_before(first_tick)
+		reference.drop_before(first_tick)
+		assert list(history) == list(reference.history)
+
+		current_tick = tick + rand.choice([0, 1, 10])
+		for ignore_pause in (False, True):
+			first_tick = tick - WINDOW
+			if ignore_pause:
+				first_tick = history.get_first_relevant_tick(first_tick, current_tick)
+			assert history.get_times(first_tick, current_tick, ignore_pause) == \
+			       reference.get_times(first_tick, current_tick, ignore_pause)
+
+
+def test_state_history_load():
+	entries = [(-50, 1), (-20, 3), (-5, 4), (0, 3)]
+	history = StateHistory(NUM_STATES, PAUSE_STATE, entries)
+	assert list(history) == entries
+	assert history.get_times(-100, 10, False) == {1: 30, 3: 25, 4: 5}
+	assert history.get_times(-100, 10, True) == {1: 30, 3: 25}
+	assert history.get_first_relevant_tick(-10, 10) == -15
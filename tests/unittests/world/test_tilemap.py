@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import copy
+import random
+
+import pytest
+
+from horizons.util.shapes import Rect
+from horizons.world.tilemap import TileMap
+
+
+def test_tile_map_behaves_like_dict():
+	rng = random.Random(1)
+	tile_map = TileMap(Rect.init_from_borders(-5, 3, 20, 30))
+	expected = {}
+	for i in range(500):
+		coords = (rng.randint(-5, 20), rng.randint(3, 30))
+		if rng.random() < 0.3:
+			assert tile_map.pop(coords, None) == expected.pop(coords, None)
+		else:
+			tile_map[coords] = expected[coords] = i
+
+	assert len(tile_map) == len(expected)
+	assert dict(tile_map.items()) == expected
+	assert set(tile_map) == set(expected)
+	assert sorted(tile_map.values()) == sorted(expected.values())
+	for coords in Rect.init_from_borders(-7, 1, 22, 32).tuple_iter():
+		assert (coords in tile_map) == (coords in expected)
+		assert tile_map.get(coords) == expected.get(coords)
+
+
+def test_tile_map_fill():
+	tile_map = TileMap(Rect.init_from_borders(0, 0, 9, 9))
+	tile_map[(0, 0)] = 'a'
+	tile_map.fill(Rect.init_from_borders(-3, -3, 4, 1), 'b')
+	assert len(tile_map) == 10
+	assert tile_map[(0, 0)] == 'b'
+	assert tile_map[(4, 1)] == 'b'
+	assert (5, 1) not in tile_map
+
+	other = copy.copy(tile_map)
+	other.fill(Rect.init_from_borders(2, 0, 3, 5), None)
+	assert len(other) == 6
+	assert (2, 0) not in other
+	assert len(tile_map) == 10
+
+	with pytest.raises(KeyError):
+		tile_map[(10, 0)] = 'c'
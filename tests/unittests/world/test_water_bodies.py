@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import random
+
+import pytest
+
+from horizons.util.pathfinding.pathnodes import PathNodeGrid
+from horizons.util.shapes import Rect
+from horizons.world import World
+
+
+def create_water(seed, size, land=0.45):
+	"""Returns a random sea with lots of small islands and lakes."""
+	rng = random.Random(seed)
+	bounds = Rect.init_from_borders(0, 0, size - 1, size - 1)
+	water = PathNodeGrid(bounds, {coords: 1.0 for coords in bounds.tuple_iter() if rng.random() > land})
+	return water
+
+
+def create_sea(seed, size):
+	"""Returns a sea with a few big islands, like the maps of the game."""
+	rng = random.Random(seed)
+	bounds = Rect.init_from_borders(0, 0, size - 1, size - 1)
+	land = set()
+	for i in range(size // 12):
+		island = Rect.init_from_topleft_and_size(rng.randrange(size - 60), rng.randrange(size - 60),
+		                                         rng.randint(20, 60), rng.randint(20, 60))
+		land.update(island.tuple_iter())
+	return PathNodeGrid(bounds, {coords: 1.0 for coords in bounds.tuple_iter() if coords not in land})
+
+
+@pytest.mark.parametrize('seed', range(10))
+@pytest.mark.parametrize('land', [0.2, 0.45, 0.6])
+def test_grid_labelling_matches_flood_fill(seed, land):
+	water = create_water(seed, 60, land)
+	expected = dict.fromkeys(water)
+	World._recognize_water_bodies(expected)
+	water_body = dict.fromkeys(water)
+	World._recognize_water_bodies(water_body, water)
+	assert water_body == expected
+
+
+def test_grid_labelling_uses_order_of_dict():
+	water = create_water(0, 30)
+	coords = list(water)
+	random.Random(0).shuffle(coords)
+	expected = dict.fromkeys(coords)
+	World._recognize_water_bodies(expected)
+	water_body = dict.fromkeys(coords)
+	World._recognize_water_bodies(water_body, water)
+	assert water_body == expected
+
+
+@pytest.mark.long
+@pytest.mark.parametrize('size', [100, 250, 500])
+def test_grid_labelling_of_large_seas(size):
+	water = create_sea(0, size)
+	expected = dict.fromkeys(water)
+	World._recognize_water_bodies(expected)
+	water_body = dict.fromkeys(water)
+	World._recognize_water_bodies(water_body, water)
+	assert water_body == expected
@@ -20,6 +20,7 @@
 # ###################################################
 
 from horizons.constants import BUILDINGS, RES
+from horizons.util.pathfinding.pathfinding import PathDistanceField
 from horizons.util.shapes import Point, Rect
 from horizons.world.building.production import ProductionBuilding
 from horizons.world.island import Island
@@ -51,6 +52,17 @@ class TestJobList(TestCase):
 		self.assertEqual(test_list[1].object.id, 3)
 		self.assertEqual(test_list[2].object.id, 1)
 
+	def test_sort_travel_distance(self):
+		test_list = self.create_list(JobList.order_by.distance)
+		# a wall at x == 2 with a gap at the bottom makes (1, 1) the farthest target
+		nodes = {(x, y): 1.0 for x in range(5) for y in range(5) if x != 2 or y == 4}
+		test_list.collector.distance_field = PathDistanceField(Point(3, 0), nodes)
+		test_list.sort_jobs()
+
+		self.assertEqual(test_list[0].object.id, 1)
+		self.assertEqual(test_list[1].object.id, 3)
+		self.assertEqual(test_list[2].object.id, 2)
+
 	def test_sort_fewest_available(self):
 		test_list = self.create_list(JobList.order_by.fewest_available)
 		test_list._sort_jobs_fewest_available(False)
@@ -101,6 +113,10 @@ class DummyCollector:
 
 	def __init__(self, x, y):
 		self.position = Point(x, y)
+		self.distance_field = None
+
+	def get_distance_field(self):
+		return self.distance_field
 
 	def get_home_inventory(self):
 		"""Return a dummy inventory"""